@@ -3,8 +3,10 @@
 """
 from flask import Blueprint, request, jsonify, session
 from utils.database import get_db_connection, get_db_dict_connection
-from utils.auth import hash_password, login_required, manager_required, get_current_user, paginate_query
-from utils.helpers import validate_required_fields, validate_phone, format_datetime
+from utils.auth import hash_password, login_required, manager_required, get_current_user
+from utils.helpers import validate_required_fields, validate_phone
+from utils.pagination import Pagination, PaginationError
+from utils.cache import bump_data_generation
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -106,8 +108,7 @@ def current_user():
 def get_users():
     """获取用户列表（分页）"""
     try:
-        page = int(request.args.get('page', 1))
-        size = int(request.args.get('size', 10))
+        pager = Pagination.from_request([('created_at', 'DESC', 'created_at'), ('id', 'DESC', 'id')])
         search = request.args.get('search', '').strip()
         role_filter = request.args.get('role', '').strip()
         status_filter = request.args.get('status', '').strip()
@@ -135,46 +136,36 @@ def get_users():
         if where_conditions:
             where_clause = "WHERE " + " AND ".join(where_conditions)
         
-        # 计数查询
+        # 计数查询（统计方式由 count 参数决定）
         count_query = f"SELECT COUNT(*) FROM users {where_clause}"
-        cursor.execute(count_query, params)
-        total = cursor.fetchone()['COUNT(*)']
+        total = pager.count(cursor, count_query, params, table='users')
         
         # 数据查询
-        offset = (page - 1) * size
+        data_where, data_params = pager.where(where_conditions, params)
         data_query = f"""
             SELECT id, username, real_name, role, phone, status, created_at, remark
             FROM users 
-            {where_clause}
-            ORDER BY created_at DESC
-            LIMIT %s OFFSET %s
+            {data_where}
+            {pager.order_by}
+            {pager.limit}
         """
-        cursor.execute(data_query, params + [size, offset])
-        users = cursor.fetchall()
-        
-        # 格式化数据
-        for user in users:
-            user['created_at'] = format_datetime(user['created_at'])
+        cursor.execute(data_query, data_params + pager.limit_params)
+        users = pager.page_rows(cursor.fetchall())
         
         cursor.close()
         conn.close()
         
-        # 计算分页信息
-        total_pages = (total + size - 1) // size
-        
         return jsonify({
             'success': True,
             'data': users,
-            'pagination': {
-                'page': page,
-                'size': size,
-                'total': total,
-                'total_pages': total_pages,
-                'has_prev': page > 1,
-                'has_next': page < total_pages
-            }
+            'pagination': pager.info(total)
         })
         
+    except PaginationError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -243,6 +234,7 @@ def create_user():
         
         cursor.close()
         conn.close()
+        bump_data_generation()
         
         return jsonify({
             'success': True,
@@ -345,6 +337,7 @@ def update_user(user_id):
         
         cursor.close()
         conn.close()
+        bump_data_generation()
         
         return jsonify({
             'success': True,
@@ -391,6 +384,7 @@ def delete_user(user_id):
         
         cursor.close()
         conn.close()
+        bump_data_generation()
         
         return jsonify({
             'success': True,
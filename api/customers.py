@@ -4,7 +4,10 @@
 from flask import Blueprint, request, jsonify
 from utils.database import get_db_connection, get_db_dict_connection
 from utils.auth import login_required, manager_required
-from utils.helpers import validate_required_fields, validate_phone, format_datetime
+from utils.helpers import validate_required_fields, validate_phone
+from utils.pagination import Pagination, PaginationError
+from utils.cache import bump_data_generation
+from utils.search import keyword_condition
 
 customers_bp = Blueprint('customers', __name__)
 
@@ -13,8 +16,7 @@ customers_bp = Blueprint('customers', __name__)
 def get_customers():
     """获取客户列表（分页）"""
     try:
-        page = int(request.args.get('page', 1))
-        size = int(request.args.get('size', 10))
+        pager = Pagination.from_request([('is_default', 'DESC', 'is_default'), ('created_at', 'DESC', 'created_at'), ('id', 'DESC', 'id')])
         search = request.args.get('search', '').strip()
         status = request.args.get('status', '').strip()
         include_default = request.args.get('include_default', 'true').lower() == 'true'
@@ -30,8 +32,9 @@ def get_customers():
             where_conditions.append("is_default = 0")
         
         if search:
-            where_conditions.append("(name LIKE %s OR phone LIKE %s)")
-            params.extend([f'%{search}%', f'%{search}%'])
+            condition, condition_params = keyword_condition('customers', search, ['name', 'phone'])
+            where_conditions.append(condition)
+            params.extend(condition_params)
         
         if status:
             where_conditions.append("status = %s")
@@ -41,47 +44,40 @@ def get_customers():
         if where_conditions:
             where_clause = "WHERE " + " AND ".join(where_conditions)
         
-        # 计数查询
+        # 计数查询（统计方式由 count 参数决定）
         count_query = f"SELECT COUNT(*) FROM customers {where_clause}"
-        cursor.execute(count_query, params)
-        total = cursor.fetchone()['COUNT(*)']
+        total = pager.count(cursor, count_query, params, table='customers')
         
         # 数据查询
-        offset = (page - 1) * size
+        data_where, data_params = pager.where(where_conditions, params)
         data_query = f"""
             SELECT id, name, phone, address, is_default, status, created_at, remark
             FROM customers 
-            {where_clause}
-            ORDER BY is_default DESC, created_at DESC
-            LIMIT %s OFFSET %s
+            {data_where}
+            {pager.order_by}
+            {pager.limit}
         """
-        cursor.execute(data_query, params + [size, offset])
-        customers = cursor.fetchall()
+        cursor.execute(data_query, data_params + pager.limit_params)
+        customers = pager.page_rows(cursor.fetchall())
         
         # 格式化数据
         for customer in customers:
-            customer['created_at'] = format_datetime(customer['created_at'])
             customer['is_default'] = bool(customer['is_default'])
         
         cursor.close()
         conn.close()
         
-        # 计算分页信息
-        total_pages = (total + size - 1) // size
-        
         return jsonify({
             'success': True,
             'data': customers,
-            'pagination': {
-                'page': page,
-                'size': size,
-                'total': total,
-                'total_pages': total_pages,
-                'has_prev': page > 1,
-                'has_next': page < total_pages
-            }
+            'pagination': pager.info(total)
         })
         
+    except PaginationError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -113,7 +109,6 @@ def get_customer(customer_id):
             }), 404
         
         # 格式化数据
-        customer['created_at'] = format_datetime(customer['created_at'])
         customer['is_default'] = bool(customer['is_default'])
         
         return jsonify({
@@ -169,6 +164,7 @@ def create_customer():
         
         cursor.close()
         conn.close()
+        bump_data_generation()
         
         return jsonify({
             'success': True,
@@ -276,6 +272,7 @@ def update_customer(customer_id):
         
         cursor.close()
         conn.close()
+        bump_data_generation()
         
         return jsonify({
             'success': True,
@@ -333,6 +330,7 @@ def delete_customer(customer_id):
         
         cursor.close()
         conn.close()
+        bump_data_generation()
         
         return jsonify({
             'success': True,
@@ -363,9 +361,16 @@ def search_customers():
         if not include_default:
             where_conditions.append("is_default = 0")
         
+        order_by = "ORDER BY is_default DESC, name"
+        order_params = []
         if keyword:
-            where_conditions.append("(name LIKE %s OR phone LIKE %s)")
-            params.extend([f'%{keyword}%', f'%{keyword}%'])
+            condition, condition_params = keyword_condition('customers', keyword, ['name', 'phone'])
+            where_conditions.append(condition)
+            params.extend(condition_params)
+            if condition.startswith('MATCH'):
+                # 全文索引按相关度排序（默认客户仍置顶）
+                order_by = f"ORDER BY is_default DESC, {condition} DESC, name"
+                order_params = condition_params
         
         where_clause = "WHERE " + " AND ".join(where_conditions)
         
@@ -373,9 +378,9 @@ def search_customers():
             SELECT id, name, phone, address, is_default
             FROM customers
             {where_clause}
-            ORDER BY is_default DESC, name
+            {order_by}
             LIMIT %s
-        """, params + [limit])
+        """, params + order_params + [limit])
         
         customers = cursor.fetchall()
         
@@ -423,7 +428,6 @@ def get_default_customer():
             }), 404
         
         # 格式化数据
-        customer['created_at'] = format_datetime(customer['created_at'])
         customer['is_default'] = bool(customer['is_default'])
         
         return jsonify({
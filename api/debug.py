@@ -0,0 +1,46 @@
+"""
+调试与剖析API模块
+"""
+import os
+
+from flask import Blueprint, jsonify, send_from_directory
+from utils.auth import login_required, manager_required
+from utils.profiler import PROFILER_CONFIG, PROFILE_SUFFIXES, list_profiles
+
+debug_bp = Blueprint('debug', __name__)
+
+@debug_bp.route('/api/debug/profiles', methods=['GET'])
+@login_required
+@manager_required
+def get_profiles():
+    """获取请求剖析文件列表"""
+    try:
+        return jsonify({
+            'success': True,
+            'data': list_profiles(),
+            'config': {
+                'enabled': PROFILER_CONFIG['enabled'],
+                'sample_rate': PROFILER_CONFIG['sample_rate'],
+                'header': PROFILER_CONFIG['header'],
+                'mode': PROFILER_CONFIG['mode']
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'获取剖析文件列表失败: {str(e)}'
+        }), 500
+
+@debug_bp.route('/api/debug/profiles/<name>', methods=['GET'])
+@login_required
+@manager_required
+def download_profile(name):
+    """下载请求剖析文件"""
+    if not name.endswith(tuple(PROFILE_SUFFIXES.values())) or os.path.basename(name) != name:
+        return jsonify({
+            'success': False,
+            'message': '剖析文件不存在'
+        }), 404
+    # send_from_directory 会拒绝越出目录的路径，文件不存在时返回 404
+    return send_from_directory(PROFILER_CONFIG['output_dir'], name, as_attachment=True)
@@ -2,9 +2,12 @@
 库存管理API模块
 """
 from flask import Blueprint, request, jsonify
-from utils.database import get_db_connection, get_db_dict_connection
+from utils.database import get_db_connection, get_db_dict_connection, values_table
 from utils.auth import login_required, manager_required, get_current_user
-from utils.helpers import validate_required_fields, generate_order_no, format_datetime, format_date, safe_int
+from utils.helpers import validate_required_fields, generate_order_no, safe_int
+from utils.cache import invalidate_dashboard, bump_data_generation
+from utils.barcode import expire_code_map
+from utils.pagination import Pagination, PaginationError
 from datetime import datetime
 
 inventory_bp = Blueprint('inventory', __name__)
@@ -14,8 +17,7 @@ inventory_bp = Blueprint('inventory', __name__)
 def get_inventory():
     """获取库存列表（分页）"""
     try:
-        page = int(request.args.get('page', 1))
-        size = int(request.args.get('size', 10))
+        pager = Pagination.from_request([('p.name', 'ASC', 'name'), ('p.id', 'ASC', 'id')])
         search = request.args.get('search', '').strip()
         category = request.args.get('category', '').strip()
         low_stock = request.args.get('low_stock', '').lower() == 'true'
@@ -43,55 +45,44 @@ def get_inventory():
         
         where_clause = "WHERE " + " AND ".join(where_conditions)
         
-        # 计数查询
+        # 计数查询（统计方式由 count 参数决定）
         count_query = f"""
             SELECT COUNT(*) 
             FROM products p
             LEFT JOIN inventory i ON p.id = i.product_id
             {where_clause}
         """
-        cursor.execute(count_query, params)
-        total = cursor.fetchone()['COUNT(*)']
+        total = pager.count(cursor, count_query, params)
         
         # 数据查询
-        offset = (page - 1) * size
+        data_where, data_params = pager.where(where_conditions, params)
         data_query = f"""
             SELECT p.id, p.code, p.name, p.category, p.brand, p.unit, 
                    p.selling_price, COALESCE(i.quantity, 0) as quantity,
                    i.updated_at, i.remark as inventory_remark
             FROM products p
             LEFT JOIN inventory i ON p.id = i.product_id
-            {where_clause}
-            ORDER BY p.name
-            LIMIT %s OFFSET %s
+            {data_where}
+            {pager.order_by}
+            {pager.limit}
         """
-        cursor.execute(data_query, params + [size, offset])
-        inventory = cursor.fetchall()
-        
-        # 格式化数据
-        for item in inventory:
-            item['selling_price'] = float(item['selling_price'])
-            item['updated_at'] = format_datetime(item['updated_at'])
+        cursor.execute(data_query, data_params + pager.limit_params)
+        inventory = pager.page_rows(cursor.fetchall())
         
         cursor.close()
         conn.close()
         
-        # 计算分页信息
-        total_pages = (total + size - 1) // size
-        
         return jsonify({
             'success': True,
             'data': inventory,
-            'pagination': {
-                'page': page,
-                'size': size,
-                'total': total,
-                'total_pages': total_pages,
-                'has_prev': page > 1,
-                'has_next': page < total_pages
-            }
+            'pagination': pager.info(total)
         })
         
+    except PaginationError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -192,12 +183,6 @@ def get_inventory_statistics():
         cursor.close()
         conn.close()
         
-        # 格式化数据
-        stats['total_value'] = float(stats['total_value'])
-        
-        for cat in category_stats:
-            cat['total_value'] = float(cat['total_value'])
-        
         return jsonify({
             'success': True,
             'data': {
@@ -219,8 +204,7 @@ def get_inventory_statistics():
 def get_inventory_checks():
     """获取库存盘点列表（分页）"""
     try:
-        page = int(request.args.get('page', 1))
-        size = int(request.args.get('size', 10))
+        pager = Pagination.from_request([('ic.check_date', 'DESC', 'check_date'), ('ic.created_at', 'DESC', 'created_at'), ('ic.id', 'DESC', 'id')])
         search = request.args.get('search', '').strip()
         status = request.args.get('status', '').strip()
         
@@ -243,55 +227,44 @@ def get_inventory_checks():
         if where_conditions:
             where_clause = "WHERE " + " AND ".join(where_conditions)
         
-        # 计数查询
+        # 计数查询（统计方式由 count 参数决定）
         count_query = f"""
             SELECT COUNT(*) 
             FROM inventory_checks ic
             LEFT JOIN users u ON ic.user_id = u.id
             {where_clause}
         """
-        cursor.execute(count_query, params)
-        total = cursor.fetchone()['COUNT(*)']
+        total = pager.count(cursor, count_query, params, table='inventory_checks')
         
         # 数据查询
-        offset = (page - 1) * size
+        data_where, data_params = pager.where(where_conditions, params)
         data_query = f"""
             SELECT ic.id, ic.check_no, ic.check_date, ic.status, 
                    ic.total_difference, ic.user_id, u.real_name as user_name,
                    ic.created_at, ic.remark
             FROM inventory_checks ic
             LEFT JOIN users u ON ic.user_id = u.id
-            {where_clause}
-            ORDER BY ic.check_date DESC, ic.created_at DESC
-            LIMIT %s OFFSET %s
+            {data_where}
+            {pager.order_by}
+            {pager.limit}
         """
-        cursor.execute(data_query, params + [size, offset])
-        checks = cursor.fetchall()
-        
-        # 格式化数据
-        for check in checks:
-            check['check_date'] = format_date(check['check_date'])
-            check['created_at'] = format_datetime(check['created_at'])
+        cursor.execute(data_query, data_params + pager.limit_params)
+        checks = pager.page_rows(cursor.fetchall())
         
         cursor.close()
         conn.close()
         
-        # 计算分页信息
-        total_pages = (total + size - 1) // size
-        
         return jsonify({
             'success': True,
             'data': checks,
-            'pagination': {
-                'page': page,
-                'size': size,
-                'total': total,
-                'total_pages': total_pages,
-                'has_prev': page > 1,
-                'has_next': page < total_pages
-            }
+            'pagination': pager.info(total)
         })
         
+    except PaginationError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -341,10 +314,6 @@ def get_inventory_check(check_id):
         cursor.close()
         conn.close()
         
-        # 格式化数据
-        check['check_date'] = format_date(check['check_date'])
-        check['created_at'] = format_datetime(check['created_at'])
-        
         for detail in details:
             detail['handled'] = bool(detail['handled'])
         
@@ -398,65 +367,52 @@ def create_inventory_check():
             
             check_id = cursor.lastrowid
             
-            # 获取所有商品当前库存并插入盘点明细
+            # 以当前库存为账面数量，一条 INSERT ... SELECT 生成全部盘点明细
+            # （初始假设实际数量等于账面数量，差异为0）
             cursor.execute("""
-                SELECT p.id, COALESCE(i.quantity, 0) as current_quantity
+                INSERT INTO inventory_check_details 
+                (check_id, product_id, book_quantity, actual_quantity, 
+                 difference, difference_type, handled)
+                SELECT %s, p.id, COALESCE(i.quantity, 0), COALESCE(i.quantity, 0),
+                       0, 'normal', 0
                 FROM products p
                 LEFT JOIN inventory i ON p.id = i.product_id
                 WHERE p.status = 'active'
                 ORDER BY p.name
-            """)
-            
-            products = cursor.fetchall()
-            total_difference = 0
-            
-            for product in products:
-                product_id, book_quantity = product
-                actual_quantity = book_quantity  # 初始假设实际数量等于账面数量
-                difference = actual_quantity - book_quantity
-                
-                if difference > 0:
-                    difference_type = 'gain'
-                elif difference < 0:
-                    difference_type = 'loss'
-                else:
-                    difference_type = 'normal'
-                
-                total_difference += difference
-                
-                cursor.execute("""
-                    INSERT INTO inventory_check_details 
-                    (check_id, product_id, book_quantity, actual_quantity, 
-                     difference, difference_type, handled)
-                    VALUES (%s, %s, %s, %s, %s, %s, 0)
-                """, (check_id, product_id, book_quantity, actual_quantity,
-                      difference, difference_type))
-            
-            # 更新盘点单总差异
+            """, (check_id,))
+            product_count = cursor.rowcount
+            
+            # 更新盘点单总差异（在SQL中汇总）
             cursor.execute("""
                 UPDATE inventory_checks 
-                SET total_difference = %s 
+                SET total_difference = (
+                    SELECT COALESCE(SUM(difference), 0) 
+                    FROM inventory_check_details 
+                    WHERE check_id = %s
+                )
                 WHERE id = %s
-            """, (total_difference, check_id))
+            """, (check_id, check_id))
             
             conn.commit()
             
-            return jsonify({
-                'success': True,
-                'message': '库存盘点创建成功',
-                'data': {
-                    'check_id': check_id,
-                    'check_no': check_no,
-                    'product_count': len(products)
-                }
-            })
-            
         except Exception as e:
             conn.rollback()
             raise e
         finally:
             cursor.close()
             conn.close()
+        
+        bump_data_generation()
+        
+        return jsonify({
+            'success': True,
+            'message': '库存盘点创建成功',
+            'data': {
+                'check_id': check_id,
+                'check_no': check_no,
+                'product_count': product_count
+            }
+        })
             
     except Exception as e:
         return jsonify({
@@ -494,8 +450,8 @@ def update_check_quantity(check_id):
         cursor = conn.cursor()
         
         try:
-            # 检查盘点单是否存在且状态为进行中
-            cursor.execute("SELECT id, status FROM inventory_checks WHERE id = %s", (check_id,))
+            # 检查盘点单是否存在且状态为进行中（锁定盘点单，与完成盘点互斥）
+            cursor.execute("SELECT id, status FROM inventory_checks WHERE id = %s FOR UPDATE", (check_id,))
             check = cursor.fetchone()
             
             if not check:
@@ -512,8 +468,9 @@ def update_check_quantity(check_id):
             
             # 获取盘点明细
             cursor.execute("""
-                SELECT id, book_quantity FROM inventory_check_details 
+                SELECT id, book_quantity, difference FROM inventory_check_details 
                 WHERE check_id = %s AND product_id = %s
+                FOR UPDATE
             """, (check_id, product_id))
             
             detail = cursor.fetchone()
@@ -523,7 +480,7 @@ def update_check_quantity(check_id):
                     'message': '盘点明细不存在'
                 })
             
-            detail_id, book_quantity = detail
+            detail_id, book_quantity, old_difference = detail
             difference = actual_quantity - book_quantity
             
             if difference > 0:
@@ -540,29 +497,165 @@ def update_check_quantity(check_id):
                 WHERE id = %s
             """, (actual_quantity, difference, difference_type, detail_id))
             
-            # 重新计算总差异
-            cursor.execute("""
-                SELECT SUM(difference) FROM inventory_check_details 
-                WHERE check_id = %s
-            """, (check_id,))
-            total_difference = cursor.fetchone()[0] or 0
-            
+            # 按本行差异变化量增量更新总差异
             cursor.execute("""
                 UPDATE inventory_checks 
-                SET total_difference = %s 
+                SET total_difference = COALESCE(total_difference, 0) + %s 
                 WHERE id = %s
-            """, (total_difference, check_id))
+            """, (difference - old_difference, check_id))
             
             conn.commit()
             
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            cursor.close()
+            conn.close()
+        
+        bump_data_generation()
+        
+        return jsonify({
+            'success': True,
+            'message': '盘点数量更新成功',
+            'data': {
+                'difference': difference,
+                'difference_type': difference_type
+            }
+        })
+            
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'更新盘点数量失败: {str(e)}'
+        }), 500
+
+@inventory_bp.route('/api/inventory-checks/<int:check_id>/update-quantities', methods=['PUT'])
+@login_required
+@manager_required
+def batch_update_check_quantities(check_id):
+    """批量录入盘点数量（扫码枪批量上传）"""
+    try:
+        data = request.get_json() or {}
+        items = data.get('items')
+        
+        if not isinstance(items, list) or len(items) == 0:
             return jsonify({
-                'success': True,
-                'message': '盘点数量更新成功',
-                'data': {
-                    'difference': difference,
-                    'difference_type': difference_type
-                }
+                'success': False,
+                'message': '盘点数量列表不能为空'
             })
+        
+        # 校验数据格式：每项需提供 product_id 或 code，以及 actual_quantity
+        counts = []
+        for item in items:
+            if not isinstance(item, dict):
+                return jsonify({
+                    'success': False,
+                    'message': '盘点数量数据格式不正确'
+                })
+            product_id = safe_int(item.get('product_id'))
+            code = str(item.get('code') or '').strip()
+            actual_quantity = item.get('actual_quantity')
+            
+            if (not product_id and not code) or actual_quantity is None or str(actual_quantity).strip() == '':
+                return jsonify({
+                    'success': False,
+                    'message': '盘点数量数据不完整：需提供 product_id 或 code 以及 actual_quantity'
+                })
+            
+            actual_quantity = safe_int(actual_quantity, -1)
+            if actual_quantity < 0:
+                return jsonify({
+                    'success': False,
+                    'message': '实际数量不能为负数'
+                })
+            counts.append((product_id, code, actual_quantity))
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            # 检查盘点单是否存在且状态为进行中（锁定盘点单，与完成盘点互斥）
+            cursor.execute("SELECT id, status FROM inventory_checks WHERE id = %s FOR UPDATE", (check_id,))
+            check = cursor.fetchone()
+            
+            if not check:
+                return jsonify({
+                    'success': False,
+                    'message': '库存盘点不存在'
+                })
+            
+            if check[1] != 'ongoing':
+                return jsonify({
+                    'success': False,
+                    'message': '只能修改进行中的盘点'
+                })
+            
+            # 一次查询把商品编码解析为商品ID
+            codes = sorted({code for product_id, code, _ in counts if not product_id})
+            code_map = {}
+            if codes:
+                cursor.execute(f"""
+                    SELECT code, id FROM products WHERE code IN ({', '.join(['%s'] * len(codes))})
+                """, codes)
+                code_map = dict(cursor.fetchall())
+                missing_codes = [code for code in codes if code not in code_map]
+                if missing_codes:
+                    return jsonify({
+                        'success': False,
+                        'message': f"商品编码不存在: {', '.join(missing_codes[:20])}"
+                    })
+            
+            # 同一商品出现多次时以最后一次为准
+            actual_by_product = {}
+            for product_id, code, actual_quantity in counts:
+                actual_by_product[product_id or code_map[code]] = actual_quantity
+            product_ids = sorted(actual_by_product)
+            
+            # 读取并锁定相关盘点明细，用于计算差异变化量
+            cursor.execute(f"""
+                SELECT product_id, book_quantity, difference FROM inventory_check_details 
+                WHERE check_id = %s AND product_id IN ({', '.join(['%s'] * len(product_ids))})
+                ORDER BY product_id
+                FOR UPDATE
+            """, [check_id] + product_ids)
+            current = {row[0]: row for row in cursor.fetchall()}
+            
+            missing_ids = [str(pid) for pid in product_ids if pid not in current]
+            if missing_ids:
+                return jsonify({
+                    'success': False,
+                    'message': f"盘点明细不存在，商品ID: {', '.join(missing_ids[:20])}"
+                })
+            
+            difference_delta = 0
+            for product_id, actual_quantity in actual_by_product.items():
+                _, book_quantity, old_difference = current[product_id]
+                difference_delta += (actual_quantity - book_quantity) - old_difference
+            
+            # 一条 UPDATE ... JOIN 批量更新盘点明细
+            derived_sql, derived_params = values_table(actual_by_product.items(), ('product_id', 'actual_quantity'))
+            cursor.execute(f"""
+                UPDATE inventory_check_details icd
+                INNER JOIN ({derived_sql}) v ON icd.product_id = v.product_id
+                SET icd.actual_quantity = v.actual_quantity,
+                    icd.difference = v.actual_quantity - icd.book_quantity,
+                    icd.difference_type = CASE
+                        WHEN v.actual_quantity > icd.book_quantity THEN 'gain'
+                        WHEN v.actual_quantity < icd.book_quantity THEN 'loss'
+                        ELSE 'normal'
+                    END
+                WHERE icd.check_id = %s
+            """, derived_params + [check_id])
+            
+            # 按各行差异变化量之和增量更新总差异
+            cursor.execute("""
+                UPDATE inventory_checks 
+                SET total_difference = COALESCE(total_difference, 0) + %s 
+                WHERE id = %s
+            """, (difference_delta, check_id))
+            
+            conn.commit()
             
         except Exception as e:
             conn.rollback()
@@ -570,11 +663,22 @@ def update_check_quantity(check_id):
         finally:
             cursor.close()
             conn.close()
+        
+        bump_data_generation()
+        
+        return jsonify({
+            'success': True,
+            'message': f'盘点数量批量更新成功，共 {len(actual_by_product)} 个商品',
+            'data': {
+                'updated_count': len(actual_by_product),
+                'difference_delta': difference_delta
+            }
+        })
             
     except Exception as e:
         return jsonify({
             'success': False,
-            'message': f'更新盘点数量失败: {str(e)}'
+            'message': f'批量更新盘点数量失败: {str(e)}'
         }), 500
 
 @inventory_bp.route('/api/inventory-checks/<int:check_id>/complete', methods=['PUT'])
@@ -587,8 +691,8 @@ def complete_inventory_check(check_id):
         cursor = conn.cursor()
         
         try:
-            # 检查盘点单是否存在且状态为进行中
-            cursor.execute("SELECT id, status FROM inventory_checks WHERE id = %s", (check_id,))
+            # 检查盘点单是否存在且状态为进行中（锁定盘点单，防止重复完成）
+            cursor.execute("SELECT id, status FROM inventory_checks WHERE id = %s FOR UPDATE", (check_id,))
             check = cursor.fetchone()
             
             if not check:
@@ -603,30 +707,15 @@ def complete_inventory_check(check_id):
                     'message': '只能完成进行中的盘点'
                 })
             
-            # 获取所有盘点明细
+            # 一条 UPDATE ... JOIN 调整所有有差异商品的库存
+            # 盘盈盘亏直接加减库存数量（在当前库存基础上增减差异值）
             cursor.execute("""
-                SELECT product_id, book_quantity, actual_quantity, difference, difference_type
-                FROM inventory_check_details 
-                WHERE check_id = %s AND difference != 0
+                UPDATE inventory i
+                INNER JOIN inventory_check_details d ON i.product_id = d.product_id
+                SET i.quantity = i.quantity + d.difference, i.updated_at = NOW()
+                WHERE d.check_id = %s AND d.difference != 0
             """, (check_id,))
-            
-            differences = cursor.fetchall()
-            
-            # 调整库存
-            adjusted_count = 0
-            for diff in differences:
-                product_id, book_quantity, actual_quantity, difference, difference_type = diff
-                # 盘盈盘亏直接加减库存数量（在当前库存基础上增减差异值）
-                cursor.execute(
-                    """
-                    UPDATE inventory 
-                    SET quantity = quantity + %s, updated_at = NOW()
-                    WHERE product_id = %s
-                    """,
-                    (difference, product_id)
-                )
-                
-                adjusted_count += 1
+            adjusted_count = cursor.rowcount
             
             # 标记所有明细为已处理
             cursor.execute("""
@@ -644,17 +733,23 @@ def complete_inventory_check(check_id):
             
             conn.commit()
             
-            return jsonify({
-                'success': True,
-                'message': f'库存盘点完成，共调整 {adjusted_count} 个商品的库存'
-            })
-            
         except Exception as e:
             conn.rollback()
             raise e
         finally:
             cursor.close()
             conn.close()
+        
+        # 提交后的缓存失效放在事务之外，失败只记录日志
+        invalidate_dashboard('inventory')
+        bump_data_generation()
+        if adjusted_count:
+            expire_code_map()
+        
+        return jsonify({
+            'success': True,
+            'message': f'库存盘点完成，共调整 {adjusted_count} 个商品的库存'
+        })
             
     except Exception as e:
         return jsonify({
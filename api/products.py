@@ -4,7 +4,11 @@
 from flask import Blueprint, request, jsonify
 from utils.database import get_db_connection, get_db_dict_connection
 from utils.auth import login_required, manager_required
-from utils.helpers import validate_required_fields, format_datetime, safe_float
+from utils.helpers import validate_required_fields, safe_float
+from utils.cache import invalidate_dashboard, bump_data_generation
+from utils.pagination import Pagination, PaginationError
+from utils.search import SEARCH_CONFIG, get_search_index, refresh_product, use_fulltext, keyword_condition
+from utils.barcode import lookup_codes, refresh_codes
 
 products_bp = Blueprint('products', __name__)
 
@@ -13,8 +17,7 @@ products_bp = Blueprint('products', __name__)
 def get_products():
     """获取商品列表（分页）"""
     try:
-        page = int(request.args.get('page', 1))
-        size = int(request.args.get('size', 10))
+        pager = Pagination.from_request([('p.created_at', 'DESC', 'created_at'), ('p.id', 'DESC', 'id')])
         search = request.args.get('search', '').strip()
         category = request.args.get('category', '').strip()
         status = request.args.get('status', '').strip()
@@ -26,9 +29,21 @@ def get_products():
         where_conditions = []
         params = []
         
-        if search:
-            where_conditions.append("(p.code LIKE %s OR p.name LIKE %s OR p.brand LIKE %s)")
-            params.extend([f'%{search}%', f'%{search}%', f'%{search}%'])
+        if search and use_fulltext():
+            condition, condition_params = keyword_condition('products', search, ['p.code', 'p.name', 'p.brand'], 'p')
+            where_conditions.append(condition)
+            params.extend(condition_params)
+        elif search:
+            # 优先用搜索索引得到命中ID（同时支持拼音首字母），命中过多时退回 LIKE
+            ids = get_search_index().search(search, status=None, limit=None)
+            if len(ids) <= SEARCH_CONFIG['max_in_ids']:
+                if not ids:
+                    ids = [0]
+                where_conditions.append(f"p.id IN ({', '.join(['%s'] * len(ids))})")
+                params.extend(ids)
+            else:
+                where_conditions.append("(p.code LIKE %s OR p.name LIKE %s OR p.brand LIKE %s)")
+                params.extend([f'%{search}%', f'%{search}%', f'%{search}%'])
         
         if category:
             where_conditions.append("p.category = %s")
@@ -42,50 +57,39 @@ def get_products():
         if where_conditions:
             where_clause = "WHERE " + " AND ".join(where_conditions)
         
-        # 计数查询
+        # 计数查询（统计方式由 count 参数决定）
         count_query = f"SELECT COUNT(*) FROM products p {where_clause}"
-        cursor.execute(count_query, params)
-        total = cursor.fetchone()['COUNT(*)']
+        total = pager.count(cursor, count_query, params, table='products')
         
         # 数据查询（包含库存信息）
-        offset = (page - 1) * size
+        data_where, data_params = pager.where(where_conditions, params)
         data_query = f"""
             SELECT p.id, p.code, p.name, p.category, p.brand, p.unit, 
                    p.selling_price, p.status, p.created_at, p.remark,
                    COALESCE(i.quantity, 0) as stock_quantity
             FROM products p
             LEFT JOIN inventory i ON p.id = i.product_id
-            {where_clause}
-            ORDER BY p.created_at DESC
-            LIMIT %s OFFSET %s
+            {data_where}
+            {pager.order_by}
+            {pager.limit}
         """
-        cursor.execute(data_query, params + [size, offset])
-        products = cursor.fetchall()
-        
-        # 格式化数据
-        for product in products:
-            product['created_at'] = format_datetime(product['created_at'])
-            product['selling_price'] = float(product['selling_price'])
+        cursor.execute(data_query, data_params + pager.limit_params)
+        products = pager.page_rows(cursor.fetchall())
         
         cursor.close()
         conn.close()
         
-        # 计算分页信息
-        total_pages = (total + size - 1) // size
-        
         return jsonify({
             'success': True,
             'data': products,
-            'pagination': {
-                'page': page,
-                'size': size,
-                'total': total,
-                'total_pages': total_pages,
-                'has_prev': page > 1,
-                'has_next': page < total_pages
-            }
+            'pagination': pager.info(total)
         })
         
+    except PaginationError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -119,10 +123,6 @@ def get_product(product_id):
                 'message': '商品不存在'
             }), 404
         
-        # 格式化数据
-        product['created_at'] = format_datetime(product['created_at'])
-        product['selling_price'] = float(product['selling_price'])
-        
         return jsonify({
             'success': True,
             'data': product
@@ -196,6 +196,10 @@ def create_product():
         conn.commit()
         cursor.close()
         conn.close()
+        invalidate_dashboard('inventory')
+        bump_data_generation()
+        refresh_product(product_id)
+        refresh_codes([product_id])
         
         return jsonify({
             'success': True,
@@ -309,6 +313,10 @@ def update_product(product_id):
         
         cursor.close()
         conn.close()
+        invalidate_dashboard('inventory')
+        bump_data_generation()
+        refresh_product(product_id)
+        refresh_codes([product_id])
         
         return jsonify({
             'success': True,
@@ -377,6 +385,10 @@ def delete_product(product_id):
         
         cursor.close()
         conn.close()
+        invalidate_dashboard('inventory')
+        bump_data_generation()
+        refresh_product(product_id)
+        refresh_codes([product_id])
         
         return jsonify({
             'success': True,
@@ -462,28 +474,49 @@ def search_products():
         conn = get_db_dict_connection()
         cursor = conn.cursor()
         
-        where_clause = "WHERE p.status = 'active'"
-        params = []
-        
-        if keyword:
-            where_clause += " AND (p.code LIKE %s OR p.name LIKE %s OR p.brand LIKE %s)"
-            params.extend([f'%{keyword}%', f'%{keyword}%', f'%{keyword}%'])
-        
-        cursor.execute(f"""
-            SELECT p.id, p.code, p.name, p.category, p.brand, p.unit, 
-                   p.selling_price, COALESCE(i.quantity, 0) as stock_quantity
-            FROM products p
-            LEFT JOIN inventory i ON p.id = i.product_id
-            {where_clause}
-            ORDER BY p.name
-            LIMIT %s
-        """, params + [limit])
-        
-        products = cursor.fetchall()
-        
-        # 格式化数据
-        for product in products:
-            product['selling_price'] = float(product['selling_price'])
+        if keyword and use_fulltext():
+            # MySQL 全文索引：编码完全匹配优先，其余按相关度排序
+            condition, condition_params = keyword_condition('products', keyword, ['p.code', 'p.name', 'p.brand'], 'p')
+            order_by = "ORDER BY p.name"
+            order_params = []
+            if condition.startswith('MATCH'):
+                order_by = f"ORDER BY p.code = %s DESC, {condition} DESC, p.name"
+                order_params = [keyword] + condition_params
+            cursor.execute(f"""
+                SELECT p.id, p.code, p.name, p.category, p.brand, p.unit, 
+                       p.selling_price, COALESCE(i.quantity, 0) as stock_quantity
+                FROM products p
+                LEFT JOIN inventory i ON p.id = i.product_id
+                WHERE p.status = 'active' AND {condition}
+                {order_by}
+                LIMIT %s
+            """, condition_params + order_params + [limit])
+            products = cursor.fetchall()
+        elif keyword:
+            # 由搜索索引完成匹配与排序（编码/名称/品牌子串、拼音首字母），再按ID取行
+            ids = get_search_index().search(keyword, status='active', limit=limit)
+            products = []
+            if ids:
+                cursor.execute(f"""
+                    SELECT p.id, p.code, p.name, p.category, p.brand, p.unit, 
+                           p.selling_price, COALESCE(i.quantity, 0) as stock_quantity
+                    FROM products p
+                    LEFT JOIN inventory i ON p.id = i.product_id
+                    WHERE p.id IN ({', '.join(['%s'] * len(ids))}) AND p.status = 'active'
+                """, ids)
+                rows = {row['id']: row for row in cursor.fetchall()}
+                products = [rows[product_id] for product_id in ids if product_id in rows]
+        else:
+            cursor.execute("""
+                SELECT p.id, p.code, p.name, p.category, p.brand, p.unit, 
+                       p.selling_price, COALESCE(i.quantity, 0) as stock_quantity
+                FROM products p
+                LEFT JOIN inventory i ON p.id = i.product_id
+                WHERE p.status = 'active'
+                ORDER BY p.name
+                LIMIT %s
+            """, (limit,))
+            products = cursor.fetchall()
         
         cursor.close()
         conn.close()
@@ -497,4 +530,81 @@ def search_products():
         return jsonify({
             'success': False,
             'message': f'搜索商品失败: {str(e)}'
-        }), 500
\ No newline at end of file
+        }), 500
+
+@products_bp.route('/api/products/by-code/<path:code>', methods=['GET'])
+@login_required
+def get_product_by_code(code):
+    """按编码（条码）查找商品（收银扫码，走进程内映射）"""
+    try:
+        code = code.strip()
+        product = lookup_codes([code]).get(code)
+        if not product:
+            return jsonify({
+                'success': False,
+                'message': '商品不存在'
+            }), 404
+        
+        if product['status'] != 'active':
+            return jsonify({
+                'success': False,
+                'message': '商品已停用'
+            })
+        
+        return jsonify({
+            'success': True,
+            'data': product
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'按编码查找商品失败: {str(e)}'
+        }), 500
+
+@products_bp.route('/api/products/by-codes', methods=['POST'])
+@login_required
+def get_products_by_codes():
+    """按编码批量查找商品（连续扫码）"""
+    try:
+        data = request.get_json() or {}
+        codes = data.get('codes')
+        if not isinstance(codes, list) or not codes:
+            return jsonify({
+                'success': False,
+                'message': '编码列表不能为空'
+            })
+        
+        if len(codes) > 200:
+            return jsonify({
+                'success': False,
+                'message': '单次最多查找200个编码'
+            })
+        
+        codes = list(dict.fromkeys(str(code).strip() for code in codes if str(code).strip()))
+        found = lookup_codes(codes)
+        
+        products = []
+        not_found = []
+        inactive = []
+        for code in codes:
+            product = found.get(code)
+            if not product:
+                not_found.append(code)
+            elif product['status'] != 'active':
+                inactive.append(code)
+            else:
+                products.append(product)
+        
+        return jsonify({
+            'success': True,
+            'data': products,
+            'not_found': not_found,
+            'inactive': inactive
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'批量查找商品失败: {str(e)}'
+        }), 500
@@ -2,9 +2,13 @@
 采购管理API模块
 """
 from flask import Blueprint, request, jsonify, session
-from utils.database import get_db_connection, get_db_dict_connection
+from utils.database import get_db_connection, get_db_dict_connection, db_connection
 from utils.auth import login_required, manager_required, get_current_user
-from utils.helpers import validate_required_fields, generate_order_no, format_datetime, format_date, safe_float, safe_int, safe_strip
+from utils.costs import update_product_costs
+from utils.helpers import validate_required_fields, generate_order_no, safe_float, safe_int, safe_strip, date_range_filter
+from utils.cache import invalidate_dashboard, bump_data_generation
+from utils.barcode import refresh_codes
+from utils.pagination import Pagination
 from datetime import datetime
 
 purchase_bp = Blueprint('purchase', __name__)
@@ -14,11 +18,12 @@ purchase_bp = Blueprint('purchase', __name__)
 def get_purchase_orders():
     """获取采购申请列表（分页）"""
     try:
-        page = int(request.args.get('page', 1))
-        size = int(request.args.get('size', 10))
+        pager = Pagination.from_request([('po.apply_time', 'DESC', 'apply_time'), ('po.id', 'DESC', 'id')])
         search = safe_strip(request.args.get('search'))
         status = safe_strip(request.args.get('status'))
         supplier_id = safe_strip(request.args.get('supplier_id'))
+        start_date = safe_strip(request.args.get('start_date'))
+        end_date = safe_strip(request.args.get('end_date'))
         
         conn = get_db_dict_connection()
         cursor = conn.cursor()
@@ -39,11 +44,16 @@ def get_purchase_orders():
             where_conditions.append("po.supplier_id = %s")
             params.append(supplier_id)
         
+        if start_date or end_date:
+            date_condition, date_params = date_range_filter('po.apply_time', start_date, end_date)
+            where_conditions.append(date_condition)
+            params.extend(date_params)
+        
         where_clause = ""
         if where_conditions:
             where_clause = "WHERE " + " AND ".join(where_conditions)
         
-        # 计数查询
+        # 计数查询（统计方式由 count 参数决定）
         count_query = f"""
             SELECT COUNT(*) 
             FROM purchase_orders po
@@ -51,11 +61,10 @@ def get_purchase_orders():
             LEFT JOIN users u1 ON po.apply_user_id = u1.id
             {where_clause}
         """
-        cursor.execute(count_query, params)
-        total = cursor.fetchone()['COUNT(*)']
+        total = pager.count(cursor, count_query, params, table='purchase_orders')
         
         # 数据查询
-        offset = (page - 1) * size
+        data_where, data_params = pager.where(where_conditions, params)
         data_query = f"""
             SELECT po.id, po.order_no, po.supplier_id, s.name as supplier_name,
                    po.status, po.total_amount, po.apply_user_id, u1.real_name as apply_user_name,
@@ -65,38 +74,32 @@ def get_purchase_orders():
             LEFT JOIN suppliers s ON po.supplier_id = s.id
             LEFT JOIN users u1 ON po.apply_user_id = u1.id
             LEFT JOIN users u2 ON po.approve_user_id = u2.id
-            {where_clause}
-            ORDER BY po.apply_time DESC
-            LIMIT %s OFFSET %s
+            {data_where}
+            {pager.order_by}
+            {pager.limit}
         """
-        cursor.execute(data_query, params + [size, offset])
-        orders = cursor.fetchall()
+        cursor.execute(data_query, data_params + pager.limit_params)
+        orders = pager.page_rows(cursor.fetchall())
         
         # 格式化数据
         for order in orders:
             order['total_amount'] = float(order['total_amount']) if order['total_amount'] else 0
-            order['apply_time'] = format_datetime(order['apply_time'])
-            order['approve_time'] = format_datetime(order['approve_time'])
         
         cursor.close()
         conn.close()
         
-        # 计算分页信息
-        total_pages = (total + size - 1) // size
-        
         return jsonify({
             'success': True,
             'data': orders,
-            'pagination': {
-                'page': page,
-                'size': size,
-                'total': total,
-                'total_pages': total_pages,
-                'has_prev': page > 1,
-                'has_next': page < total_pages
-            }
+            'pagination': pager.info(total)
         })
         
+    except ValueError as e:
+        # 分页参数无效（PaginationError）或日期格式不正确
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -150,8 +153,6 @@ def get_purchase_order(order_id):
         
         # 格式化数据
         order['total_amount'] = float(order['total_amount']) if order['total_amount'] else 0
-        order['apply_time'] = format_datetime(order['apply_time'])
-        order['approve_time'] = format_datetime(order['approve_time'])
         
         for detail in details:
             detail['cost_price'] = float(detail['cost_price'])
@@ -269,21 +270,25 @@ def create_purchase_order():
             
             conn.commit()
             
-            return jsonify({
-                'success': True,
-                'message': '采购申请创建成功',
-                'data': {
-                    'order_id': order_id,
-                    'order_no': order_no
-                }
-            })
-            
         except Exception as e:
             conn.rollback()
             raise e
         finally:
             cursor.close()
             conn.close()
+        
+        # 提交后的缓存失效放在事务之外，失败只记录日志
+        invalidate_dashboard('purchase')
+        bump_data_generation()
+        
+        return jsonify({
+            'success': True,
+            'message': '采购申请创建成功',
+            'data': {
+                'order_id': order_id,
+                'order_no': order_no
+            }
+        })
             
     except Exception as e:
         return jsonify({
@@ -329,6 +334,8 @@ def approve_purchase_order(order_id):
         """, (current_user['user_id'], datetime.now(), order_id))
         
         conn.commit()
+        invalidate_dashboard('purchase')
+        bump_data_generation()
         cursor.close()
         conn.close()
         
@@ -381,6 +388,8 @@ def reject_purchase_order(order_id):
         """, (current_user['user_id'], datetime.now(), order_id))
         
         conn.commit()
+        invalidate_dashboard('purchase')
+        bump_data_generation()
         cursor.close()
         conn.close()
         
@@ -432,6 +441,8 @@ def deliver_purchase_order(order_id):
         """, (order_id,))
         
         conn.commit()
+        invalidate_dashboard('purchase')
+        bump_data_generation()
         cursor.close()
         conn.close()
         
@@ -453,139 +464,135 @@ def update_purchase_order(order_id):
     try:
         data = request.get_json() or {}
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with db_connection() as conn:
+            cursor = conn.cursor()
         
-        # 检查订单是否存在且状态为待审批
-        cursor.execute("SELECT id, status, apply_user_id FROM purchase_orders WHERE id = %s", (order_id,))
-        order = cursor.fetchone()
+            # 检查订单是否存在且状态为待审批
+            cursor.execute("SELECT id, status, apply_user_id FROM purchase_orders WHERE id = %s", (order_id,))
+            order = cursor.fetchone()
         
-        if not order:
-            cursor.close()
-            conn.close()
-            return jsonify({
-                'success': False,
-                'message': '采购订单不存在'
-            })
+            if not order:
+                return jsonify({
+                    'success': False,
+                    'message': '采购订单不存在'
+                })
         
-        if order[1] != 'pending':
-            cursor.close()
-            conn.close()
-            return jsonify({
-                'success': False,
-                'message': '只能修改状态为待审批的订单'
-            })
+            if order[1] != 'pending':
+                return jsonify({
+                    'success': False,
+                    'message': '只能修改状态为待审批的订单'
+                })
         
-        # 验证权限（只能修改自己的申请或管理员可以修改所有）
-        current_user = get_current_user()
-        if current_user['role'] != 'manager' and order[2] != current_user['user_id']:
-            cursor.close()
-            conn.close()
-            return jsonify({
-                'success': False,
-                'message': '只能修改自己的采购申请'
-            })
+            # 验证权限（只能修改自己的申请或管理员可以修改所有）
+            current_user = get_current_user()
+            if current_user['role'] != 'manager' and order[2] != current_user['user_id']:
+                return jsonify({
+                    'success': False,
+                    'message': '只能修改自己的采购申请'
+                })
         
-        try:
-            # 构建更新字段
-            update_fields = []
-            params = []
-            
-            if 'supplier_id' in data:
-                supplier_id = safe_int(data['supplier_id'])
-                # 验证供应商
-                cursor.execute("SELECT id FROM suppliers WHERE id = %s AND status = 'active'", (supplier_id,))
-                if not cursor.fetchone():
-                    return jsonify({
-                        'success': False,
-                        'message': '供应商不存在或已禁用'
-                    })
-                update_fields.append("supplier_id = %s")
-                params.append(supplier_id)
+            try:
+                # 构建更新字段
+                update_fields = []
+                params = []
             
-            if 'remark' in data:
-                update_fields.append("remark = %s")
-                params.append(safe_strip(data['remark']) or None)
-            
-            # 处理明细更新
-            if 'details' in data:
-                details = data['details']
-                if not details or len(details) == 0:
-                    return jsonify({
-                        'success': False,
-                        'message': '采购明细不能为空'
-                    })
-                
-                # 验证商品并计算总金额
-                total_amount = 0
-                validated_details = []
-                
-                for detail in details:
-                    product_id = safe_int(detail.get('product_id'))
-                    quantity = safe_int(detail.get('quantity'))
-                    cost_price = safe_float(detail.get('cost_price'))
-                    detail_remark = safe_strip(detail.get('remark'))
-                    
-                    if not product_id or quantity <= 0 or cost_price <= 0:
+                if 'supplier_id' in data:
+                    supplier_id = safe_int(data['supplier_id'])
+                    # 验证供应商
+                    cursor.execute("SELECT id FROM suppliers WHERE id = %s AND status = 'active'", (supplier_id,))
+                    if not cursor.fetchone():
                         return jsonify({
                             'success': False,
-                            'message': '采购明细数据不完整或无效'
+                            'message': '供应商不存在或已禁用'
                         })
-                    
-                    # 验证商品是否存在
-                    cursor.execute("SELECT id FROM products WHERE id = %s AND status = 'active'", (product_id,))
-                    if not cursor.fetchone():
+                    update_fields.append("supplier_id = %s")
+                    params.append(supplier_id)
+            
+                if 'remark' in data:
+                    update_fields.append("remark = %s")
+                    params.append(safe_strip(data['remark']) or None)
+            
+                # 处理明细更新
+                if 'details' in data:
+                    details = data['details']
+                    if not details or len(details) == 0:
                         return jsonify({
                             'success': False,
-                            'message': f'商品ID {product_id} 不存在或已禁用'
+                            'message': '采购明细不能为空'
                         })
+                
+                    # 验证商品并计算总金额
+                    total_amount = 0
+                    validated_details = []
+                
+                    for detail in details:
+                        product_id = safe_int(detail.get('product_id'))
+                        quantity = safe_int(detail.get('quantity'))
+                        cost_price = safe_float(detail.get('cost_price'))
+                        detail_remark = safe_strip(detail.get('remark'))
                     
-                    amount = quantity * cost_price
-                    total_amount += amount
+                        if not product_id or quantity <= 0 or cost_price <= 0:
+                            return jsonify({
+                                'success': False,
+                                'message': '采购明细数据不完整或无效'
+                            })
                     
-                    validated_details.append({
-                        'product_id': product_id,
-                        'quantity': quantity,
-                        'cost_price': cost_price,
-                        'amount': amount,
-                        'remark': detail_remark
-                    })
+                        # 验证商品是否存在
+                        cursor.execute("SELECT id FROM products WHERE id = %s AND status = 'active'", (product_id,))
+                        if not cursor.fetchone():
+                            return jsonify({
+                                'success': False,
+                                'message': f'商品ID {product_id} 不存在或已禁用'
+                            })
+                    
+                        amount = quantity * cost_price
+                        total_amount += amount
+                    
+                        validated_details.append({
+                            'product_id': product_id,
+                            'quantity': quantity,
+                            'cost_price': cost_price,
+                            'amount': amount,
+                            'remark': detail_remark
+                        })
                 
-                # 删除原有明细
-                cursor.execute("DELETE FROM purchase_details WHERE purchase_id = %s", (order_id,))
+                    # 删除原有明细
+                    cursor.execute("DELETE FROM purchase_details WHERE purchase_id = %s", (order_id,))
                 
-                # 插入新明细
-                for detail in validated_details:
-                    cursor.execute("""
-                        INSERT INTO purchase_details (purchase_id, product_id, quantity, 
-                                                    cost_price, amount, remark)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                    """, (order_id, detail['product_id'], detail['quantity'],
-                          detail['cost_price'], detail['amount'], detail['remark'] or None))
+                    # 插入新明细
+                    for detail in validated_details:
+                        cursor.execute("""
+                            INSERT INTO purchase_details (purchase_id, product_id, quantity, 
+                                                        cost_price, amount, remark)
+                            VALUES (%s, %s, %s, %s, %s, %s)
+                        """, (order_id, detail['product_id'], detail['quantity'],
+                              detail['cost_price'], detail['amount'], detail['remark'] or None))
                 
-                # 更新总金额
-                update_fields.append("total_amount = %s")
-                params.append(total_amount)
+                    # 更新总金额
+                    update_fields.append("total_amount = %s")
+                    params.append(total_amount)
             
-            # 执行订单基本信息更新
-            if update_fields:
-                params.append(order_id)
-                update_sql = f"UPDATE purchase_orders SET {', '.join(update_fields)} WHERE id = %s"
-                cursor.execute(update_sql, params)
+                # 执行订单基本信息更新
+                if update_fields:
+                    params.append(order_id)
+                    update_sql = f"UPDATE purchase_orders SET {', '.join(update_fields)} WHERE id = %s"
+                    cursor.execute(update_sql, params)
             
-            conn.commit()
-            
-            return jsonify({
-                'success': True,
-                'message': '采购申请更新成功'
-            })
+                conn.commit()
             
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+            except Exception as e:
+                conn.rollback()
+                raise e
+            finally:
+                cursor.close()
+        
+        invalidate_dashboard('purchase')
+        bump_data_generation()
+        
+        return jsonify({
+            'success': True,
+            'message': '采购申请更新成功'
+        })
             
     except Exception as e:
         return jsonify({
@@ -640,17 +647,20 @@ def delete_purchase_order(order_id):
             
             conn.commit()
             
-            return jsonify({
-                'success': True,
-                'message': '采购申请删除成功'
-            })
-            
         except Exception as e:
             conn.rollback()
             raise e
         finally:
             cursor.close()
             conn.close()
+        
+        invalidate_dashboard('purchase')
+        bump_data_generation()
+        
+        return jsonify({
+            'success': True,
+            'message': '采购申请删除成功'
+        })
             
     except Exception as e:
         return jsonify({
@@ -665,8 +675,7 @@ def delete_purchase_order(order_id):
 def get_incoming_orders():
     """获取进货订单列表（分页）"""
     try:
-        page = int(request.args.get('page', 1))
-        size = int(request.args.get('size', 10))
+        pager = Pagination.from_request([('io.incoming_date', 'DESC', 'incoming_date'), ('io.created_at', 'DESC', 'created_at'), ('io.id', 'DESC', 'id')])
         search = safe_strip(request.args.get('search'))
         supplier_id = safe_strip(request.args.get('supplier_id'))
         start_date = safe_strip(request.args.get('start_date'))
@@ -687,19 +696,16 @@ def get_incoming_orders():
             where_conditions.append("io.supplier_id = %s")
             params.append(supplier_id)
         
-        if start_date:
-            where_conditions.append("io.incoming_date >= %s")
-            params.append(start_date)
-        
-        if end_date:
-            where_conditions.append("io.incoming_date <= %s")
-            params.append(end_date)
+        if start_date or end_date:
+            date_condition, date_params = date_range_filter('io.incoming_date', start_date, end_date)
+            where_conditions.append(date_condition)
+            params.extend(date_params)
         
         where_clause = ""
         if where_conditions:
             where_clause = "WHERE " + " AND ".join(where_conditions)
         
-        # 计数查询
+        # 计数查询（统计方式由 count 参数决定）
         count_query = f"""
             SELECT COUNT(*) 
             FROM incoming_orders io
@@ -707,11 +713,10 @@ def get_incoming_orders():
             LEFT JOIN users u ON io.user_id = u.id
             {where_clause}
         """
-        cursor.execute(count_query, params)
-        total = cursor.fetchone()['COUNT(*)']
+        total = pager.count(cursor, count_query, params, table='incoming_orders')
         
         # 数据查询
-        offset = (page - 1) * size
+        data_where, data_params = pager.where(where_conditions, params)
         data_query = f"""
             SELECT io.id, io.order_no, io.purchase_id, po.order_no as purchase_order_no,
                    io.supplier_id, s.name as supplier_name, io.total_amount,
@@ -721,38 +726,32 @@ def get_incoming_orders():
             LEFT JOIN suppliers s ON io.supplier_id = s.id
             LEFT JOIN users u ON io.user_id = u.id
             LEFT JOIN purchase_orders po ON io.purchase_id = po.id
-            {where_clause}
-            ORDER BY io.incoming_date DESC, io.created_at DESC
-            LIMIT %s OFFSET %s
+            {data_where}
+            {pager.order_by}
+            {pager.limit}
         """
-        cursor.execute(data_query, params + [size, offset])
-        orders = cursor.fetchall()
+        cursor.execute(data_query, data_params + pager.limit_params)
+        orders = pager.page_rows(cursor.fetchall())
         
         # 格式化数据
         for order in orders:
             order['total_amount'] = float(order['total_amount']) if order['total_amount'] else 0
-            order['incoming_date'] = format_date(order['incoming_date'])
-            order['created_at'] = format_datetime(order['created_at'])
         
         cursor.close()
         conn.close()
         
-        # 计算分页信息
-        total_pages = (total + size - 1) // size
-        
         return jsonify({
             'success': True,
             'data': orders,
-            'pagination': {
-                'page': page,
-                'size': size,
-                'total': total,
-                'total_pages': total_pages,
-                'has_prev': page > 1,
-                'has_next': page < total_pages
-            }
+            'pagination': pager.info(total)
         })
         
+    except ValueError as e:
+        # 分页参数无效（PaginationError）或日期格式不正确
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -807,14 +806,10 @@ def get_incoming_order(order_id):
         
         # 格式化数据
         order['total_amount'] = float(order['total_amount']) if order['total_amount'] else 0
-        order['incoming_date'] = format_date(order['incoming_date'])
-        order['created_at'] = format_datetime(order['created_at'])
         
         for detail in details:
             detail['cost_price'] = float(detail['cost_price'])
             detail['amount'] = float(detail['amount'])
-            detail['production_date'] = format_date(detail['production_date'])
-            detail['expiry_date'] = format_date(detail['expiry_date'])
         
         return jsonify({
             'success': True,
@@ -961,6 +956,9 @@ def create_incoming_order():
                     WHERE product_id = %s
                 """, (detail['quantity'], detail['product_id']))
             
+            # 更新商品成本表（最近进货价、加权平均进价）
+            update_product_costs(cursor, validated_details, incoming_date)
+            
             # 如果关联了采购订单，更新采购订单状态为已入库（stock）
             if purchase_id:
                 cursor.execute("""
@@ -971,21 +969,25 @@ def create_incoming_order():
             
             conn.commit()
             
-            return jsonify({
-                'success': True,
-                'message': '进货订单创建成功',
-                'data': {
-                    'order_id': order_id,
-                    'order_no': order_no
-                }
-            })
-            
         except Exception as e:
             conn.rollback()
             raise e
         finally:
             cursor.close()
             conn.close()
+        
+        invalidate_dashboard('inventory', 'purchase')
+        bump_data_generation()
+        refresh_codes([detail['product_id'] for detail in validated_details])
+        
+        return jsonify({
+            'success': True,
+            'message': '进货订单创建成功',
+            'data': {
+                'order_id': order_id,
+                'order_no': order_no
+            }
+        })
             
     except Exception as e:
         return jsonify({
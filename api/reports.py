@@ -1,92 +1,55 @@
 """
 报表统计API模块
+
+销售类统计读取销售日汇总表（sales_daily_totals / sales_daily_rollup），
+由 utils.rollup 在销售订单增删时同步维护。
 """
 from flask import Blueprint, request, jsonify
-from utils.database import get_db_connection, get_db_dict_connection
+from utils.database import get_db_connection, get_db_dict_connection, db_connection
 from utils.auth import login_required, manager_required
-from utils.helpers import format_date, safe_float
+from utils.cache import CACHE_CONFIG, DASHBOARD_SECTIONS, cached, dashboard_cache_key
+from utils.helpers import format_datetime, safe_float, date_range_filter
 from datetime import datetime, timedelta
 
 reports_bp = Blueprint('reports', __name__)
 
-@reports_bp.route('/api/reports/dashboard', methods=['GET'])
-@login_required
-def get_dashboard_data():
-    """获取仪表盘数据"""
-    try:
-        conn = get_db_dict_connection()
+def _build_dashboard_sales():
+    """仪表盘销售分区：今日/昨日/本月/上月销售、7天趋势、本月热销商品"""
+    today = datetime.now().date()
+    yesterday = today - timedelta(days=1)
+    this_month_start = today.replace(day=1)
+    last_month_start = (this_month_start - timedelta(days=1)).replace(day=1)
+    last_month_end = this_month_start - timedelta(days=1)
+    
+    with db_connection(dict_cursor=True) as conn:
         cursor = conn.cursor()
         
-        today = datetime.now().date()
-        yesterday = today - timedelta(days=1)
-        this_month_start = today.replace(day=1)
-        last_month_start = (this_month_start - timedelta(days=1)).replace(day=1)
-        last_month_end = this_month_start - timedelta(days=1)
-        
-        # 今日销售统计
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as order_count,
-                COALESCE(SUM(total_amount), 0) as total_sales,
-                COALESCE(SUM(profit), 0) as total_profit
-            FROM outgoing_orders
-            WHERE sale_date = %s
-        """, (today,))
-        today_sales = cursor.fetchone()
-        
-        # 昨日销售统计
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as order_count,
-                COALESCE(SUM(total_amount), 0) as total_sales,
-                COALESCE(SUM(profit), 0) as total_profit
-            FROM outgoing_orders
-            WHERE sale_date = %s
-        """, (yesterday,))
-        yesterday_sales = cursor.fetchone()
-        
-        # 本月销售统计
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as order_count,
-                COALESCE(SUM(total_amount), 0) as total_sales,
-                COALESCE(SUM(profit), 0) as total_profit
-            FROM outgoing_orders
-            WHERE sale_date >= %s AND sale_date <= %s
-        """, (this_month_start, today))
-        this_month_sales = cursor.fetchone()
-        
-        # 上月销售统计
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as order_count,
-                COALESCE(SUM(total_amount), 0) as total_sales,
-                COALESCE(SUM(profit), 0) as total_profit
-            FROM outgoing_orders
-            WHERE sale_date >= %s AND sale_date <= %s
-        """, (last_month_start, last_month_end))
-        last_month_sales = cursor.fetchone()
-        
-        # 库存预警统计
-        cursor.execute("""
-            SELECT 
-                COUNT(CASE WHEN COALESCE(i.quantity, 0) = 0 THEN 1 END) as zero_stock,
-                COUNT(CASE WHEN COALESCE(i.quantity, 0) > 0 AND COALESCE(i.quantity, 0) <= 10 THEN 1 END) as low_stock,
-                COALESCE(SUM(i.quantity * p.selling_price), 0) as total_inventory_value
-            FROM products p
-            LEFT JOIN inventory i ON p.id = i.product_id
-            WHERE p.status = 'active'
-        """)
-        inventory_stats = cursor.fetchone()
+        # 今日、昨日、本月、上月销售统计
+        periods = {}
+        for name, start_date, end_date in [
+            ('today_sales', today, today),
+            ('yesterday_sales', yesterday, yesterday),
+            ('this_month_sales', this_month_start, today),
+            ('last_month_sales', last_month_start, last_month_end)
+        ]:
+            cursor.execute("""
+                SELECT 
+                    COALESCE(SUM(order_count), 0) as order_count,
+                    COALESCE(SUM(total_sales), 0) as total_sales,
+                    COALESCE(SUM(total_profit), 0) as total_profit
+                FROM sales_daily_totals
+                WHERE sale_date >= %s AND sale_date <= %s
+            """, (start_date, end_date))
+            periods[name] = cursor.fetchone()
         
         # 最近7天销售趋势
         cursor.execute("""
             SELECT 
                 sale_date,
-                COUNT(*) as order_count,
-                COALESCE(SUM(total_amount), 0) as total_sales,
-                COALESCE(SUM(profit), 0) as total_profit
-            FROM outgoing_orders
+                COALESCE(SUM(order_count), 0) as order_count,
+                COALESCE(SUM(total_sales), 0) as total_sales,
+                COALESCE(SUM(total_profit), 0) as total_profit
+            FROM sales_daily_totals
             WHERE sale_date >= %s AND sale_date <= %s
             GROUP BY sale_date
             ORDER BY sale_date
@@ -95,58 +58,86 @@ def get_dashboard_data():
         
         # 热销商品Top 10
         cursor.execute("""
-            SELECT p.name, p.unit, SUM(od.quantity) as total_quantity,
-                   SUM(od.amount) as total_sales, SUM(od.profit) as total_profit
-            FROM outgoing_details od
-            INNER JOIN outgoing_orders oo ON od.outgoing_id = oo.id
-            INNER JOIN products p ON od.product_id = p.id
-            WHERE oo.sale_date >= %s
-            GROUP BY od.product_id, p.name, p.unit
+            SELECT p.name, p.unit, SUM(r.quantity) as total_quantity,
+                   SUM(r.sales_amount) as total_sales, SUM(r.profit) as total_profit
+            FROM sales_daily_rollup r
+            INNER JOIN products p ON r.product_id = p.id
+            WHERE r.sale_date >= %s
+            GROUP BY r.product_id, p.name, p.unit
             ORDER BY total_sales DESC
             LIMIT 10
         """, (this_month_start,))
         top_products = cursor.fetchall()
+        
+        cursor.close()
+    
+    return dict(periods, sales_trend=sales_trend, top_products=top_products)
+
+def _build_dashboard_inventory():
+    """仪表盘库存分区：库存预警统计"""
+    with db_connection(dict_cursor=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT 
+                COUNT(CASE WHEN COALESCE(i.quantity, 0) = 0 THEN 1 END) as zero_stock,
+                COUNT(CASE WHEN COALESCE(i.quantity, 0) > 0 AND COALESCE(i.quantity, 0) <= 10 THEN 1 END) as low_stock,
+                COALESCE(SUM(i.quantity * p.selling_price), 0) as total_inventory_value
+            FROM products p
+            LEFT JOIN inventory i ON p.id = i.product_id
+            WHERE p.status = 'active'
+        """)
+        inventory_stats = cursor.fetchone()
+        cursor.close()
+    
+    return {'inventory_stats': inventory_stats}
 
-        # 待处理订单（采购单：待定/已批准）
+def _build_dashboard_purchase():
+    """仪表盘采购分区：待处理订单（采购单：待定/已批准）"""
+    with db_connection(dict_cursor=True) as conn:
+        cursor = conn.cursor()
         cursor.execute("""
             SELECT COUNT(*) AS pending_count
             FROM purchase_orders
             WHERE status IN ('pending','approved')
         """)
         pending_row = cursor.fetchone()
-        pending_orders = int(pending_row['pending_count']) if pending_row and 'pending_count' in pending_row else 0
-        
         cursor.close()
-        conn.close()
-        
-        # 格式化数据
-        for item in [today_sales, yesterday_sales, this_month_sales, last_month_sales]:
-            item['total_sales'] = float(item['total_sales'])
-            item['total_profit'] = float(item['total_profit'])
-        
-        inventory_stats['total_inventory_value'] = float(inventory_stats['total_inventory_value'])
-        
-        for item in sales_trend:
-            item['sale_date'] = format_date(item['sale_date'])
-            item['total_sales'] = float(item['total_sales'])
-            item['total_profit'] = float(item['total_profit'])
-        
-        for item in top_products:
-            item['total_sales'] = float(item['total_sales'])
-            item['total_profit'] = float(item['total_profit'])
+    
+    pending_orders = int(pending_row['pending_count']) if pending_row and 'pending_count' in pending_row else 0
+    return {'pending_orders': pending_orders}
+
+_DASHBOARD_BUILDERS = {
+    'sales': _build_dashboard_sales,
+    'inventory': _build_dashboard_inventory,
+    'purchase': _build_dashboard_purchase
+}
+
+@reports_bp.route('/api/reports/dashboard', methods=['GET'])
+@login_required
+def get_dashboard_data():
+    """获取仪表盘数据（按分区缓存，销售/进货/盘点/采购写入时对应分区失效）"""
+    try:
+        data = {}
+        generated_at = []
+        for section in DASHBOARD_SECTIONS:
+            builder = _DASHBOARD_BUILDERS[section]
+            entry = cached(
+                dashboard_cache_key(section),
+                lambda builder=builder: {
+                    'generated_at': format_datetime(datetime.now()),
+                    'data': builder()
+                },
+                CACHE_CONFIG['dashboard_ttl']
+            )
+            data.update(entry['data'])
+            generated_at.append(entry['generated_at'])
+        
+        # 以最早生成的分区时间作为整体数据生成时间
+        data['generated_at'] = min(generated_at)
         
         return jsonify({
             'success': True,
-            'data': {
-                'today_sales': today_sales,
-                'yesterday_sales': yesterday_sales,
-                'this_month_sales': this_month_sales,
-                'last_month_sales': last_month_sales,
-                'inventory_stats': inventory_stats,
-                'sales_trend': sales_trend,
-                'top_products': top_products,
-                'pending_orders': pending_orders
-            }
+            'data': data
         })
         
     except Exception as e:
@@ -170,6 +161,10 @@ def get_sales_report():
                 'message': '请指定开始日期和结束日期'
             })
         
+        # 日期区间条件：半开区间 [开始日期, 结束日期+1)，直接比较列本身以便走索引范围扫描
+        sale_date_range, range_params = date_range_filter('sale_date', start_date, end_date)
+        r_sale_date_range, _ = date_range_filter('r.sale_date', start_date, end_date)
+        
         conn = get_db_dict_connection()
         cursor = conn.cursor()
         
@@ -191,66 +186,51 @@ def get_sales_report():
         cursor.execute(f"""
             SELECT 
                 {group_field} as period,
-                COUNT(*) as order_count,
-                COALESCE(SUM(total_amount), 0) as total_sales,
+                COALESCE(SUM(order_count), 0) as order_count,
+                COALESCE(SUM(total_sales), 0) as total_sales,
                 COALESCE(SUM(total_cost), 0) as total_cost,
-                COALESCE(SUM(profit), 0) as total_profit,
-                ROUND(COALESCE(SUM(profit) / SUM(total_amount) * 100, 0), 2) as profit_rate
-            FROM outgoing_orders
-            WHERE sale_date >= %s AND sale_date <= %s
+                COALESCE(SUM(total_profit), 0) as total_profit,
+                ROUND(COALESCE(SUM(total_profit) / SUM(total_sales) * 100, 0), 2) as profit_rate
+            FROM sales_daily_totals
+            WHERE {sale_date_range}
             GROUP BY {group_field}
             ORDER BY period
-        """, (start_date, end_date))
+        """, range_params)
         
         sales_data = cursor.fetchall()
         
         # 总计
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT 
-                COUNT(*) as total_orders,
-                COALESCE(SUM(total_amount), 0) as total_sales,
+                COALESCE(SUM(order_count), 0) as total_orders,
+                COALESCE(SUM(total_sales), 0) as total_sales,
                 COALESCE(SUM(total_cost), 0) as total_cost,
-                COALESCE(SUM(profit), 0) as total_profit,
-                ROUND(COALESCE(SUM(profit) / SUM(total_amount) * 100, 0), 2) as profit_rate
-            FROM outgoing_orders
-            WHERE sale_date >= %s AND sale_date <= %s
-        """, (start_date, end_date))
+                COALESCE(SUM(total_profit), 0) as total_profit,
+                ROUND(COALESCE(SUM(total_profit) / SUM(total_sales) * 100, 0), 2) as profit_rate
+            FROM sales_daily_totals
+            WHERE {sale_date_range}
+        """, range_params)
         
         summary = cursor.fetchone()
         
         # 商品销售排行
-        cursor.execute("""
-            SELECT p.name, p.unit, SUM(od.quantity) as total_quantity,
-                   SUM(od.amount) as total_sales, SUM(od.profit) as total_profit,
-                   ROUND(SUM(od.profit) / SUM(od.amount) * 100, 2) as profit_rate
-            FROM outgoing_details od
-            INNER JOIN outgoing_orders oo ON od.outgoing_id = oo.id
-            INNER JOIN products p ON od.product_id = p.id
-            WHERE oo.sale_date >= %s AND oo.sale_date <= %s
-            GROUP BY od.product_id, p.name, p.unit
+        cursor.execute(f"""
+            SELECT p.name, p.unit, SUM(r.quantity) as total_quantity,
+                   SUM(r.sales_amount) as total_sales, SUM(r.profit) as total_profit,
+                   ROUND(SUM(r.profit) / SUM(r.sales_amount) * 100, 2) as profit_rate
+            FROM sales_daily_rollup r
+            INNER JOIN products p ON r.product_id = p.id
+            WHERE {r_sale_date_range}
+            GROUP BY r.product_id, p.name, p.unit
             ORDER BY total_sales DESC
             LIMIT 20
-        """, (start_date, end_date))
+        """, range_params)
         
         product_ranking = cursor.fetchall()
         
         cursor.close()
         conn.close()
         
-        # 格式化数据
-        for item in sales_data:
-            item['total_sales'] = float(item['total_sales'])
-            item['total_cost'] = float(item['total_cost'])
-            item['total_profit'] = float(item['total_profit'])
-        
-        summary['total_sales'] = float(summary['total_sales'])
-        summary['total_cost'] = float(summary['total_cost'])
-        summary['total_profit'] = float(summary['total_profit'])
-        
-        for item in product_ranking:
-            item['total_sales'] = float(item['total_sales'])
-            item['total_profit'] = float(item['total_profit'])
-        
         return jsonify({
             'success': True,
             'data': {
@@ -262,6 +242,12 @@ def get_sales_report():
             }
         })
         
+    except ValueError as e:
+        # 日期格式不正确（见 utils.helpers.parse_date）
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -282,96 +268,85 @@ def get_purchase_report():
                 'message': '请指定开始日期和结束日期'
             })
         
+        # 日期区间条件：半开区间 [开始日期, 结束日期+1)，直接比较列本身以便走索引范围扫描
+        apply_time_range, range_params = date_range_filter('apply_time', start_date, end_date)
+        incoming_date_range, _ = date_range_filter('incoming_date', start_date, end_date)
+        io_incoming_date_range, _ = date_range_filter('io.incoming_date', start_date, end_date)
+        
         conn = get_db_dict_connection()
         cursor = conn.cursor()
         
         # 采购申请统计
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT 
                 status,
                 COUNT(*) as count,
                 COALESCE(SUM(total_amount), 0) as total_amount
             FROM purchase_orders
-            WHERE DATE(apply_time) >= %s AND DATE(apply_time) <= %s
+            WHERE {apply_time_range}
             GROUP BY status
-        """, (start_date, end_date))
+        """, range_params)
         
         purchase_orders_stats = cursor.fetchall()
         
         # 进货统计
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT 
                 incoming_date,
                 COUNT(*) as order_count,
                 COALESCE(SUM(total_amount), 0) as total_amount
             FROM incoming_orders
-            WHERE incoming_date >= %s AND incoming_date <= %s
+            WHERE {incoming_date_range}
             GROUP BY incoming_date
             ORDER BY incoming_date
-        """, (start_date, end_date))
+        """, range_params)
         
         incoming_data = cursor.fetchall()
         
         # 供应商采购排行
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT s.name as supplier_name,
                    COUNT(io.id) as order_count,
                    COALESCE(SUM(io.total_amount), 0) as total_amount
             FROM incoming_orders io
             INNER JOIN suppliers s ON io.supplier_id = s.id
-            WHERE io.incoming_date >= %s AND io.incoming_date <= %s
+            WHERE {io_incoming_date_range}
             GROUP BY io.supplier_id, s.name
             ORDER BY total_amount DESC
             LIMIT 10
-        """, (start_date, end_date))
+        """, range_params)
         
         supplier_ranking = cursor.fetchall()
         
         # 商品进货排行
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT p.name, p.unit, SUM(id.quantity) as total_quantity,
                    SUM(id.amount) as total_amount
             FROM incoming_details id
             INNER JOIN incoming_orders io ON id.incoming_id = io.id
             INNER JOIN products p ON id.product_id = p.id
-            WHERE io.incoming_date >= %s AND io.incoming_date <= %s
+            WHERE {io_incoming_date_range}
             GROUP BY id.product_id, p.name, p.unit
             ORDER BY total_amount DESC
             LIMIT 20
-        """, (start_date, end_date))
+        """, range_params)
         
         product_ranking = cursor.fetchall()
         
         # 总计
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT 
                 COUNT(*) as total_incoming_orders,
                 COALESCE(SUM(total_amount), 0) as total_incoming_amount
             FROM incoming_orders
-            WHERE incoming_date >= %s AND incoming_date <= %s
-        """, (start_date, end_date))
+            WHERE {incoming_date_range}
+        """, range_params)
         
         summary = cursor.fetchone()
         
         cursor.close()
         conn.close()
         
-        # 格式化数据
-        for item in purchase_orders_stats:
-            item['total_amount'] = float(item['total_amount'])
-        
-        for item in incoming_data:
-            item['incoming_date'] = format_date(item['incoming_date'])
-            item['total_amount'] = float(item['total_amount'])
-        
-        for item in supplier_ranking:
-            item['total_amount'] = float(item['total_amount'])
-        
-        for item in product_ranking:
-            item['total_amount'] = float(item['total_amount'])
-        
-        summary['total_incoming_amount'] = float(summary['total_incoming_amount'])
-        
         return jsonify({
             'success': True,
             'data': {
@@ -384,6 +359,12 @@ def get_purchase_report():
             }
         })
         
+    except ValueError as e:
+        # 日期格式不正确（见 utils.helpers.parse_date）
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -469,22 +450,6 @@ def get_inventory_report():
         cursor.close()
         conn.close()
         
-        # 格式化数据
-        overview['total_value'] = float(overview['total_value'])
-        
-        for item in by_category:
-            item['total_value'] = float(item['total_value'])
-        
-        for item in zero_stock:
-            item['selling_price'] = float(item['selling_price'])
-        
-        for item in low_stock:
-            item['selling_price'] = float(item['selling_price'])
-        
-        for item in high_value:
-            item['selling_price'] = float(item['selling_price'])
-            item['total_value'] = float(item['total_value'])
-        
         return jsonify({
             'success': True,
             'data': {
@@ -518,6 +483,10 @@ def get_profit_report():
                 'message': '请指定开始日期和结束日期'
             })
         
+        # 日期区间条件：半开区间 [开始日期, 结束日期+1)，直接比较列本身以便走索引范围扫描
+        sale_date_range, range_params = date_range_filter('sale_date', start_date, end_date)
+        r_sale_date_range, _ = date_range_filter('r.sale_date', start_date, end_date)
+        
         conn = get_db_dict_connection()
         cursor = conn.cursor()
         
@@ -535,69 +504,53 @@ def get_profit_report():
         cursor.execute(f"""
             SELECT 
                 {group_field} as period,
-                COALESCE(SUM(total_amount), 0) as total_sales,
+                COALESCE(SUM(total_sales), 0) as total_sales,
                 COALESCE(SUM(total_cost), 0) as total_cost,
-                COALESCE(SUM(profit), 0) as total_profit,
-                ROUND(COALESCE(SUM(profit) / SUM(total_amount) * 100, 0), 2) as profit_rate
-            FROM outgoing_orders
-            WHERE sale_date >= %s AND sale_date <= %s
+                COALESCE(SUM(total_profit), 0) as total_profit,
+                ROUND(COALESCE(SUM(total_profit) / SUM(total_sales) * 100, 0), 2) as profit_rate
+            FROM sales_daily_totals
+            WHERE {sale_date_range}
             GROUP BY {group_field}
             ORDER BY period
-        """, (start_date, end_date))
+        """, range_params)
         
         profit_data = cursor.fetchall()
         
         # 商品利润排行
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT p.name, p.unit, 
-                   SUM(od.quantity) as total_quantity,
-                   SUM(od.amount) as total_sales,
-                   SUM(od.cost_amount) as total_cost,
-                   SUM(od.profit) as total_profit,
-                   ROUND(SUM(od.profit) / SUM(od.amount) * 100, 2) as profit_rate
-            FROM outgoing_details od
-            INNER JOIN outgoing_orders oo ON od.outgoing_id = oo.id
-            INNER JOIN products p ON od.product_id = p.id
-            WHERE oo.sale_date >= %s AND oo.sale_date <= %s
-            GROUP BY od.product_id, p.name, p.unit
+                   SUM(r.quantity) as total_quantity,
+                   SUM(r.sales_amount) as total_sales,
+                   SUM(r.cost_amount) as total_cost,
+                   SUM(r.profit) as total_profit,
+                   ROUND(SUM(r.profit) / SUM(r.sales_amount) * 100, 2) as profit_rate
+            FROM sales_daily_rollup r
+            INNER JOIN products p ON r.product_id = p.id
+            WHERE {r_sale_date_range}
+            GROUP BY r.product_id, p.name, p.unit
             HAVING total_profit > 0
             ORDER BY total_profit DESC
             LIMIT 20
-        """, (start_date, end_date))
+        """, range_params)
         
         product_profit = cursor.fetchall()
         
         # 总计
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT 
-                COALESCE(SUM(total_amount), 0) as total_sales,
+                COALESCE(SUM(total_sales), 0) as total_sales,
                 COALESCE(SUM(total_cost), 0) as total_cost,
-                COALESCE(SUM(profit), 0) as total_profit,
-                ROUND(COALESCE(SUM(profit) / SUM(total_amount) * 100, 0), 2) as profit_rate
-            FROM outgoing_orders
-            WHERE sale_date >= %s AND sale_date <= %s
-        """, (start_date, end_date))
+                COALESCE(SUM(total_profit), 0) as total_profit,
+                ROUND(COALESCE(SUM(total_profit) / SUM(total_sales) * 100, 0), 2) as profit_rate
+            FROM sales_daily_totals
+            WHERE {sale_date_range}
+        """, range_params)
         
         summary = cursor.fetchone()
         
         cursor.close()
         conn.close()
         
-        # 格式化数据
-        for item in profit_data:
-            item['total_sales'] = float(item['total_sales'])
-            item['total_cost'] = float(item['total_cost'])
-            item['total_profit'] = float(item['total_profit'])
-        
-        for item in product_profit:
-            item['total_sales'] = float(item['total_sales'])
-            item['total_cost'] = float(item['total_cost'])
-            item['total_profit'] = float(item['total_profit'])
-        
-        summary['total_sales'] = float(summary['total_sales'])
-        summary['total_cost'] = float(summary['total_cost'])
-        summary['total_profit'] = float(summary['total_profit'])
-        
         return jsonify({
             'success': True,
             'data': {
@@ -609,6 +562,12 @@ def get_profit_report():
             }
         })
         
+    except ValueError as e:
+        # 日期格式不正确（见 utils.helpers.parse_date）
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -2,9 +2,13 @@
 销售管理API模块
 """
 from flask import Blueprint, request, jsonify
-from utils.database import get_db_connection, get_db_dict_connection
+from utils.database import get_db_dict_connection, db_connection, values_table, retry_on_deadlock
 from utils.auth import login_required, get_current_user
-from utils.helpers import validate_required_fields, generate_order_no, format_datetime, format_date, safe_float, safe_int
+from utils.rollup import update_sales_rollup
+from utils.helpers import validate_required_fields, generate_order_no, safe_float, safe_int
+from utils.cache import invalidate_dashboard, bump_data_generation
+from utils.barcode import refresh_codes
+from utils.pagination import Pagination, PaginationError
 from datetime import datetime
 
 sales_bp = Blueprint('sales', __name__)
@@ -14,8 +18,7 @@ sales_bp = Blueprint('sales', __name__)
 def get_outgoing_orders():
     """获取销售订单列表（分页）"""
     try:
-        page = int(request.args.get('page', 1))
-        size = int(request.args.get('size', 10))
+        pager = Pagination.from_request([('oo.sale_date', 'DESC', 'sale_date'), ('oo.created_at', 'DESC', 'created_at'), ('oo.id', 'DESC', 'id')])
         search = request.args.get('search', '').strip()
         customer_id = request.args.get('customer_id', '').strip()
         start_date = request.args.get('start_date', '').strip()
@@ -48,7 +51,7 @@ def get_outgoing_orders():
         if where_conditions:
             where_clause = "WHERE " + " AND ".join(where_conditions)
         
-        # 计数查询
+        # 计数查询（统计方式由 count 参数决定）
         count_query = f"""
             SELECT COUNT(*) 
             FROM outgoing_orders oo
@@ -56,11 +59,10 @@ def get_outgoing_orders():
             LEFT JOIN users u ON oo.user_id = u.id
             {where_clause}
         """
-        cursor.execute(count_query, params)
-        total = cursor.fetchone()['COUNT(*)']
+        total = pager.count(cursor, count_query, params, table='outgoing_orders')
         
         # 数据查询
-        offset = (page - 1) * size
+        data_where, data_params = pager.where(where_conditions, params)
         data_query = f"""
             SELECT oo.id, oo.order_no, oo.customer_id, c.name as customer_name,
                    oo.total_amount, oo.total_cost, oo.profit,
@@ -69,40 +71,27 @@ def get_outgoing_orders():
             FROM outgoing_orders oo
             LEFT JOIN customers c ON oo.customer_id = c.id
             LEFT JOIN users u ON oo.user_id = u.id
-            {where_clause}
-            ORDER BY oo.sale_date DESC, oo.created_at DESC
-            LIMIT %s OFFSET %s
+            {data_where}
+            {pager.order_by}
+            {pager.limit}
         """
-        cursor.execute(data_query, params + [size, offset])
-        orders = cursor.fetchall()
-        
-        # 格式化数据
-        for order in orders:
-            order['total_amount'] = float(order['total_amount']) if order['total_amount'] else 0
-            order['total_cost'] = float(order['total_cost']) if order['total_cost'] else 0
-            order['profit'] = float(order['profit']) if order['profit'] else 0
-            order['sale_date'] = format_date(order['sale_date'])
-            order['created_at'] = format_datetime(order['created_at'])
+        cursor.execute(data_query, data_params + pager.limit_params)
+        orders = pager.page_rows(cursor.fetchall())
         
         cursor.close()
         conn.close()
         
-        # 计算分页信息
-        total_pages = (total + size - 1) // size
-        
         return jsonify({
             'success': True,
             'data': orders,
-            'pagination': {
-                'page': page,
-                'size': size,
-                'total': total,
-                'total_pages': total_pages,
-                'has_prev': page > 1,
-                'has_next': page < total_pages
-            }
+            'pagination': pager.info(total)
         })
         
+    except PaginationError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -154,20 +143,6 @@ def get_outgoing_order(order_id):
         cursor.close()
         conn.close()
         
-        # 格式化数据
-        order['total_amount'] = float(order['total_amount']) if order['total_amount'] else 0
-        order['total_cost'] = float(order['total_cost']) if order['total_cost'] else 0
-        order['profit'] = float(order['profit']) if order['profit'] else 0
-        order['sale_date'] = format_date(order['sale_date'])
-        order['created_at'] = format_datetime(order['created_at'])
-        
-        for detail in details:
-            detail['selling_price'] = float(detail['selling_price'])
-            detail['cost_price'] = float(detail['cost_price'])
-            detail['amount'] = float(detail['amount'])
-            detail['cost_amount'] = float(detail['cost_amount'])
-            detail['profit'] = float(detail['profit'])
-        
         return jsonify({
             'success': True,
             'data': {
@@ -209,213 +184,198 @@ def create_outgoing_order():
                 'message': '销售明细不能为空'
             })
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with db_connection() as conn:
+            return _save_outgoing_order(conn, customer_id, sale_date, details, remark)
         
-        try:
-            # 如果指定了客户，验证客户是否存在
-            if customer_id:
-                cursor.execute("SELECT id FROM customers WHERE id = %s AND status = 'active'", (customer_id,))
-                if not cursor.fetchone():
-                    return jsonify({
-                        'success': False,
-                        'message': '客户不存在或已禁用'
-                    })
-            else:
-                # 获取默认客户（散户）
-                cursor.execute("SELECT id FROM customers WHERE is_default = 1 LIMIT 1")
-                default_customer = cursor.fetchone()
-                if default_customer:
-                    customer_id = default_customer[0]
-            
-            # 验证商品并计算总金额和利润
-            total_amount = 0
-            total_cost = 0
-            total_profit = 0
-            validated_details = []
-            
-            for detail in details:
-                product_id = safe_int(detail.get('product_id'))
-                quantity = safe_int(detail.get('quantity'))
-                selling_price = safe_float(detail.get('selling_price'))
-                cost_price = safe_float(detail.get('cost_price', 0))
-                detail_remark = detail.get('remark', '').strip()
-                
-                if not product_id or quantity <= 0 or selling_price <= 0:
-                    return jsonify({
-                        'success': False,
-                        'message': '销售明细数据不完整或无效'
-                    })
-                
-                # 验证商品是否存在和库存是否充足
-                cursor.execute("""
-                    SELECT p.id, p.selling_price, COALESCE(i.quantity, 0) as stock_quantity
-                    FROM products p
-                    LEFT JOIN inventory i ON p.id = i.product_id
-                    WHERE p.id = %s AND p.status = 'active'
-                """, (product_id,))
-                product = cursor.fetchone()
-                
-                if not product:
-                    return jsonify({
-                        'success': False,
-                        'message': f'商品ID {product_id} 不存在或已禁用'
-                    })
-                
-                if product[2] < quantity:  # stock_quantity
-                    return jsonify({
-                        'success': False,
-                        'message': f'商品ID {product_id} 库存不足，当前库存：{product[2]}'
-                    })
-                
-                # 如果没有指定成本价，使用最近的进货成本价
-                if cost_price <= 0:
-                    cursor.execute("""
-                        SELECT id.cost_price
-                        FROM incoming_details id
-                        INNER JOIN incoming_orders io ON id.incoming_id = io.id
-                        WHERE id.product_id = %s
-                        ORDER BY io.incoming_date DESC, io.created_at DESC
-                        LIMIT 1
-                    """, (product_id,))
-                    last_cost = cursor.fetchone()
-                    cost_price = safe_float(last_cost[0]) if last_cost else 0.0
-                
-                # 统一使用 float 参与计算，避免 float 与 Decimal 混算
-                selling_price = safe_float(selling_price)
-                cost_price = safe_float(cost_price)
-                amount = float(quantity) * selling_price
-                cost_amount = float(quantity) * cost_price
-                profit = amount - cost_amount
-                
-                total_amount += amount
-                total_cost += cost_amount
-                total_profit += profit
-                
-                validated_details.append({
-                    'product_id': product_id,
-                    'quantity': quantity,
-                    'selling_price': selling_price,
-                    'cost_price': cost_price,
-                    'amount': amount,
-                    'cost_amount': cost_amount,
-                    'profit': profit,
-                    'remark': detail_remark
-                })
-            
-            # 生成订单号
-            order_no = generate_order_no('OUT')
-            current_user = get_current_user()
-            
-            # 插入销售订单
-            cursor.execute("""
-                INSERT INTO outgoing_orders (order_no, customer_id, total_amount, 
-                                           total_cost, profit, sale_date, user_id, remark)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """, (order_no, customer_id, float(total_amount), float(total_cost), float(total_profit),
-                  sale_date, current_user['user_id'], remark or None))
-            
-            order_id = cursor.lastrowid
-            
-            # 插入销售明细并更新库存
-            for detail in validated_details:
-                cursor.execute("""
-                    INSERT INTO outgoing_details (outgoing_id, product_id, quantity, 
-                                                selling_price, cost_price, amount, 
-                                                cost_amount, profit, remark)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (order_id, detail['product_id'], int(detail['quantity']),
-                      float(detail['selling_price']), float(detail['cost_price']), float(detail['amount']),
-                      float(detail['cost_amount']), float(detail['profit']), detail['remark'] or None))
-                
-                # 更新库存（减少）
-                cursor.execute("""
-                    UPDATE inventory 
-                    SET quantity = quantity - %s, updated_at = NOW()
-                    WHERE product_id = %s
-                """, (detail['quantity'], detail['product_id']))
-            
-            conn.commit()
-            
-            return jsonify({
-                'success': True,
-                'message': '销售订单创建成功',
-                'data': {
-                    'order_id': order_id,
-                    'order_no': order_no,
-                    'total_amount': total_amount,
-                    'total_cost': total_cost,
-                    'profit': total_profit
-                }
-            })
-            
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
-            
     except Exception as e:
         return jsonify({
             'success': False,
             'message': f'创建销售订单失败: {str(e)}'
         }), 500
 
+@retry_on_deadlock()
+def _save_outgoing_order(conn, customer_id, sale_date, details, remark):
+    """在一个事务内保存销售订单并扣减库存（遇死锁自动重试）"""
+    cursor = conn.cursor()
+    
+    try:
+        # 如果指定了客户，验证客户是否存在
+        if customer_id:
+            cursor.execute("SELECT id FROM customers WHERE id = %s AND status = 'active'", (customer_id,))
+            if not cursor.fetchone():
+                return jsonify({
+                    'success': False,
+                    'message': '客户不存在或已禁用'
+                })
+        else:
+            # 获取默认客户（散户）
+            cursor.execute("SELECT id FROM customers WHERE is_default = 1 LIMIT 1")
+            default_customer = cursor.fetchone()
+            if default_customer:
+                customer_id = default_customer[0]
+    
+        # 先校验明细数据格式，并按商品汇总销售数量
+        parsed_details = []
+        sold_quantities = {}
+        for detail in details:
+            product_id = safe_int(detail.get('product_id'))
+            quantity = safe_int(detail.get('quantity'))
+            selling_price = safe_float(detail.get('selling_price'))
+            cost_price = safe_float(detail.get('cost_price', 0))
+            detail_remark = detail.get('remark', '').strip()
+    
+            if not product_id or quantity <= 0 or selling_price <= 0:
+                return jsonify({
+                    'success': False,
+                    'message': '销售明细数据不完整或无效'
+                })
+    
+            parsed_details.append((product_id, quantity, selling_price, cost_price, detail_remark))
+            sold_quantities[product_id] = sold_quantities.get(product_id, 0) + quantity
+    
+        # 一次查询整单商品的状态、库存和最近进货成本价（成本取自 product_costs），
+        # 并按商品ID顺序加行锁，多台收银机并发结账时不会超卖，也不会交叉等待而死锁
+        product_ids = sorted(sold_quantities)
+        placeholders = ', '.join(['%s'] * len(product_ids))
+        cursor.execute(f"""
+            SELECT p.id, p.selling_price, COALESCE(i.quantity, 0) as stock_quantity,
+                   pc.last_cost_price
+            FROM products p
+            LEFT JOIN inventory i ON p.id = i.product_id
+            LEFT JOIN product_costs pc ON p.id = pc.product_id
+            WHERE p.id IN ({placeholders}) AND p.status = 'active'
+            ORDER BY p.id
+            FOR UPDATE
+        """, product_ids)
+        products = {row[0]: row for row in cursor.fetchall()}
+    
+        # 验证商品并计算总金额和利润
+        total_amount = 0
+        total_cost = 0
+        total_profit = 0
+        validated_details = []
+    
+        for product_id, quantity, selling_price, cost_price, detail_remark in parsed_details:
+            product = products.get(product_id)
+    
+            if not product:
+                return jsonify({
+                    'success': False,
+                    'message': f'商品ID {product_id} 不存在或已禁用'
+                })
+    
+            if product[2] < sold_quantities[product_id]:  # stock_quantity
+                return jsonify({
+                    'success': False,
+                    'message': f'商品ID {product_id} 库存不足，当前库存：{product[2]}'
+                })
+    
+            # 如果没有指定成本价，使用最近的进货成本价
+            if cost_price <= 0:
+                cost_price = safe_float(product[3], 0.0)  # last_cost_price
+    
+            # 统一使用 float 参与计算，避免 float 与 Decimal 混算
+            selling_price = safe_float(selling_price)
+            cost_price = safe_float(cost_price)
+            amount = float(quantity) * selling_price
+            cost_amount = float(quantity) * cost_price
+            profit = amount - cost_amount
+    
+            total_amount += amount
+            total_cost += cost_amount
+            total_profit += profit
+    
+            validated_details.append({
+                'product_id': product_id,
+                'quantity': quantity,
+                'selling_price': selling_price,
+                'cost_price': cost_price,
+                'amount': amount,
+                'cost_amount': cost_amount,
+                'profit': profit,
+                'remark': detail_remark
+            })
+    
+        # 生成订单号
+        order_no = generate_order_no('OUT')
+        current_user = get_current_user()
+    
+        # 插入销售订单
+        cursor.execute("""
+            INSERT INTO outgoing_orders (order_no, customer_id, total_amount, 
+                                       total_cost, profit, sale_date, user_id, remark)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """, (order_no, customer_id, float(total_amount), float(total_cost), float(total_profit),
+              sale_date, current_user['user_id'], remark or None))
+    
+        order_id = cursor.lastrowid
+    
+        # 批量插入销售明细（executemany 会合并为一条多行 INSERT）
+        cursor.executemany("""
+            INSERT INTO outgoing_details (outgoing_id, product_id, quantity, 
+                                        selling_price, cost_price, amount, 
+                                        cost_amount, profit, remark)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, [(order_id, detail['product_id'], int(detail['quantity']),
+               float(detail['selling_price']), float(detail['cost_price']), float(detail['amount']),
+               float(detail['cost_amount']), float(detail['profit']), detail['remark'] or None)
+              for detail in validated_details])
+    
+        # 一次性扣减库存，仅在库存充足时扣减，并以影响行数确认每个商品都扣减成功
+        derived_sql, derived_params = values_table(sold_quantities.items(), ('product_id', 'quantity'))
+        cursor.execute(f"""
+            UPDATE inventory i
+            INNER JOIN ({derived_sql}) d ON i.product_id = d.product_id
+            SET i.quantity = i.quantity - d.quantity, i.updated_at = NOW()
+            WHERE i.quantity >= d.quantity
+        """, derived_params)
+        if cursor.rowcount != len(sold_quantities):
+            conn.rollback()
+            cursor.execute(f"""
+                SELECT product_id, quantity FROM inventory WHERE product_id IN ({placeholders})
+            """, product_ids)
+            stocks = dict(cursor.fetchall())
+            short_id = next((pid for pid in product_ids if stocks.get(pid, 0) < sold_quantities[pid]), product_ids[0])
+            return jsonify({
+                'success': False,
+                'message': f'商品ID {short_id} 库存不足，当前库存：{stocks.get(short_id, 0)}'
+            })
+    
+        # 同一事务内累加销售日汇总
+        update_sales_rollup(cursor, sale_date, (total_amount, total_cost, total_profit), validated_details)
+    
+        conn.commit()
+    
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        cursor.close()
+    
+    # 提交后的缓存失效与条码映射刷新放在事务之外，失败只记录日志
+    invalidate_dashboard('sales', 'inventory')
+    bump_data_generation()
+    refresh_codes(product_ids)
+    
+    return jsonify({
+        'success': True,
+        'message': '销售订单创建成功',
+        'data': {
+            'order_id': order_id,
+            'order_no': order_no,
+            'total_amount': total_amount,
+            'total_cost': total_cost,
+            'profit': total_profit
+        }
+    })
+
 @sales_bp.route('/api/outgoing-orders/<int:order_id>', methods=['DELETE'])
 @login_required
 def delete_outgoing_order(order_id):
     """删除销售订单（退货）"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # 检查订单是否存在
-        cursor.execute("SELECT id FROM outgoing_orders WHERE id = %s", (order_id,))
-        if not cursor.fetchone():
-            cursor.close()
-            conn.close()
-            return jsonify({
-                'success': False,
-                'message': '销售订单不存在'
-            })
-        
-        try:
-            # 获取订单明细用于恢复库存
-            cursor.execute("""
-                SELECT product_id, quantity 
-                FROM outgoing_details 
-                WHERE outgoing_id = %s
-            """, (order_id,))
-            details = cursor.fetchall()
-            
-            # 恢复库存
-            for detail in details:
-                cursor.execute("""
-                    UPDATE inventory 
-                    SET quantity = quantity + %s, updated_at = NOW()
-                    WHERE product_id = %s
-                """, (detail[1], detail[0]))  # quantity, product_id
-            
-            # 删除销售明细
-            cursor.execute("DELETE FROM outgoing_details WHERE outgoing_id = %s", (order_id,))
-            
-            # 删除销售订单
-            cursor.execute("DELETE FROM outgoing_orders WHERE id = %s", (order_id,))
-            
-            conn.commit()
-            
-            return jsonify({
-                'success': True,
-                'message': '销售订单删除成功，库存已恢复'
-            })
-            
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+        with db_connection() as conn:
+            return _delete_outgoing_order(conn, order_id)
             
     except Exception as e:
         return jsonify({
@@ -423,6 +383,87 @@ def delete_outgoing_order(order_id):
             'message': f'删除销售订单失败: {str(e)}'
         }), 500
 
+@retry_on_deadlock()
+def _delete_outgoing_order(conn, order_id):
+    """在一个事务内删除销售订单并恢复库存（遇死锁自动重试）"""
+    cursor = conn.cursor()
+    
+    try:
+        # 检查订单是否存在（锁定订单，防止重复删除导致汇总重复扣减）
+        cursor.execute("""
+            SELECT id, sale_date, total_amount, total_cost, profit
+            FROM outgoing_orders WHERE id = %s FOR UPDATE
+        """, (order_id,))
+        order = cursor.fetchone()
+        if not order:
+            conn.rollback()
+            return jsonify({
+                'success': False,
+                'message': '销售订单不存在'
+            })
+        
+        # 获取订单明细用于恢复库存和扣减销售日汇总
+        cursor.execute("""
+            SELECT product_id, quantity, amount, cost_amount, profit
+            FROM outgoing_details 
+            WHERE outgoing_id = %s
+        """, (order_id,))
+        details = cursor.fetchall()
+        
+        restock_quantities = {}
+        for detail in details:
+            restock_quantities[detail[0]] = restock_quantities.get(detail[0], 0) + detail[1]
+        product_ids = sorted(restock_quantities)
+        
+        # 与结账相同，先按商品ID顺序锁定库存行，再一次性恢复库存，
+        # 退货与并发结账交叉时不会因加锁顺序不同而死锁
+        if product_ids:
+            placeholders = ', '.join(['%s'] * len(product_ids))
+            cursor.execute(f"""
+                SELECT product_id FROM inventory
+                WHERE product_id IN ({placeholders})
+                ORDER BY product_id
+                FOR UPDATE
+            """, product_ids)
+            derived_sql, derived_params = values_table(
+                [(product_id, restock_quantities[product_id]) for product_id in product_ids],
+                ('product_id', 'quantity'))
+            cursor.execute(f"""
+                UPDATE inventory i
+                INNER JOIN ({derived_sql}) d ON i.product_id = d.product_id
+                SET i.quantity = i.quantity + d.quantity, i.updated_at = NOW()
+            """, derived_params)
+        
+        # 扣减销售日汇总
+        update_sales_rollup(cursor, order[1], tuple(value or 0 for value in order[2:5]), [
+            {'product_id': detail[0], 'quantity': detail[1], 'amount': detail[2],
+             'cost_amount': detail[3], 'profit': detail[4]}
+            for detail in details
+        ], sign=-1)
+        
+        # 删除销售明细
+        cursor.execute("DELETE FROM outgoing_details WHERE outgoing_id = %s", (order_id,))
+        
+        # 删除销售订单
+        cursor.execute("DELETE FROM outgoing_orders WHERE id = %s", (order_id,))
+        
+        conn.commit()
+        
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        cursor.close()
+    
+    invalidate_dashboard('sales', 'inventory')
+    bump_data_generation()
+    refresh_codes(product_ids)
+    
+    return jsonify({
+        'success': True,
+        'message': '销售订单删除成功，库存已恢复'
+    })
+
 @sales_bp.route('/api/sales/daily-summary', methods=['GET'])
 @login_required
 def get_daily_sales_summary():
@@ -433,14 +474,14 @@ def get_daily_sales_summary():
         conn = get_db_dict_connection()
         cursor = conn.cursor()
         
-        # 获取当日销售汇总
+        # 获取当日销售汇总（读取销售日汇总表）
         cursor.execute("""
             SELECT 
-                COUNT(*) as order_count,
-                COALESCE(SUM(total_amount), 0) as total_sales,
+                COALESCE(SUM(order_count), 0) as order_count,
+                COALESCE(SUM(total_sales), 0) as total_sales,
                 COALESCE(SUM(total_cost), 0) as total_cost,
-                COALESCE(SUM(profit), 0) as total_profit
-            FROM outgoing_orders
+                COALESCE(SUM(total_profit), 0) as total_profit
+            FROM sales_daily_totals
             WHERE sale_date = %s
         """, (date,))
         
@@ -448,13 +489,12 @@ def get_daily_sales_summary():
         
         # 获取商品销售排行
         cursor.execute("""
-            SELECT p.name, p.unit, SUM(od.quantity) as total_quantity,
-                   SUM(od.amount) as total_amount, SUM(od.profit) as total_profit
-            FROM outgoing_details od
-            INNER JOIN outgoing_orders oo ON od.outgoing_id = oo.id
-            INNER JOIN products p ON od.product_id = p.id
-            WHERE oo.sale_date = %s
-            GROUP BY od.product_id, p.name, p.unit
+            SELECT p.name, p.unit, SUM(r.quantity) as total_quantity,
+                   SUM(r.sales_amount) as total_amount, SUM(r.profit) as total_profit
+            FROM sales_daily_rollup r
+            INNER JOIN products p ON r.product_id = p.id
+            WHERE r.sale_date = %s
+            GROUP BY r.product_id, p.name, p.unit
             ORDER BY total_amount DESC
             LIMIT 10
         """, (date,))
@@ -464,15 +504,6 @@ def get_daily_sales_summary():
         cursor.close()
         conn.close()
         
-        # 格式化数据
-        summary['total_sales'] = float(summary['total_sales'])
-        summary['total_cost'] = float(summary['total_cost'])
-        summary['total_profit'] = float(summary['total_profit'])
-        
-        for product in top_products:
-            product['total_amount'] = float(product['total_amount'])
-            product['total_profit'] = float(product['total_profit'])
-        
         return jsonify({
             'success': True,
             'data': {
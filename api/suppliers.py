@@ -4,7 +4,10 @@
 from flask import Blueprint, request, jsonify
 from utils.database import get_db_connection, get_db_dict_connection
 from utils.auth import login_required, manager_required
-from utils.helpers import validate_required_fields, validate_phone, format_datetime
+from utils.helpers import validate_required_fields, validate_phone, safe_int, date_range_filter
+from utils.pagination import Pagination, PaginationError
+from utils.cache import bump_data_generation
+from utils.search import keyword_condition
 
 suppliers_bp = Blueprint('suppliers', __name__)
 
@@ -13,8 +16,7 @@ suppliers_bp = Blueprint('suppliers', __name__)
 def get_suppliers():
     """获取供应商列表（分页）"""
     try:
-        page = int(request.args.get('page', 1))
-        size = int(request.args.get('size', 10))
+        pager = Pagination.from_request([('created_at', 'DESC', 'created_at'), ('id', 'DESC', 'id')])
         search = request.args.get('search', '').strip()
         status = request.args.get('status', '').strip()
         
@@ -26,8 +28,9 @@ def get_suppliers():
         params = []
         
         if search:
-            where_conditions.append("(name LIKE %s OR contact_person LIKE %s)")
-            params.extend([f'%{search}%', f'%{search}%'])
+            condition, condition_params = keyword_condition('suppliers', search, ['name', 'contact_person'])
+            where_conditions.append(condition)
+            params.extend(condition_params)
         
         if status:
             where_conditions.append("status = %s")
@@ -37,46 +40,36 @@ def get_suppliers():
         if where_conditions:
             where_clause = "WHERE " + " AND ".join(where_conditions)
         
-        # 计数查询
+        # 计数查询（统计方式由 count 参数决定）
         count_query = f"SELECT COUNT(*) FROM suppliers {where_clause}"
-        cursor.execute(count_query, params)
-        total = cursor.fetchone()['COUNT(*)']
+        total = pager.count(cursor, count_query, params, table='suppliers')
         
         # 数据查询
-        offset = (page - 1) * size
+        data_where, data_params = pager.where(where_conditions, params)
         data_query = f"""
             SELECT id, name, contact_person, phone, address, status, created_at, remark
             FROM suppliers 
-            {where_clause}
-            ORDER BY created_at DESC
-            LIMIT %s OFFSET %s
+            {data_where}
+            {pager.order_by}
+            {pager.limit}
         """
-        cursor.execute(data_query, params + [size, offset])
-        suppliers = cursor.fetchall()
-        
-        # 格式化数据
-        for supplier in suppliers:
-            supplier['created_at'] = format_datetime(supplier['created_at'])
+        cursor.execute(data_query, data_params + pager.limit_params)
+        suppliers = pager.page_rows(cursor.fetchall())
         
         cursor.close()
         conn.close()
         
-        # 计算分页信息
-        total_pages = (total + size - 1) // size
-        
         return jsonify({
             'success': True,
             'data': suppliers,
-            'pagination': {
-                'page': page,
-                'size': size,
-                'total': total,
-                'total_pages': total_pages,
-                'has_prev': page > 1,
-                'has_next': page < total_pages
-            }
+            'pagination': pager.info(total)
         })
         
+    except PaginationError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -107,9 +100,6 @@ def get_supplier(supplier_id):
                 'message': '供应商不存在'
             }), 404
         
-        # 格式化数据
-        supplier['created_at'] = format_datetime(supplier['created_at'])
-        
         return jsonify({
             'success': True,
             'data': supplier
@@ -175,6 +165,7 @@ def create_supplier():
         
         cursor.close()
         conn.close()
+        bump_data_generation()
         
         return jsonify({
             'success': True,
@@ -288,6 +279,7 @@ def update_supplier(supplier_id):
         
         cursor.close()
         conn.close()
+        bump_data_generation()
         
         return jsonify({
             'success': True,
@@ -344,6 +336,7 @@ def delete_supplier(supplier_id):
         
         cursor.close()
         conn.close()
+        bump_data_generation()
         
         return jsonify({
             'success': True,
@@ -369,18 +362,25 @@ def search_suppliers():
         
         where_clause = "WHERE status = 'active'"
         params = []
+        order_by = "ORDER BY name"
+        order_params = []
         
         if keyword:
-            where_clause += " AND (name LIKE %s OR contact_person LIKE %s)"
-            params.extend([f'%{keyword}%', f'%{keyword}%'])
+            condition, condition_params = keyword_condition('suppliers', keyword, ['name', 'contact_person'])
+            where_clause += f" AND {condition}"
+            params.extend(condition_params)
+            if condition.startswith('MATCH'):
+                # 全文索引按相关度排序
+                order_by = f"ORDER BY {condition} DESC, name"
+                order_params = condition_params
         
         cursor.execute(f"""
             SELECT id, name, contact_person, phone, address
             FROM suppliers
             {where_clause}
-            ORDER BY name
+            {order_by}
             LIMIT %s
-        """, params + [limit])
+        """, params + order_params + [limit])
         
         suppliers = cursor.fetchall()
         
@@ -405,8 +405,11 @@ def search_suppliers():
 def get_suppliers_payables():
     """获取存在未付款采购单（delivered/stock）的供应商列表（分页汇总）"""
     try:
-        page = int(request.args.get('page', 1))
-        size = int(request.args.get('size', 10))
+        # 按汇总金额排序，只支持页码分页
+        pager = Pagination([('unpaid_amount', 'DESC', 'unpaid_amount'), ('s.id', 'DESC', 'supplier_id')],
+                           page=safe_int(request.args.get('page', 1), 1),
+                           size=safe_int(request.args.get('size', 10), 10),
+                           count_strategy=request.args.get('count', '').strip().lower() or None)
         search = request.args.get('search', '').strip()
 
         conn = get_db_dict_connection()
@@ -415,8 +418,9 @@ def get_suppliers_payables():
         where_conditions = ["s.status = 'active'"]
         params = []
         if search:
-            where_conditions.append("(s.name LIKE %s OR s.contact_person LIKE %s)")
-            params.extend([f'%{search}%', f'%{search}%'])
+            condition, condition_params = keyword_condition('suppliers', search, ['s.name', 's.contact_person'], 's')
+            where_conditions.append(condition)
+            params.extend(condition_params)
         where_clause = " AND ".join(where_conditions)
 
         # 计数（distinct 供应商）
@@ -430,10 +434,8 @@ def get_suppliers_payables():
               GROUP BY s.id
             ) t
         """
-        cursor.execute(count_sql, params)
-        total = cursor.fetchone()['COUNT(*)']
+        total = pager.count(cursor, count_sql, params)
 
-        offset = (page - 1) * size
         data_sql = f"""
             SELECT s.id as supplier_id, s.name, s.contact_person, s.phone,
                    COUNT(po.id) as unpaid_count,
@@ -443,11 +445,11 @@ def get_suppliers_payables():
                AND po.status IN ('delivered','stock')
             WHERE {where_clause}
             GROUP BY s.id, s.name, s.contact_person, s.phone
-            ORDER BY unpaid_amount DESC
-            LIMIT %s OFFSET %s
+            {pager.order_by}
+            {pager.limit}
         """
-        cursor.execute(data_sql, params + [size, offset])
-        rows = cursor.fetchall()
+        cursor.execute(data_sql, params + pager.limit_params)
+        rows = pager.page_rows(cursor.fetchall())
 
         for r in rows:
             r['unpaid_amount'] = float(r['unpaid_amount'])
@@ -455,19 +457,13 @@ def get_suppliers_payables():
         cursor.close()
         conn.close()
 
-        total_pages = (total + size - 1) // size
         return jsonify({
             'success': True,
             'data': rows,
-            'pagination': {
-                'page': page,
-                'size': size,
-                'total': total,
-                'total_pages': total_pages,
-                'has_prev': page > 1,
-                'has_next': page < total_pages
-            }
+            'pagination': pager.info(total)
         })
+    except PaginationError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'message': f'获取应付供应商失败: {str(e)}'}), 500
 
@@ -487,16 +483,24 @@ def get_supplier_payable_orders(supplier_id):
             cursor.close(); conn.close()
             return jsonify({'success': False, 'message': '供应商不存在'}), 404
 
-        # 订单列表
+        # 订单列表（可按申请日期区间筛选）
+        where_conditions = ["po.supplier_id = %s", "po.status IN ('delivered','stock')"]
+        params = [supplier_id]
+        start_date = request.args.get('start_date', '').strip()
+        end_date = request.args.get('end_date', '').strip()
+        if start_date or end_date:
+            date_condition, date_params = date_range_filter('po.apply_time', start_date, end_date)
+            where_conditions.append(date_condition)
+            params.extend(date_params)
         cursor.execute(
-            """
+            f"""
             SELECT po.id, po.order_no, po.status, po.total_amount,
                    po.apply_time, po.approve_time
             FROM purchase_orders po
-            WHERE po.supplier_id = %s AND po.status IN ('delivered','stock')
+            WHERE {' AND '.join(where_conditions)}
             ORDER BY po.apply_time DESC
             """,
-            (supplier_id,)
+            params
         )
         orders = cursor.fetchall()
 
@@ -523,14 +527,15 @@ def get_supplier_payable_orders(supplier_id):
         # 格式化金额
         for o in orders:
             o['total_amount'] = float(o['total_amount']) if o['total_amount'] else 0
-            o['apply_time'] = format_datetime(o['apply_time'])
-            o['approve_time'] = format_datetime(o['approve_time'])
         for d in details:
             d['cost_price'] = float(d['cost_price'])
             d['amount'] = float(d['amount'])
 
         cursor.close(); conn.close()
         return jsonify({'success': True, 'data': {'supplier': sup, 'orders': orders, 'details': details}})
+    except ValueError as e:
+        # 日期格式不正确
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'message': f'获取未付款订单失败: {str(e)}'}), 500
 
@@ -575,6 +580,7 @@ def settle_supplier_payables(supplier_id):
             conn.rollback(); raise e
         finally:
             cursor.close(); conn.close()
+        bump_data_generation()
 
         return jsonify({
             'success': True,
@@ -4,6 +4,7 @@
 from flask import Flask, request, jsonify, session, render_template, redirect, url_for
 from werkzeug.exceptions import HTTPException
 import os
+import threading
 import traceback
 
 # 导入API蓝图
@@ -15,16 +16,27 @@ from api.purchase import purchase_bp
 from api.sales import sales_bp
 from api.inventory import inventory_bp
 from api.reports import reports_bp
+from api.debug import debug_bp
 from printing import printing_bp
+from utils.auth import manager_page_required
+from utils.database import get_pool_stats, begin_request_stats, end_request_stats, sql_logger
+from utils.barcode import warm_code_map
+from utils.search import get_search_index
+from utils.metrics import register_metrics
+from utils.profiler import register_profiler
+from utils.json_provider import ShopJSONProvider
+from utils.http_cache import register_http_cache
+from utils.cache import cache_logger
+from commands import register_commands
 
 def create_app(config=None):
     """创建Flask应用"""
     app = Flask(__name__)
+    # JSON 直接编码 Decimal/日期，紧凑输出、中文不转义（见 utils/json_provider.py）
+    app.json = ShopJSONProvider(app)
     
     # 应用配置
     app.config['SECRET_KEY'] = 'your-secret-key-change-this-in-production'
-    app.config['JSON_AS_ASCII'] = False  # 支持中文JSON
-    app.config['JSONIFY_PRETTYPRINT_REGULAR'] = True  # 美化JSON输出
     
     # 数据库配置
     app.config['DATABASE'] = {
@@ -46,6 +58,16 @@ def create_app(config=None):
     app.register_blueprint(inventory_bp)
     app.register_blueprint(reports_bp)
     app.register_blueprint(printing_bp)
+    app.register_blueprint(debug_bp)
+    
+    # 注册维护命令
+    register_commands(app)
+    
+    # 请求监控指标（/metrics）
+    register_metrics(app)
+    
+    # 请求采样剖析（默认关闭，见 utils/profiler.py 的 PROFILER_CONFIG）
+    register_profiler(app)
     
     # 全局错误处理
     @app.errorhandler(Exception)
@@ -89,6 +111,9 @@ def create_app(config=None):
         # 打印请求信息（开发模式）
         if app.debug:
             print(f'{request.method} {request.path} - {request.remote_addr}')
+        
+        # 初始化本请求的 SQL 统计
+        begin_request_stats()
     
     # 请求后处理
     @app.after_request
@@ -97,7 +122,12 @@ def create_app(config=None):
         response.headers['Access-Control-Allow-Origin'] = '*'
         response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
         response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
-        return response
+        response.headers['Access-Control-Expose-Headers'] = 'X-DB-Queries, X-DB-Time'
+        # SQL 语句数与耗时（毫秒），同时检查疑似 N+1 查询
+        return end_request_stats(response)
+    
+    # 条件 GET（ETag/304）与响应压缩，见 utils/http_cache.py
+    register_http_cache(app)
     
     # 健康检查端点
     @app.route('/health')
@@ -106,7 +136,8 @@ def create_app(config=None):
         return jsonify({
             'success': True,
             'message': '服务正常运行',
-            'version': '1.0.0'
+            'version': '1.0.0',
+            'db_pool': get_pool_stats()
         })
     
     # 页面路由
@@ -171,6 +202,7 @@ def create_app(config=None):
         return render_template('reports.html')
     
     @app.route('/debug')
+    @manager_page_required
     def debug_page():
         """调试页面"""
         return render_template('debug.html')
@@ -185,6 +217,7 @@ def create_app(config=None):
                 'name': '便利店进销存系统',
                 'version': '1.0.0',
                 'description': '基于Flask + MySQL的便利店进销存管理系统',
+                'metrics': 'GET /metrics',
                 'endpoints': {
                     'auth': [
                         'POST /api/auth/login',
@@ -200,7 +233,9 @@ def create_app(config=None):
                         'POST /api/products',
                         'PUT /api/products/{id}',
                         'DELETE /api/products/{id}',
-                        'GET /api/products/search'
+                        'GET /api/products/search',
+                        'GET /api/products/by-code/{code}',
+                        'POST /api/products/by-codes'
                     ],
                     'suppliers': [
                         'GET /api/suppliers',
@@ -251,8 +286,14 @@ def create_app(config=None):
     
     return app
 
-def init_app():
-    """初始化应用"""
+def init_app(warm_async=True):
+    """
+    初始化应用
+
+    Args:
+        warm_async: 是否在后台线程预热缓存。生产服务器预加载应用时传 False，
+            在主进程中同步预热，fork 出的 worker 以写时复制共享预热结果
+    """
     app = create_app()
     
     # 设置日志
@@ -275,10 +316,48 @@ def init_app():
         app.logger.addHandler(file_handler)
         app.logger.setLevel(logging.INFO)
         app.logger.info('便利店进销存系统启动')
+        
+        # 慢查询与疑似 N+1 查询日志
+        sql_handler = RotatingFileHandler(
+            'logs/slow_query.log',
+            maxBytes=10240000,
+            backupCount=10
+        )
+        sql_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s: %(message)s'))
+        sql_logger.addHandler(sql_handler)
+        sql_logger.setLevel(logging.INFO)
+        
+        # 提交后缓存失效等副作用的失败记入应用日志
+        cache_logger.addHandler(file_handler)
+        cache_logger.setLevel(logging.INFO)
+    
+    # 预热收银扫码用的 编码 -> 商品 映射（后台预热时不阻塞启动），失败时首次扫码再加载
+    def warm():
+        try:
+            app.logger.info(f'条码映射预热完成，共 {warm_code_map()} 个商品')
+        except Exception as e:
+            app.logger.warning(f'条码映射预热失败: {str(e)}')
+    
+    if warm_async:
+        threading.Thread(target=warm, name='warm-code-map', daemon=True).start()
+    else:
+        warm()
+        try:
+            get_search_index()
+        except Exception as e:
+            app.logger.warning(f'商品搜索索引预热失败: {str(e)}')
     
     return app
 
 if __name__ == '__main__':
+    import sys
+    
+    if '--dev' not in sys.argv[1:]:
+        # 生产模式：预派生多进程 + 多线程服务器（见 serve.py）
+        from serve import main
+        main()
+        sys.exit(0)
+    
     app = init_app()
     
     print("=" * 50)
@@ -290,10 +369,10 @@ if __name__ == '__main__':
     print(f"健康检查: http://localhost:5000/health")
     print("=" * 50)
     
-    # 启动开发服务器
+    # 启动开发服务器（自动重载与调试器，仅用于开发）
     app.run(
         host='0.0.0.0',
         port=5000,
         debug=True,
         threaded=True
-    )
\ No newline at end of file
+    )
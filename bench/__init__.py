@@ -0,0 +1,6 @@
+"""
+性能基准测试（需要本地 MySQL，且已导入 init_database.sql）
+
+运行方式（在项目根目录）:
+    python -m bench.checkout_latency
+"""
@@ -0,0 +1,50 @@
+"""
+结账延迟 vs 购物车行数基准
+
+对不同行数的购物车反复调用 POST /api/outgoing-orders，记录延迟；
+每单完成后调用 DELETE 退货以恢复库存，保证多轮运行结果可比。
+
+    python -m bench.checkout_latency --sizes 1,5,10,20,40 --repeat 30
+"""
+import argparse
+from datetime import date
+
+from bench.common import ensure_bench_products, login_client, summarize, timed
+
+
+def run(sizes, repeat):
+    client = login_client()
+    product_ids = ensure_bench_products(max(sizes))
+    results = []
+
+    for size in sizes:
+        basket = [
+            {'product_id': product_id, 'quantity': 1, 'selling_price': 9.9}
+            for product_id in product_ids[:size]
+        ]
+        payload = {'sale_date': date.today().isoformat(), 'details': basket, 'remark': 'bench'}
+        samples = []
+        for _ in range(repeat):
+            resp, elapsed = timed(client.post, '/api/outgoing-orders', json=payload)
+            data = resp.get_json() or {}
+            if not data.get('success'):
+                raise SystemExit(f"结账失败: {data.get('message')}")
+            samples.append(elapsed)
+            client.delete(f"/api/outgoing-orders/{data['data']['order_id']}")
+        row = {'basket_size': size, **summarize(samples)}
+        results.append(row)
+        print(f"basket={size:>3}  p50={row['p50_ms']:>8.2f}ms  p95={row['p95_ms']:>8.2f}ms  mean={row['mean_ms']:>8.2f}ms")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='结账延迟 vs 购物车行数')
+    parser.add_argument('--sizes', default='1,5,10,20,40', help='购物车行数列表，逗号分隔')
+    parser.add_argument('--repeat', type=int, default=30, help='每个行数的重复次数')
+    args = parser.parse_args()
+    run([int(s) for s in args.sizes.split(',')], args.repeat)
+
+
+if __name__ == '__main__':
+    main()
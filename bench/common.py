@@ -0,0 +1,86 @@
+"""
+基准测试公共工具
+"""
+import statistics
+import time
+
+from app import create_app
+from utils.database import get_db_connection
+
+BENCH_CODE_PREFIX = 'BENCH'
+
+
+def login_client(username='admin', password='123456'):
+    """创建已登录的测试客户端"""
+    app = create_app()
+    client = app.test_client()
+    resp = client.post('/api/auth/login', json={'username': username, 'password': password})
+    data = resp.get_json() or {}
+    if not data.get('success'):
+        raise SystemExit(f"登录失败: {data.get('message')}")
+    return client
+
+
+def ensure_bench_products(count, stock=100000):
+    """
+    确保存在 count 个基准测试商品（编码 BENCH00001...）且库存充足
+
+    Returns:
+        list: 商品ID列表（按编码排序）
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT COUNT(*) FROM products WHERE code LIKE %s", (f'{BENCH_CODE_PREFIX}%',))
+        existing = cursor.fetchone()[0]
+        if existing < count:
+            cursor.executemany("""
+                INSERT INTO products (code, name, category, brand, unit, selling_price, remark)
+                VALUES (%s, %s, '基准测试', 'bench', '件', 9.90, 'bench')
+            """, [(f'{BENCH_CODE_PREFIX}{n:05d}', f'基准商品{n:05d}') for n in range(existing + 1, count + 1)])
+            cursor.execute("""
+                INSERT INTO inventory (product_id, quantity, remark)
+                SELECT p.id, 0, 'bench'
+                FROM products p
+                LEFT JOIN inventory i ON p.id = i.product_id
+                WHERE p.code LIKE %s AND i.id IS NULL
+            """, (f'{BENCH_CODE_PREFIX}%',))
+        cursor.execute("""
+            UPDATE inventory i
+            INNER JOIN products p ON i.product_id = p.id
+            SET i.quantity = %s
+            WHERE p.code LIKE %s
+        """, (stock, f'{BENCH_CODE_PREFIX}%'))
+        cursor.execute("""
+            SELECT id FROM products WHERE code LIKE %s ORDER BY code LIMIT %s
+        """, (f'{BENCH_CODE_PREFIX}%', count))
+        product_ids = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+        return product_ids
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def summarize(samples):
+    """计算耗时样本（秒）的统计值，单位毫秒"""
+    ordered = sorted(samples)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.mean(ordered) * 1000, 3),
+        'p50_ms': round(pct(50), 3),
+        'p95_ms': round(pct(95), 3),
+        'p99_ms': round(pct(99), 3),
+        'max_ms': round(ordered[-1] * 1000, 3)
+    }
+
+
+def timed(fn, *args, **kwargs):
+    """执行函数并返回 (结果, 耗时秒)"""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
@@ -0,0 +1,88 @@
+"""
+对比两次场景压测结果（bench.scenarios 输出的 JSON）
+
+按操作列出 p50/p95/p99 与吞吐的变化，延迟上升或吞吐下降超过 --threshold（百分比）的标记为退化。
+加 --fail 时出现退化即以非零状态退出，便于在 CI 中使用。
+
+    python -m bench.compare bench/results/pos_abc1234_*.json bench/results/pos_def5678_*.json
+"""
+import argparse
+import json
+
+LATENCY_KEYS = ('p50_ms', 'p95_ms', 'p99_ms')
+
+
+def _load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _change(old, new):
+    if not old:
+        return None
+    return (new - old) / old * 100
+
+
+def compare(base, head, threshold):
+    """
+    Returns:
+        tuple: (输出行列表, 退化项列表)
+    """
+    lines = []
+    regressions = []
+    header = f"{'操作':<18}{'指标':<16}{'基线':>10}{'当前':>10}{'变化':>10}"
+    lines.append(header)
+    names = list(base['operations']) + [name for name in head['operations'] if name not in base['operations']]
+    for name in names:
+        old = base['operations'].get(name)
+        new = head['operations'].get(name)
+        if old is None or new is None:
+            lines.append(f"{name:<18}{'(仅存在于一侧)':<16}")
+            continue
+        for key in LATENCY_KEYS + ('throughput_rps', 'errors'):
+            old_value, new_value = old.get(key), new.get(key)
+            if old_value is None or new_value is None:
+                continue
+            change = _change(old_value, new_value)
+            mark = ''
+            if key in LATENCY_KEYS and change is not None and change > threshold:
+                mark = ' !'
+            elif key == 'throughput_rps' and change is not None and change < -threshold:
+                mark = ' !'
+            elif key == 'errors' and new_value > old_value:
+                mark = ' !'
+            if mark:
+                regressions.append(f'{name}.{key}')
+            change_text = '-' if change is None else f'{change:+.1f}%'
+            lines.append(f"{name:<18}{key:<16}{old_value:>10}{new_value:>10}{change_text:>10}{mark}")
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='对比两次场景压测结果')
+    parser.add_argument('base', help='基线结果 JSON')
+    parser.add_argument('head', help='当前结果 JSON')
+    parser.add_argument('--threshold', type=float, default=10.0, help='判定退化的变化百分比')
+    parser.add_argument('--fail', action='store_true', help='出现退化时以非零状态退出')
+    args = parser.parse_args()
+
+    base, head = _load(args.base), _load(args.head)
+    print(f"基线: {base.get('commit')} {base.get('created_at')}  当前: {head.get('commit')} {head.get('created_at')}")
+    for key in ('scenario', 'threads', 'duration_s', 'dataset'):
+        if base.get(key) != head.get(key):
+            print(f"注意: 两次结果的 {key} 不同（{base.get(key)} / {head.get(key)}），对比可能不可靠")
+    lines, regressions = compare(base, head, args.threshold)
+    print('\n'.join(lines))
+    old_total, new_total = base['totals']['throughput_rps'], head['totals']['throughput_rps']
+    change = _change(old_total, new_total)
+    print(f"总吞吐: {old_total} -> {new_total} 次/秒" + ('' if change is None else f' ({change:+.1f}%)'))
+    if regressions:
+        print(f"退化项（阈值 {args.threshold}%）: {', '.join(regressions)}")
+        if args.fail:
+            raise SystemExit(1)
+    else:
+        print('未发现退化')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,368 @@
+"""
+基准测试数据生成器（需要本地 MySQL，且已导入 init_database.sql）
+
+按固定随机种子生成可复现的门店数据：供应商、会员客户、商品（分类价格带、Zipf 热度），
+以及截至 --end-date 的若干年采购单、进货单与销售单：
+- 销售单量按月份季节性、星期与节假日高峰波动，下单时刻集中在早、午、晚三个高峰
+- 购物篮行数服从几何分布（多数 1~3 行，长尾到 30 行），热门商品被购买的概率更高
+- 采购按供应商每周补货，采购单生成后 1~3 天到货入库，较早的单据已结清
+
+生成的数据均带前缀（商品编码 GEN、单号 GOUT/GIN/GPO、名称“[生成]”），可用 --reset 清除后重新生成。
+生成后重建商品成本表与销售日汇总表。
+
+    python -m bench.datagen --products 5000 --customers 2000 --suppliers 50 --years 2 --orders-per-day 300
+"""
+import argparse
+import math
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from utils.costs import rebuild_product_costs
+from utils.database import get_db_connection
+from utils.rollup import rebuild_sales_rollup
+
+CODE_PREFIX = 'GEN'
+NAME_PREFIX = '[生成]'
+BATCH_SIZE = 5000
+
+# 分类 -> (最低售价, 最高售价, 品牌, 品名)
+CATEGORIES = {
+    '饮料': (2.5, 15, ['可口可乐', '百事', '农夫山泉', '康师傅', '统一', '元气森林'], ['可乐', '雪碧', '矿泉水', '绿茶', '冰红茶', '苏打水', '果汁']),
+    '零食': (3, 30, ['乐事', '奥利奥', '旺旺', '三只松鼠', '良品铺子', '卫龙'], ['薯片', '饼干', '雪饼', '坚果', '辣条', '果冻', '巧克力']),
+    '乳品': (3, 25, ['伊利', '蒙牛', '光明', '君乐宝'], ['纯牛奶', '酸奶', '乳酸菌', '奶酪棒']),
+    '方便食品': (3, 20, ['康师傅', '统一', '今麦郎', '白象'], ['红烧牛肉面', '老坛酸菜面', '拌面', '火腿肠', '自热米饭']),
+    '日用品': (5, 60, ['清风', '维达', '舒肤佳', '高露洁', '蓝月亮'], ['纸巾', '湿巾', '香皂', '牙膏', '洗衣液', '洗洁精']),
+    '粮油调味': (5, 80, ['金龙鱼', '福临门', '海天', '李锦记'], ['大米', '食用油', '酱油', '香醋', '蚝油', '料酒']),
+    '酒类': (5, 150, ['青岛', '雪花', '百威', '二锅头', '江小白'], ['啤酒', '精酿', '白酒', '果酒'])
+}
+SPECS = ['250ml', '330ml', '500ml', '1L', '1.5L', '50g', '100g', '200g', '500g', '1kg', '6连包', '12袋装']
+SURNAMES = '王李张刘陈杨黄赵吴周徐孙马朱胡郭何林高罗'
+GIVEN_NAMES = ['伟', '芳', '娜', '敏', '静', '强', '磊', '洋', '艳', '勇', '军', '杰', '娟', '涛', '明', '超', '秀英', '桂英', '建华', '志强']
+CITIES = ['朝阳区', '海淀区', '丰台区', '东城区', '西城区', '通州区']
+
+# 月份季节性（1 月春节、7~8 月饮料旺季、12 月节前）与星期系数（周一为 0）
+MONTH_FACTORS = [1.25, 1.1, 0.9, 0.95, 1.0, 1.05, 1.2, 1.2, 1.0, 1.05, 0.95, 1.15]
+WEEKDAY_FACTORS = [0.9, 0.9, 0.95, 0.95, 1.1, 1.25, 1.2]
+# 每小时下单权重（7 点到 22 点），早、午、晚三个高峰
+HOUR_WEIGHTS = {7: 4, 8: 8, 9: 5, 10: 4, 11: 6, 12: 9, 13: 7, 14: 4, 15: 4, 16: 5, 17: 8, 18: 10, 19: 9, 20: 7, 21: 5, 22: 3}
+
+
+def _money(value):
+    return round(value + 1e-9, 2)
+
+
+def _basket_size(rng):
+    """购物篮行数：几何分布，均值约 2.6 行，最多 30 行"""
+    return min(30, 1 + int(math.log(1 - rng.random()) / math.log(0.62)))
+
+
+def _line_quantity(rng):
+    r = rng.random()
+    if r < 0.8:
+        return 1
+    if r < 0.95:
+        return 2
+    return rng.randint(3, 6)
+
+
+def _batched_insert(cursor, sql, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        cursor.executemany(sql, rows[start:start + BATCH_SIZE])
+
+
+def _next_id(cursor, table):
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}")
+    return cursor.fetchone()[0]
+
+
+def _ids(cursor, sql):
+    cursor.execute(sql)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _delete_in(cursor, sql, ids):
+    for start in range(0, len(ids), BATCH_SIZE):
+        chunk = ids[start:start + BATCH_SIZE]
+        cursor.execute(sql.format(', '.join(['%s'] * len(chunk))), chunk)
+
+
+def reset_generated(conn):
+    """删除此前生成的数据（包括压测时用生成商品开出的销售单）"""
+    cursor = conn.cursor()
+    try:
+        product_ids = _ids(cursor, f"SELECT id FROM products WHERE code LIKE '{CODE_PREFIX}%'")
+        outgoing_ids = _ids(cursor, f"""
+            SELECT id FROM outgoing_orders WHERE order_no LIKE 'GOUT%'
+            UNION
+            SELECT DISTINCT od.outgoing_id FROM outgoing_details od
+            INNER JOIN products p ON od.product_id = p.id
+            WHERE p.code LIKE '{CODE_PREFIX}%'
+        """)
+        incoming_ids = _ids(cursor, "SELECT id FROM incoming_orders WHERE order_no LIKE 'GIN%'")
+        purchase_ids = _ids(cursor, "SELECT id FROM purchase_orders WHERE order_no LIKE 'GPO%'")
+
+        _delete_in(cursor, "DELETE FROM outgoing_details WHERE outgoing_id IN ({})", outgoing_ids)
+        _delete_in(cursor, "DELETE FROM outgoing_orders WHERE id IN ({})", outgoing_ids)
+        _delete_in(cursor, "DELETE FROM incoming_details WHERE incoming_id IN ({})", incoming_ids)
+        _delete_in(cursor, "DELETE FROM incoming_orders WHERE id IN ({})", incoming_ids)
+        _delete_in(cursor, "DELETE FROM purchase_details WHERE purchase_id IN ({})", purchase_ids)
+        _delete_in(cursor, "DELETE FROM purchase_orders WHERE id IN ({})", purchase_ids)
+        for table in ('inventory_check_details', 'sales_daily_rollup', 'product_costs', 'inventory', 'products'):
+            column = 'id' if table == 'products' else 'product_id'
+            _delete_in(cursor, f"DELETE FROM {table} WHERE {column} IN ({{}})", product_ids)
+        cursor.execute(f"DELETE FROM customers WHERE name LIKE '{NAME_PREFIX}%'")
+        cursor.execute(f"DELETE FROM suppliers WHERE name LIKE '{NAME_PREFIX}%'")
+        rebuild_product_costs(cursor)
+        rebuild_sales_rollup(cursor)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def generate(conn, products=5000, customers=2000, suppliers=50, years=2, orders_per_day=300,
+             end_date=date(2025, 12, 31), seed=42, log=print):
+    """
+    生成基准数据集
+
+    Returns:
+        dict: 各表生成行数
+    """
+    rng = random.Random(seed)
+    cursor = conn.cursor()
+    counts = {}
+    try:
+        cursor.execute("SELECT id FROM users WHERE role = 'manager' ORDER BY id LIMIT 1")
+        row = cursor.fetchone()
+        if row is None:
+            raise SystemExit('需要至少一个管理员用户')
+        user_id = row[0]
+        cursor.execute("SELECT id FROM customers WHERE is_default = 1 LIMIT 1")
+        row = cursor.fetchone()
+        default_customer_id = row[0] if row else None
+
+        # 供应商
+        supplier_start = _next_id(cursor, 'suppliers')
+        supplier_rows = [
+            (supplier_start + i, f'{NAME_PREFIX}供应商{i + 1:03d}',
+             rng.choice(SURNAMES) + rng.choice(GIVEN_NAMES), f'138{rng.randint(0, 99999999):08d}',
+             f'北京市{rng.choice(CITIES)}物流园{rng.randint(1, 99)}号')
+            for i in range(suppliers)
+        ]
+        _batched_insert(cursor, """
+            INSERT INTO suppliers (id, name, contact_person, phone, address) VALUES (%s, %s, %s, %s, %s)
+        """, supplier_rows)
+        supplier_ids = [row[0] for row in supplier_rows]
+        counts['suppliers'] = len(supplier_rows)
+
+        # 会员客户
+        customer_start = _next_id(cursor, 'customers')
+        customer_rows = [
+            (customer_start + i, f'{NAME_PREFIX}{rng.choice(SURNAMES)}{rng.choice(GIVEN_NAMES)}{i + 1}',
+             f'139{rng.randint(0, 99999999):08d}', f'北京市{rng.choice(CITIES)}某小区{rng.randint(1, 30)}号楼')
+            for i in range(customers)
+        ]
+        _batched_insert(cursor, """
+            INSERT INTO customers (id, name, phone, address, is_default) VALUES (%s, %s, %s, %s, 0)
+        """, customer_rows)
+        customer_ids = [row[0] for row in customer_rows]
+        counts['customers'] = len(customer_rows)
+
+        # 商品：售价按分类价格带，进价为售价的 60%~85%，热度服从 Zipf 分布（打乱后与编号无关）
+        product_start = _next_id(cursor, 'products')
+        catalog = []
+        product_rows = []
+        for i in range(products):
+            category = rng.choice(list(CATEGORIES))
+            low, high, brands, names = CATEGORIES[category]
+            brand = rng.choice(brands)
+            price = _money(rng.uniform(low, high))
+            cost = _money(price * rng.uniform(0.6, 0.85))
+            product_id = product_start + i
+            product_rows.append((product_id, f'{CODE_PREFIX}{i + 1:07d}',
+                                 f'{brand}{rng.choice(names)}{rng.choice(SPECS)}', category, brand, price))
+            catalog.append({'id': product_id, 'price': price, 'cost': cost,
+                            'supplier_id': supplier_ids[i % len(supplier_ids)]})
+        _batched_insert(cursor, """
+            INSERT INTO products (id, code, name, category, brand, unit, selling_price, remark)
+            VALUES (%s, %s, %s, %s, %s, '件', %s, 'datagen')
+        """, product_rows)
+        counts['products'] = len(product_rows)
+        ranks = list(range(1, products + 1))
+        rng.shuffle(ranks)
+        popularity = [1 / rank ** 1.1 for rank in ranks]
+        cum_weights = []
+        total = 0.0
+        for weight in popularity:
+            total += weight
+            cum_weights.append(total)
+
+        start_date = end_date - timedelta(days=365 * years - 1)
+        days = (end_date - start_date).days + 1
+
+        # 采购单与进货单：每个供应商每周补一次货，申请后 1~3 天到货
+        by_supplier = {}
+        for product in catalog:
+            by_supplier.setdefault(product['supplier_id'], []).append(product)
+        po_id = _next_id(cursor, 'purchase_orders')
+        in_id = _next_id(cursor, 'incoming_orders')
+        po_rows, po_details, in_rows, in_details = [], [], [], []
+        for supplier_id in supplier_ids:
+            items = by_supplier.get(supplier_id, [])
+            if not items:
+                continue
+            day = rng.randint(0, 6)
+            while day < days:
+                apply_date = start_date + timedelta(days=day)
+                apply_time = datetime.combine(apply_date, datetime.min.time()) + timedelta(hours=rng.randint(8, 17), minutes=rng.randint(0, 59))
+                arrive_date = apply_date + timedelta(days=rng.randint(1, 3))
+                age = (end_date - apply_date).days
+                if arrive_date > end_date:
+                    status = 'approved' if age > 0 else 'pending'
+                elif age > 30:
+                    status = 'paid'
+                else:
+                    status = rng.choice(['stock', 'stock', 'delivered', 'paid'])
+                lines = rng.sample(items, min(len(items), rng.randint(5, 30)))
+                total_amount = 0
+                for product in lines:
+                    quantity = rng.choice([12, 24, 24, 48, 96])
+                    amount = _money(quantity * product['cost'])
+                    total_amount += amount
+                    po_details.append((po_id, product['id'], quantity, product['cost'], amount))
+                    if status in ('stock', 'paid'):
+                        in_details.append((in_id, product['id'], quantity, product['cost'], amount, f'B{apply_date:%Y%m%d}'))
+                approve_user = user_id if status != 'pending' else None
+                approve_time = apply_time + timedelta(hours=2) if status != 'pending' else None
+                po_rows.append((po_id, f'GPO{po_id:09d}', supplier_id, status, _money(total_amount),
+                                user_id, approve_user, apply_time, approve_time))
+                if status in ('stock', 'paid'):
+                    in_rows.append((in_id, f'GIN{in_id:09d}', po_id, supplier_id, _money(total_amount),
+                                    arrive_date, user_id,
+                                    datetime.combine(arrive_date, datetime.min.time()) + timedelta(hours=9)))
+                    in_id += 1
+                po_id += 1
+                day += 7
+        _batched_insert(cursor, """
+            INSERT INTO purchase_orders (id, order_no, supplier_id, status, total_amount, apply_user_id,
+                                         approve_user_id, apply_time, approve_time)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, po_rows)
+        _batched_insert(cursor, """
+            INSERT INTO purchase_details (purchase_id, product_id, quantity, cost_price, amount)
+            VALUES (%s, %s, %s, %s, %s)
+        """, po_details)
+        _batched_insert(cursor, """
+            INSERT INTO incoming_orders (id, order_no, purchase_id, supplier_id, total_amount,
+                                         incoming_date, user_id, created_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """, in_rows)
+        _batched_insert(cursor, """
+            INSERT INTO incoming_details (incoming_id, product_id, quantity, cost_price, amount, batch_no)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, in_details)
+        conn.commit()
+        counts.update(purchase_orders=len(po_rows), purchase_details=len(po_details),
+                      incoming_orders=len(in_rows), incoming_details=len(in_details))
+        log(f"采购单 {len(po_rows)}，进货单 {len(in_rows)}")
+
+        # 销售单：逐日生成，按批写入
+        hours = list(HOUR_WEIGHTS)
+        hour_weights = list(HOUR_WEIGHTS.values())
+        order_id = _next_id(cursor, 'outgoing_orders')
+        order_rows, detail_rows = [], []
+        counts['outgoing_orders'] = counts['outgoing_details'] = 0
+        for day in range(days):
+            sale_date = start_date + timedelta(days=day)
+            factor = MONTH_FACTORS[sale_date.month - 1] * WEEKDAY_FACTORS[sale_date.weekday()]
+            n_orders = max(1, int(rng.gauss(orders_per_day * factor, orders_per_day * factor * 0.08)))
+            for _ in range(n_orders):
+                created_at = datetime.combine(sale_date, datetime.min.time()) + timedelta(
+                    hours=rng.choices(hours, hour_weights)[0], minutes=rng.randint(0, 59), seconds=rng.randint(0, 59))
+                lines = {}
+                for product in rng.choices(catalog, cum_weights=cum_weights, k=_basket_size(rng)):
+                    lines[product['id']] = (product, lines.get(product['id'], (product, 0))[1] + _line_quantity(rng))
+                total_amount = total_cost = 0
+                for product, quantity in lines.values():
+                    amount = _money(product['price'] * quantity)
+                    cost_amount = _money(product['cost'] * quantity)
+                    total_amount += amount
+                    total_cost += cost_amount
+                    detail_rows.append((order_id, product['id'], quantity, product['price'], product['cost'],
+                                        amount, cost_amount, _money(amount - cost_amount)))
+                member = customer_ids and rng.random() < 0.15
+                order_rows.append((order_id, f'GOUT{order_id:010d}',
+                                   rng.choice(customer_ids) if member else default_customer_id,
+                                   _money(total_amount), _money(total_cost), _money(total_amount - total_cost),
+                                   sale_date, user_id, created_at))
+                order_id += 1
+            if len(detail_rows) >= BATCH_SIZE * 4 or day == days - 1:
+                _batched_insert(cursor, """
+                    INSERT INTO outgoing_orders (id, order_no, customer_id, total_amount, total_cost, profit,
+                                                 sale_date, user_id, created_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """, order_rows)
+                _batched_insert(cursor, """
+                    INSERT INTO outgoing_details (outgoing_id, product_id, quantity, selling_price, cost_price,
+                                                  amount, cost_amount, profit)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                """, detail_rows)
+                conn.commit()
+                counts['outgoing_orders'] += len(order_rows)
+                counts['outgoing_details'] += len(detail_rows)
+                order_rows, detail_rows = [], []
+                log(f"销售单已生成至 {sale_date}，累计 {counts['outgoing_orders']} 单")
+
+        # 期末库存：按热度给出 20~500 的在库数量
+        inventory_rows = [
+            (product['id'], int(20 + 480 * min(1.0, weight * 10)))
+            for product, weight in zip(catalog, popularity)
+        ]
+        _batched_insert(cursor, """
+            INSERT INTO inventory (product_id, quantity, remark) VALUES (%s, %s, 'datagen')
+        """, inventory_rows)
+        counts['inventory'] = len(inventory_rows)
+
+        rebuild_product_costs(cursor)
+        rebuild_sales_rollup(cursor)
+        conn.commit()
+        return counts
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='基准测试数据生成器')
+    parser.add_argument('--products', type=int, default=5000, help='商品数')
+    parser.add_argument('--customers', type=int, default=2000, help='会员客户数')
+    parser.add_argument('--suppliers', type=int, default=50, help='供应商数')
+    parser.add_argument('--years', type=int, default=2, help='生成多少年的单据')
+    parser.add_argument('--orders-per-day', type=int, default=300, help='平均每日销售单数')
+    parser.add_argument('--end-date', default='2025-12-31', help='单据截止日期 YYYY-MM-DD')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    parser.add_argument('--reset', action='store_true', help='先删除此前生成的数据')
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    try:
+        if args.reset:
+            reset_generated(conn)
+            print('已清除此前生成的数据')
+        start = time.perf_counter()
+        counts = generate(conn, args.products, args.customers, args.suppliers, args.years, args.orders_per_day,
+                          datetime.strptime(args.end_date, '%Y-%m-%d').date(), args.seed)
+    finally:
+        conn.close()
+    print(f'生成完成，耗时 {time.perf_counter() - start:.1f} 秒')
+    for table, count in counts.items():
+        print(f'  {table}: {count}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+热点查询执行计划回归检查
+
+对 utils/hot_queries.py 中登记的每条查询执行 EXPLAIN，
+执行计划中出现 type=ALL（全表扫描）且该表估算行数不少于 --min-rows 时判定失败，
+以非零状态码退出，可用于 CI。数据量很小的表优化器本就可能选择全表扫描，
+因此应在灌入足量数据的库上运行（小于 --min-rows 的全表扫描只提示不判失败）。
+
+    python -m bench.explain_check --min-rows 1000
+"""
+import argparse
+import sys
+
+from utils.database import get_db_connection
+from utils.hot_queries import HOT_QUERIES
+
+
+def explain(cursor, sql, params):
+    cursor.execute('EXPLAIN ' + sql, params)
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def run(min_rows, analyze=True):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    failures = []
+    try:
+        if analyze:
+            # 刷新索引统计信息，避免过期统计导致误判
+            cursor.execute("""
+                SELECT TABLE_NAME FROM information_schema.TABLES
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_TYPE = 'BASE TABLE'
+            """)
+            for (table,) in cursor.fetchall():
+                cursor.execute(f'ANALYZE TABLE `{table}`')
+                cursor.fetchall()
+
+        for query in HOT_QUERIES:
+            plan = explain(cursor, query['sql'], query['params'])
+            problems = []
+            for step in plan:
+                if step.get('type') != 'ALL':
+                    continue
+                rows = int(step.get('rows') or 0)
+                note = f"{step.get('table')} 全表扫描（估算 {rows} 行）"
+                if rows >= min_rows:
+                    problems.append(note)
+                else:
+                    print(f"  提示  {query['name']}: {note}，低于 --min-rows，不判失败")
+            status = 'FAIL' if problems else 'OK'
+            keys = ', '.join(f"{step.get('table')}:{step.get('key') or '-'}" for step in plan)
+            print(f"{status:>4}  {query['name']}  [{keys}]")
+            for problem in problems:
+                print(f"        {problem}")
+            if problems:
+                failures.append(query['name'])
+    finally:
+        cursor.close()
+        conn.close()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='热点查询执行计划回归检查')
+    parser.add_argument('--min-rows', type=int, default=1000, help='全表扫描判定失败的最小估算行数')
+    parser.add_argument('--no-analyze', action='store_true', help='不执行 ANALYZE TABLE')
+    args = parser.parse_args()
+    failures = run(args.min_rows, analyze=not args.no_analyze)
+    if failures:
+        print(f'{len(failures)} 条热点查询出现全表扫描')
+        sys.exit(1)
+    print(f'全部 {len(HOT_QUERIES)} 条热点查询未出现全表扫描')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+JSON 序列化基准（纯内存，不需要数据库）
+
+构造库存列表与销售报表形状的大响应（含 Decimal 与日期，与数据库游标返回的行一致），对比：
+- legacy：逐行 float()/format_datetime() 转换后用 Flask 默认 provider 缩进输出（原做法）
+- stdlib：ShopJSONProvider + 标准库 json，直接编码数据库行
+- orjson：ShopJSONProvider + orjson（需已安装）
+
+    python -m bench.json_payload --rows 5000 --repeat 20
+"""
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+from bench.common import summarize
+from utils.helpers import format_date, format_datetime
+from utils.json_provider import JSON_CONFIG, ShopJSONProvider, orjson
+
+
+def inventory_rows(n, rng):
+    now = datetime(2025, 10, 1, 12, 0, 0)
+    return [{
+        'id': i,
+        'code': f'P{i:07d}',
+        'name': f'商品{i}号 可口可乐330ml',
+        'category': '饮料',
+        'brand': '可口可乐',
+        'unit': '瓶',
+        'selling_price': Decimal(f'{rng.uniform(1, 100):.2f}'),
+        'quantity': rng.randint(0, 500),
+        'updated_at': now - timedelta(minutes=rng.randint(0, 100000)),
+        'inventory_remark': None
+    } for i in range(1, n + 1)]
+
+
+def report_rows(n, rng):
+    start = date(2024, 1, 1)
+    return [{
+        'period': start + timedelta(days=i),
+        'order_count': Decimal(rng.randint(100, 500)),
+        'total_sales': Decimal(f'{rng.uniform(1000, 20000):.2f}'),
+        'total_cost': Decimal(f'{rng.uniform(800, 15000):.2f}'),
+        'total_profit': Decimal(f'{rng.uniform(100, 5000):.2f}'),
+        'profit_rate': Decimal(f'{rng.uniform(5, 30):.2f}')
+    } for i in range(n)]
+
+
+def legacy_format(payload):
+    """原接口中的逐行转换"""
+    for item in payload['inventory']:
+        item['selling_price'] = float(item['selling_price'])
+        item['updated_at'] = format_datetime(item['updated_at'])
+    for item in payload['report']:
+        item['period'] = format_date(item['period'])
+        item['order_count'] = int(item['order_count'])
+        for key in ('total_sales', 'total_cost', 'total_profit', 'profit_rate'):
+            item[key] = float(item[key])
+    return payload
+
+
+def run(rows, repeat):
+    rng = random.Random(42)
+    inventory = inventory_rows(rows, rng)
+    report = report_rows(rows // 5, rng)
+
+    def fresh():
+        # 每次复制一份（legacy 会原地修改）
+        return {'inventory': [dict(row) for row in inventory], 'report': [dict(row) for row in report]}
+
+    legacy_app = Flask('legacy')
+    legacy_app.json = DefaultJSONProvider(legacy_app)
+    legacy_app.json.ensure_ascii = False
+    legacy_app.json.compact = False
+    shop_app = Flask('shop')
+    shop_app.json = ShopJSONProvider(shop_app)
+
+    variants = [('legacy', legacy_app, True, None), ('stdlib', shop_app, False, False)]
+    if orjson is not None:
+        variants.append(('orjson', shop_app, False, True))
+
+    print(f"库存 {rows} 行 + 报表 {len(report)} 行，重复 {repeat} 次")
+    print(f"{'方式':<10}{'响应字节':>12}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, app, legacy, use_orjson in variants:
+        if use_orjson is not None:
+            JSON_CONFIG['use_orjson'] = use_orjson
+        samples = []
+        size = 0
+        with app.app_context():
+            for _ in range(repeat):
+                payload = fresh()
+                start = time.perf_counter()
+                if legacy:
+                    payload = legacy_format(payload)
+                size = len(jsonify({'success': True, 'data': payload}).get_data())
+                samples.append(time.perf_counter() - start)
+        stats = summarize(samples)
+        print(f"{name:<10}{size:>12}{stats['p50_ms']:>10}{stats['p95_ms']:>10}")
+    JSON_CONFIG['use_orjson'] = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON 序列化基准')
+    parser.add_argument('--rows', type=int, default=5000, help='库存列表行数（报表行数为其 1/5）')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+单号唯一性并发测试（不需要数据库）
+
+多个进程、每个进程多个线程同时生成单号，共 --total 个，校验：
+- 全部单号互不相同且长度一致
+- 每个线程内生成的单号严格递增（定长格式下字符串顺序即时间顺序）
+
+    python -m bench.order_no_uniqueness --processes 8 --threads 4 --total 100000
+"""
+import argparse
+import multiprocessing
+import threading
+import time
+
+from utils.helpers import generate_order_no
+
+
+def _generate(count, threads, prefix):
+    """子进程：多线程生成单号，返回各线程的结果列表"""
+    results = [None] * threads
+    start = threading.Barrier(threads)
+    per_thread = [count // threads + (1 if i < count % threads else 0) for i in range(threads)]
+
+    def worker(index):
+        start.wait()
+        results[index] = [generate_order_no(prefix) for _ in range(per_thread[index])]
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return results
+
+
+def run(processes, threads, total, prefix='OUT'):
+    counts = [total // processes + (1 if i < total % processes else 0) for i in range(processes)]
+    started = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        batches = pool.starmap(_generate, [(count, threads, prefix) for count in counts])
+    elapsed = time.perf_counter() - started
+
+    sequences = [numbers for batch in batches for numbers in batch]
+    all_numbers = [number for numbers in sequences for number in numbers]
+    unique = set(all_numbers)
+    lengths = {len(number) for number in all_numbers}
+    unordered = sum(1 for numbers in sequences if any(a >= b for a, b in zip(numbers, numbers[1:])))
+
+    print(f'生成 {len(all_numbers)} 个单号（{processes} 进程 x {threads} 线程），耗时 {elapsed:.2f} 秒')
+    print(f'示例: {all_numbers[0]}  {all_numbers[-1]}')
+    print(f'重复: {len(all_numbers) - len(unique)}  长度种类: {sorted(lengths)}  非递增线程: {unordered}')
+    if len(unique) != len(all_numbers) or len(lengths) != 1 or unordered:
+        raise SystemExit('FAILED: 单号出现重复、长度不一致或线程内非递增')
+    print('OK: 单号唯一且线程内单调递增')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='单号唯一性并发测试')
+    parser.add_argument('--processes', type=int, default=8)
+    parser.add_argument('--threads', type=int, default=4, help='每个进程的线程数')
+    parser.add_argument('--total', type=int, default=100000, help='生成单号总数')
+    args = parser.parse_args()
+    run(args.processes, args.threads, args.total)
+
+
+if __name__ == '__main__':
+    main()
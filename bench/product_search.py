@@ -0,0 +1,79 @@
+"""
+商品搜索索引延迟基准（纯内存，不需要数据库）
+
+生成指定数量的模拟商品构建 utils.search.ProductSearchIndex，
+对编码精确/前缀、名称子串、品牌、拼音首字母等典型关键字反复检索并统计延迟。
+
+    python -m bench.product_search --skus 100000 --repeat 200
+"""
+import argparse
+import random
+
+from bench.common import summarize, timed
+from utils.search import ProductSearchIndex
+
+_WORDS = ['可口可乐', '雪碧', '芬达', '农夫山泉', '矿泉水', '方便面', '牛奶', '酸奶', '饼干', '薯片',
+          '巧克力', '洗发水', '沐浴露', '牙膏', '纸巾', '洗衣液', '大米', '食用油', '酱油', '香醋']
+_BRANDS = ['可口可乐', '百事', '农夫山泉', '康师傅', '统一', '伊利', '蒙牛', '奥利奥', '乐事', '德芙']
+_SPECS = ['330ml', '500ml', '1.25L', '2L', '100g', '250g', '500g', '1kg', '6连包', '12袋装']
+
+_KEYWORDS = {
+    '编码精确': 'P0012345',
+    '编码前缀': 'P00123',
+    '名称子串': '可乐',
+    '名称规格': '乐500ml',
+    '品牌': '康师傅',
+    '拼音首字母': 'kkkl',
+    '无命中': '不存在的商品'
+}
+
+
+def make_products(count, seed=42):
+    rng = random.Random(seed)
+    products = []
+    for i in range(1, count + 1):
+        products.append({
+            'id': i,
+            'code': f'P{i:07d}',
+            'name': f"{rng.choice(_WORDS)}{rng.choice(_SPECS)}",
+            'brand': rng.choice(_BRANDS),
+            'status': 'active' if rng.random() < 0.95 else 'inactive'
+        })
+    return products
+
+
+def run(skus, repeat, limit):
+    index = ProductSearchIndex()
+    _, build_seconds = timed(index.build, make_products(skus))
+    print(f'构建索引: {skus} 个商品，耗时 {build_seconds * 1000:.1f} ms')
+
+    results = []
+    for label, keyword in _KEYWORDS.items():
+        samples = []
+        hits = 0
+        for _ in range(repeat):
+            ids, seconds = timed(index.search, keyword, limit=limit)
+            samples.append(seconds)
+            hits = len(ids)
+        stats = summarize(samples)
+        results.append((label, keyword, hits, stats))
+        print(f"{label:<8} {keyword:<12} 命中 {hits:>3}  p50 {stats['p50_ms']:.3f} ms  "
+              f"p95 {stats['p95_ms']:.3f} ms  max {stats['max_ms']:.3f} ms")
+
+    _, upsert_seconds = timed(index.upsert, {'id': 1, 'code': 'P0000001', 'name': '可口可乐330ml',
+                                             'brand': '可口可乐', 'status': 'active'})
+    print(f'增量更新单个商品: {upsert_seconds * 1000:.3f} ms')
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='商品搜索索引延迟基准')
+    parser.add_argument('--skus', type=int, default=100000, help='模拟商品数量')
+    parser.add_argument('--repeat', type=int, default=200, help='每个关键字的检索次数')
+    parser.add_argument('--limit', type=int, default=20, help='每次检索返回条数')
+    args = parser.parse_args()
+    run(args.skus, args.repeat, args.limit)
+
+
+if __name__ == '__main__':
+    main()
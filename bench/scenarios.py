@@ -0,0 +1,354 @@
+"""
+场景压测：按门店真实的请求比例回放到 Flask 应用（测试客户端 + 本地 MySQL）
+
+先用 bench.datagen 生成数据集，再选择场景：
+- pos（默认）：收银高峰，扫码查商品为主，夹杂商品搜索、开单、会员查找、看板与单据列表
+- month_end：月末对账，销售/利润/进货/库存报表与按月份的单据列表
+
+每个线程使用独立的已登录客户端，按权重随机选择操作，持续 --duration 秒（先预热 --warmup 次）。
+按操作统计 p50/p95/p99 延迟、吞吐与失败数，结果写入 bench/results/ 下的 JSON（含提交号与数据集规模），
+可用 bench.compare 对比两次结果。开单前为生成的商品补足库存，结束后删除本次订单并恢复原库存。
+
+    python -m bench.scenarios --scenario pos --threads 8 --duration 60
+"""
+import argparse
+import calendar
+import json
+import os
+import random
+import subprocess
+import threading
+import time
+from datetime import date, datetime
+
+from bench.common import ensure_bench_products, login_client, summarize
+from bench.datagen import CODE_PREFIX
+from utils.database import get_db_connection
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+TOPUP_STOCK = 1000000
+
+SEARCH_KEYWORDS = ['可乐', '牛奶', '薯片', '康师傅', '矿泉水', '酸奶', '饼干', '啤酒', '纸巾', '酱油', 'kl', 'nn', 'GEN00001']
+CUSTOMER_KEYWORDS = ['王', '李', '张', '139', '1390', '朝阳区']
+
+
+def load_dataset(sku_limit):
+    """读取压测用商品（按历史销量排序）与数据集规模"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT p.id, p.code, p.selling_price
+            FROM products p
+            LEFT JOIN (
+                SELECT product_id, SUM(quantity) AS sold FROM sales_daily_rollup GROUP BY product_id
+            ) r ON p.id = r.product_id
+            WHERE p.code LIKE %s AND p.status = 'active'
+            ORDER BY COALESCE(r.sold, 0) DESC, p.id
+            LIMIT %s
+        """, (f'{CODE_PREFIX}%', sku_limit))
+        products = [{'id': row[0], 'code': row[1], 'price': float(row[2])} for row in cursor.fetchall()]
+        counts = {}
+        for table in ('products', 'customers', 'suppliers', 'outgoing_orders', 'outgoing_details',
+                      'incoming_orders', 'purchase_orders'):
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            counts[table] = cursor.fetchone()[0]
+        cursor.execute("SELECT MIN(sale_date), MAX(sale_date) FROM outgoing_orders")
+        first, last = cursor.fetchone()
+        counts['sale_dates'] = [str(first), str(last)] if first else None
+        return products, counts
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def set_stock(quantities):
+    """设置库存，quantities 为 {product_id: 数量}"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.executemany("UPDATE inventory SET quantity = %s WHERE product_id = %s",
+                           [(quantity, product_id) for product_id, quantity in quantities.items()])
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def read_stock(product_ids):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        placeholders = ', '.join(['%s'] * len(product_ids))
+        cursor.execute(f"SELECT product_id, quantity FROM inventory WHERE product_id IN ({placeholders})", product_ids)
+        return dict(cursor.fetchall())
+    finally:
+        cursor.close()
+        conn.close()
+
+
+class Context:
+    """场景共享数据：商品（按热度加权）、月份列表与本次创建的订单"""
+
+    def __init__(self, products, sale_dates):
+        self.products = products
+        self.cum_weights = []
+        total = 0.0
+        for rank in range(1, len(products) + 1):
+            total += 1 / rank ** 1.1
+            self.cum_weights.append(total)
+        self.months = []
+        if sale_dates:
+            year, month = map(int, sale_dates[0][:7].split('-'))
+            last = tuple(map(int, sale_dates[1][:7].split('-')))
+            while (year, month) <= last:
+                self.months.append((year, month))
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        if not self.months:
+            self.months = [(date.today().year, date.today().month)]
+        self.order_ids = []
+        self.lock = threading.Lock()
+
+    def pick_products(self, rng, k):
+        return rng.choices(self.products, cum_weights=self.cum_weights, k=k)
+
+    def pick_month(self, rng):
+        year, month = rng.choice(self.months)
+        end_day = calendar.monthrange(year, month)[1]
+        return f'{year}-{month:02d}-01', f'{year}-{month:02d}-{end_day}'
+
+
+def op_by_code(client, rng, ctx):
+    return client.get(f"/api/products/by-code/{ctx.pick_products(rng, 1)[0]['code']}")
+
+
+def op_search_products(client, rng, ctx):
+    return client.get('/api/products/search', query_string={'keyword': rng.choice(SEARCH_KEYWORDS)})
+
+
+def op_create_order(client, rng, ctx):
+    size = min(30, 1 + int(rng.expovariate(0.6)))
+    lines = {}
+    for product in ctx.pick_products(rng, size):
+        lines[product['id']] = (product, lines.get(product['id'], (product, 0))[1] + 1)
+    payload = {
+        'sale_date': date.today().isoformat(),
+        'details': [{'product_id': product['id'], 'quantity': quantity, 'selling_price': product['price']}
+                    for product, quantity in lines.values()],
+        'remark': 'bench'
+    }
+    resp = client.post('/api/outgoing-orders', json=payload)
+    data = resp.get_json(silent=True) or {}
+    if data.get('success'):
+        with ctx.lock:
+            ctx.order_ids.append(data['data']['order_id'])
+    return resp
+
+
+def op_search_customers(client, rng, ctx):
+    return client.get('/api/customers/search', query_string={'keyword': rng.choice(CUSTOMER_KEYWORDS)})
+
+
+def op_dashboard(client, rng, ctx):
+    return client.get('/api/reports/dashboard')
+
+
+def op_list_orders(client, rng, ctx):
+    return client.get('/api/outgoing-orders', query_string={'page': 1, 'size': 20})
+
+
+def op_inventory_alerts(client, rng, ctx):
+    return client.get('/api/inventory/alerts')
+
+
+def op_month_orders(client, rng, ctx):
+    start, end = ctx.pick_month(rng)
+    return client.get('/api/outgoing-orders', query_string={
+        'start_date': start, 'end_date': end, 'page': rng.randint(1, 5), 'size': 50})
+
+
+def op_sales_report(client, rng, ctx):
+    start, end = ctx.pick_month(rng)
+    return client.get('/api/reports/sales', query_string={
+        'start_date': start, 'end_date': end, 'group_by': rng.choice(['day', 'week'])})
+
+
+def op_profit_report(client, rng, ctx):
+    start, end = ctx.pick_month(rng)
+    return client.get('/api/reports/profit', query_string={'start_date': start, 'end_date': end})
+
+
+def op_purchase_report(client, rng, ctx):
+    start, end = ctx.pick_month(rng)
+    return client.get('/api/reports/purchase', query_string={'start_date': start, 'end_date': end})
+
+
+def op_inventory_report(client, rng, ctx):
+    return client.get('/api/reports/inventory')
+
+
+# 场景 -> {操作名: (函数, 权重)}
+SCENARIOS = {
+    'pos': {
+        'by_code': (op_by_code, 45),
+        'search_products': (op_search_products, 15),
+        'create_order': (op_create_order, 20),
+        'search_customers': (op_search_customers, 5),
+        'dashboard': (op_dashboard, 5),
+        'list_orders': (op_list_orders, 5),
+        'inventory_alerts': (op_inventory_alerts, 5)
+    },
+    'month_end': {
+        'month_orders': (op_month_orders, 30),
+        'sales_report': (op_sales_report, 25),
+        'profit_report': (op_profit_report, 20),
+        'purchase_report': (op_purchase_report, 10),
+        'inventory_report': (op_inventory_report, 10),
+        'dashboard': (op_dashboard, 5)
+    }
+}
+
+
+def _ok(resp):
+    if resp.status_code >= 400:
+        return False
+    data = resp.get_json(silent=True)
+    return not isinstance(data, dict) or data.get('success', True) is not False
+
+
+def run(scenario, threads, duration, warmup, seed, ctx):
+    operations = SCENARIOS[scenario]
+    names = list(operations)
+    weights = [operations[name][1] for name in names]
+    samples = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    error_messages = []
+    lock = threading.Lock()
+    ready = threading.Barrier(threads + 1)
+    deadline = []
+
+    def worker(index):
+        client = login_client()
+        rng = random.Random(seed * 1000 + index)
+        for _ in range(warmup):
+            name = rng.choices(names, weights)[0]
+            operations[name][0](client, rng, ctx)
+        ready.wait()
+        local = {name: [] for name in names}
+        local_errors = {name: 0 for name in names}
+        messages = []
+        while time.perf_counter() < deadline[0]:
+            name = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            resp = operations[name][0](client, rng, ctx)
+            elapsed = time.perf_counter() - start
+            if _ok(resp):
+                local[name].append(elapsed)
+            else:
+                local_errors[name] += 1
+                if len(messages) < 5:
+                    data = resp.get_json(silent=True) or {}
+                    messages.append(f"{name}: {resp.status_code} {data.get('message', '')}")
+        with lock:
+            for name in names:
+                samples[name].extend(local[name])
+                errors[name] += local_errors[name]
+            error_messages.extend(messages)
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    ready.wait()
+    started = time.perf_counter()
+    deadline.append(started + duration)
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    results = {}
+    for name in names:
+        entry = summarize(samples[name]) if samples[name] else {'count': 0}
+        entry['errors'] = errors[name]
+        entry['throughput_rps'] = round(len(samples[name]) / elapsed, 2)
+        results[name] = entry
+    total = sum(len(items) for items in samples.values())
+    return results, {'requests': total, 'errors': sum(errors.values()), 'elapsed_s': round(elapsed, 2),
+                     'throughput_rps': round(total / elapsed, 2)}, error_messages[:20]
+
+
+def git_revision():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=root, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=root,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='场景压测')
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='pos')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=30, help='计时阶段持续秒数')
+    parser.add_argument('--warmup', type=int, default=20, help='每个线程预热请求数（不计入结果）')
+    parser.add_argument('--skus', type=int, default=2000, help='参与回放的商品数（按历史销量取前 N 个）')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='结果 JSON 路径，默认写入 bench/results/')
+    args = parser.parse_args()
+
+    products, counts = load_dataset(args.skus)
+    if not products:
+        print('未找到生成的数据集（先运行 python -m bench.datagen），改用基准测试商品')
+        products = [{'id': product_id, 'code': f'BENCH{n:05d}', 'price': 9.9}
+                    for n, product_id in enumerate(ensure_bench_products(50), start=1)]
+    ctx = Context(products, counts.get('sale_dates'))
+
+    product_ids = [product['id'] for product in products]
+    original_stock = read_stock(product_ids)
+    set_stock({product_id: TOPUP_STOCK for product_id in product_ids})
+    try:
+        results, totals, error_messages = run(args.scenario, args.threads, args.duration, args.warmup, args.seed, ctx)
+    finally:
+        # 删除本次订单后恢复原库存
+        client = login_client()
+        for order_id in ctx.order_ids:
+            client.delete(f'/api/outgoing-orders/{order_id}')
+        set_stock(original_stock)
+
+    commit, dirty = git_revision()
+    report = {
+        'scenario': args.scenario,
+        'commit': commit,
+        'dirty': dirty,
+        'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'threads': args.threads,
+        'duration_s': args.duration,
+        'warmup': args.warmup,
+        'seed': args.seed,
+        'dataset': counts,
+        'totals': totals,
+        'operations': results,
+        'error_samples': error_messages
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{args.scenario}_{commit or 'unknown'}_{datetime.now():%Y%m%d%H%M%S}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"{'操作':<18}{'次数':>8}{'失败':>6}{'吞吐/s':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for name, entry in results.items():
+        print(f"{name:<18}{entry['count']:>8}{entry['errors']:>6}{entry['throughput_rps']:>10}"
+              f"{entry.get('p50_ms', '-'):>10}{entry.get('p95_ms', '-'):>10}{entry.get('p99_ms', '-'):>10}")
+    print(f"合计 {totals['requests']} 次请求，失败 {totals['errors']}，{totals['throughput_rps']} 次/秒")
+    for message in error_messages[:5]:
+        print('失败示例:', message)
+    print(f'结果已写入 {output}')
+
+
+if __name__ == '__main__':
+    main()
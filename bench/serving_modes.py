@@ -0,0 +1,174 @@
+"""
+服务模式对比：开发服务器（app.run debug=True, threaded=True）与生产服务器（gunicorn / waitress）
+
+依次在本机空闲端口启动各模式的服务进程，等待 /health 可用后，用 --clients 个线程（各自保持长连接）
+持续请求 --duration 秒，输出各模式的吞吐与 p50/p95/p99 延迟，最后停止服务进程。
+默认请求不访问数据库的 /health 与 /api/info（衡量服务器本身的开销）；加 --login 时以管理员登录，
+并加入商品搜索、库存列表与仪表盘（需要本地 MySQL）。
+
+    python -m bench.serving_modes --modes dev,gunicorn,waitress --clients 16 --duration 15
+"""
+import argparse
+import http.client
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from bench.common import summarize
+from serve import SERVE_CONFIG
+from utils.cache import CACHE_CONFIG
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEV_SERVER = ("from app import init_app; "
+              "init_app().run(host='127.0.0.1', port={port}, debug=True, threaded=True)")
+
+PUBLIC_PATHS = ['/health', '/api/info']
+LOGIN_PATHS = ['/api/products/search?keyword=%E5%8F%AF%E4%B9%90', '/api/inventory?page=1&size=20',
+               '/api/reports/dashboard']
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode, port, workers, threads):
+    if mode == 'dev':
+        command = [sys.executable, '-c', DEV_SERVER.format(port=port)]
+    else:
+        command = [sys.executable, 'serve.py', '--server', mode, '--bind', f'127.0.0.1:{port}',
+                   '--workers', str(workers), '--threads', str(threads)]
+    # 独立进程组，结束时连同重载器子进程、gunicorn worker 一起停止
+    return subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                            start_new_session=True)
+
+
+def stop_server(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=30)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+def wait_ready(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                conn.close()
+                return True
+        except OSError:
+            pass
+        time.sleep(0.2)
+    return False
+
+
+def _login(conn):
+    body = json.dumps({'username': 'admin', 'password': '123456'})
+    conn.request('POST', '/api/auth/login', body=body, headers={'Content-Type': 'application/json'})
+    resp = conn.getresponse()
+    resp.read()
+    cookie = resp.getheader('Set-Cookie')
+    if resp.status != 200 or not cookie:
+        raise SystemExit('登录失败')
+    return cookie.split(';', 1)[0]
+
+
+def run_load(port, clients, duration, paths, login):
+    samples = []
+    errors = [0]
+    lock = threading.Lock()
+    ready = threading.Barrier(clients + 1)
+    deadline = []
+
+    def client(index):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        headers = {'Accept-Encoding': 'gzip'}
+        if login:
+            headers['Cookie'] = _login(conn)
+        local, failed = [], 0
+        n = index
+        ready.wait()
+        while time.perf_counter() < deadline[0]:
+            path = paths[n % len(paths)]
+            n += 1
+            start = time.perf_counter()
+            status = None
+            # worker 回收（max_requests）时长连接会被服务端关闭，与浏览器一样重连重试一次
+            for _ in range(2):
+                try:
+                    conn.request('GET', path, headers=headers)
+                    resp = conn.getresponse()
+                    resp.read()
+                    status = resp.status
+                    break
+                except (OSError, http.client.HTTPException):
+                    conn.close()
+                    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            if status == 200:
+                local.append(time.perf_counter() - start)
+            else:
+                failed += 1
+        conn.close()
+        with lock:
+            samples.extend(local)
+            errors[0] += failed
+
+    pool = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for t in pool:
+        t.start()
+    ready.wait()
+    started = time.perf_counter()
+    deadline.append(started + duration)
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+    stats = summarize(samples) if samples else {'count': 0}
+    stats['errors'] = errors[0]
+    stats['throughput_rps'] = round(len(samples) / elapsed, 1)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='服务模式对比')
+    parser.add_argument('--modes', default='dev,gunicorn,waitress', help='逗号分隔：dev / gunicorn / waitress')
+    parser.add_argument('--workers', type=int, default=SERVE_CONFIG['workers'],
+                        help='gunicorn 进程数（waitress 线程数 = workers * threads）')
+    parser.add_argument('--threads', type=int, default=SERVE_CONFIG['threads'], help='每进程线程数')
+    parser.add_argument('--clients', type=int, default=16, help='并发客户端数')
+    parser.add_argument('--duration', type=float, default=15, help='每个模式压测秒数')
+    parser.add_argument('--login', action='store_true', help='登录并加入访问数据库的接口')
+    args = parser.parse_args()
+    if args.workers > 1 and CACHE_CONFIG['backend'] != 'redis' and 'gunicorn' in args.modes:
+        parser.error("gunicorn 多进程需将 CACHE_CONFIG['backend'] 设为 'redis'（serve.py 会拒绝启动）")
+
+    paths = PUBLIC_PATHS + (LOGIN_PATHS if args.login else [])
+    print(f"{args.clients} 个客户端，每模式 {args.duration} 秒，请求 {', '.join(paths)}")
+    print(f"{'模式':<10}{'吞吐/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'失败':>8}")
+    for mode in [mode.strip() for mode in args.modes.split(',') if mode.strip()]:
+        port = _free_port()
+        process = start_server(mode, port, args.workers, args.threads)
+        try:
+            if not wait_ready(port):
+                print(f'{mode:<10}启动失败（未安装或端口不可用）')
+                continue
+            run_load(port, min(args.clients, 4), 2, paths, args.login)   # 预热
+            stats = run_load(port, args.clients, args.duration, paths, args.login)
+        finally:
+            stop_server(process)
+        print(f"{mode:<10}{stats['throughput_rps']:>10}{stats.get('p50_ms', '-'):>10}"
+              f"{stats.get('p95_ms', '-'):>10}{stats.get('p99_ms', '-'):>10}{stats['errors']:>8}")
+
+
+if __name__ == '__main__':
+    main()
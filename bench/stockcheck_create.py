@@ -0,0 +1,59 @@
+"""
+创建库存盘点 vs 商品目录规模基准
+
+按商品数从小到大依次补足基准商品后调用 POST /api/inventory-checks，
+记录创建耗时；每次测量后删除生成的盘点单，避免影响业务数据。
+
+    python -m bench.stockcheck_create --sizes 1000,5000,20000 --repeat 3
+"""
+import argparse
+from datetime import date
+
+from bench.common import ensure_bench_products, login_client, summarize, timed
+from utils.database import get_db_connection
+
+
+def drop_check(check_id):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM inventory_check_details WHERE check_id = %s", (check_id,))
+        cursor.execute("DELETE FROM inventory_checks WHERE id = %s", (check_id,))
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def run(sizes, repeat):
+    client = login_client()
+    results = []
+    for size in sorted(sizes):
+        ensure_bench_products(size)
+        samples = []
+        product_count = 0
+        for _ in range(repeat):
+            resp, elapsed = timed(client.post, '/api/inventory-checks',
+                                  json={'check_date': date.today().isoformat(), 'remark': 'bench'})
+            data = resp.get_json() or {}
+            if not data.get('success'):
+                raise SystemExit(f"创建盘点失败: {data.get('message')}")
+            samples.append(elapsed)
+            product_count = data['data']['product_count']
+            drop_check(data['data']['check_id'])
+        row = {'catalogue_size': product_count, **summarize(samples)}
+        results.append(row)
+        print(f"products={product_count:>7}  p50={row['p50_ms']:>10.2f}ms  max={row['max_ms']:>10.2f}ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='创建库存盘点 vs 商品目录规模')
+    parser.add_argument('--sizes', default='1000,5000,20000', help='基准商品数列表，逗号分隔')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run([int(s) for s in args.sizes.split(',')], args.repeat)
+
+
+if __name__ == '__main__':
+    main()
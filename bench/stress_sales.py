@@ -0,0 +1,104 @@
+"""
+并发销售压力测试：多线程同时对相同商品结账，校验库存不会被扣成负数
+
+每个线程使用独立的已登录客户端，反复对同一组商品下单（每行 1 件），
+总需求量远大于库存。结束后校验：
+- 所有商品库存 >= 0
+- 成功售出数量 == 初始库存 - 剩余库存
+除库存不足外的任何下单失败（包括订单号唯一键冲突 Duplicate entry ... order_no）都判为失败。
+最后删除本次产生的订单以恢复库存。
+
+    python -m bench.stress_sales --threads 16 --orders 50 --stock 200
+"""
+import argparse
+import threading
+from datetime import date
+
+from bench.common import ensure_bench_products, login_client
+from utils.database import get_db_connection
+
+
+def read_stock(product_ids):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        placeholders = ', '.join(['%s'] * len(product_ids))
+        cursor.execute(f"SELECT product_id, quantity FROM inventory WHERE product_id IN ({placeholders})", product_ids)
+        return dict(cursor.fetchall())
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def run(threads, orders, stock, sku_count):
+    product_ids = ensure_bench_products(sku_count, stock=stock)
+    initial = read_stock(product_ids)
+    order_ids = []
+    sold = {product_id: 0 for product_id in product_ids}
+    failures = []
+    lock = threading.Lock()
+    start = threading.Barrier(threads)
+
+    def worker(index):
+        client = login_client()
+        # 各线程以不同顺序排列购物车，以便暴露加锁顺序问题
+        basket_ids = product_ids[index % sku_count:] + product_ids[:index % sku_count]
+        payload = {
+            'sale_date': date.today().isoformat(),
+            'details': [{'product_id': pid, 'quantity': 1, 'selling_price': 9.9} for pid in basket_ids],
+            'remark': 'stress'
+        }
+        start.wait()
+        for _ in range(orders):
+            data = client.post('/api/outgoing-orders', json=payload).get_json() or {}
+            with lock:
+                if data.get('success'):
+                    order_ids.append(data['data']['order_id'])
+                    for pid in basket_ids:
+                        sold[pid] += 1
+                elif '库存不足' not in data.get('message', ''):
+                    failures.append(data.get('message'))
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+    final = read_stock(product_ids)
+    print(f'成功订单: {len(order_ids)}  非库存类失败: {len(failures)}')
+    ok = True
+    for pid in product_ids:
+        print(f'商品 {pid}: 初始 {initial[pid]}  售出 {sold[pid]}  剩余 {final[pid]}')
+        if final[pid] < 0 or initial[pid] - final[pid] != sold[pid]:
+            ok = False
+    if failures:
+        print('失败示例:', failures[:5])
+
+    # 清理：删除本次订单，恢复库存
+    client = login_client()
+    cleanup_failures = []
+    for order_id in order_ids:
+        data = client.delete(f'/api/outgoing-orders/{order_id}').get_json() or {}
+        if not data.get('success'):
+            cleanup_failures.append(data.get('message'))
+    if cleanup_failures:
+        print(f'清理失败 {len(cleanup_failures)} 单:', cleanup_failures[:5])
+
+    if not ok or failures or cleanup_failures:
+        raise SystemExit('FAILED: 库存出现负数、售出数量不一致、出现非预期错误或清理失败')
+    print('OK: 并发销售未出现超卖')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='并发销售压力测试')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--orders', type=int, default=50, help='每个线程的下单次数')
+    parser.add_argument('--stock', type=int, default=200, help='每个商品的初始库存')
+    parser.add_argument('--skus', type=int, default=3, help='参与争抢的商品数')
+    args = parser.parse_args()
+    run(args.threads, args.orders, args.stock, args.skus)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+命令行维护命令（flask --app app <命令>）
+"""
+import click
+
+from utils.cache import bump_data_generation
+from utils.database import get_db_connection
+from utils.costs import rebuild_product_costs
+from utils.rollup import rebuild_sales_rollup
+from utils.migrations import apply_migrations, get_applied_versions, list_migrations
+
+
+def register_commands(app):
+    """注册维护命令"""
+
+    @app.cli.command('rebuild-product-costs')
+    def rebuild_product_costs_command():
+        """根据进货历史重建商品成本表（product_costs）"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            count = rebuild_product_costs(cursor)
+            conn.commit()
+            bump_data_generation()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+        click.echo(f'商品成本表重建完成，共 {count} 个商品')
+
+    @app.cli.command('rebuild-sales-rollup')
+    def rebuild_sales_rollup_command():
+        """根据销售订单重建销售日汇总表（sales_daily_totals / sales_daily_rollup）"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            count = rebuild_sales_rollup(cursor)
+            conn.commit()
+            bump_data_generation()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+        click.echo(f'销售日汇总表重建完成，共 {count} 天')
+
+    @app.cli.command('migrate')
+    @click.option('--status', is_flag=True, help='只列出迁移执行状态，不执行')
+    def migrate_command(status):
+        """按版本号顺序执行 migrations/ 下未执行的数据库迁移"""
+        conn = get_db_connection()
+        try:
+            if status:
+                cursor = conn.cursor()
+                try:
+                    applied = get_applied_versions(cursor)
+                finally:
+                    cursor.close()
+                for version, name, _ in list_migrations():
+                    click.echo(f"{version:04d}_{name}  {'已执行' if version in applied else '未执行'}")
+                return
+            done = apply_migrations(conn)
+        finally:
+            conn.close()
+        for version, name in done:
+            click.echo(f'已执行迁移 {version:04d}_{name}')
+        click.echo(f'数据库迁移完成，本次执行 {len(done)} 个')
@@ -26,11 +26,13 @@ CREATE TABLE `customers`  (
   `name` varchar(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NOT NULL COMMENT '客户姓名/企业名称',
   `phone` varchar(20) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT NULL COMMENT '联系电话',
   `address` varchar(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT NULL COMMENT '地址',
-  `is_default` tinyint(1) NULL DEFAULT 0 COMMENT '是否默认客户（散户）：1-是，0-否',
+  `is_default` tinyint(1) NOT NULL DEFAULT 0 COMMENT '是否默认客户（散户）：1-是，0-否',
   `status` enum('active','inactive') CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT 'active' COMMENT '状态',
-  `created_at` timestamp(0) NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '创建时间',
+  `created_at` timestamp(0) NOT NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '创建时间',
   `remark` text CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL COMMENT '备注',
-  PRIMARY KEY (`id`) USING BTREE
+  PRIMARY KEY (`id`) USING BTREE,
+  INDEX `idx_default_created`(`is_default`, `created_at`) USING BTREE,
+  FULLTEXT INDEX `ft_customers_search`(`name`, `phone`, `address`) WITH PARSER ngram
 ) ENGINE = InnoDB AUTO_INCREMENT = 5 CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci COMMENT = '客户表' ROW_FORMAT = Dynamic;
 
 -- ----------------------------
@@ -91,13 +93,14 @@ CREATE TABLE `incoming_orders`  (
   `total_amount` decimal(10, 2) NULL DEFAULT 0.00 COMMENT '总金额',
   `incoming_date` date NOT NULL COMMENT '进货日期',
   `user_id` int(11) NOT NULL COMMENT '操作人ID',
-  `created_at` timestamp(0) NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '创建时间',
+  `created_at` timestamp(0) NOT NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '创建时间',
   `remark` text CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL COMMENT '备注',
   PRIMARY KEY (`id`) USING BTREE,
   UNIQUE INDEX `order_no`(`order_no`) USING BTREE,
   INDEX `purchase_id`(`purchase_id`) USING BTREE,
   INDEX `supplier_id`(`supplier_id`) USING BTREE,
   INDEX `user_id`(`user_id`) USING BTREE,
+  INDEX `idx_incoming_date_created`(`incoming_date`, `created_at`) USING BTREE,
   CONSTRAINT `incoming_orders_ibfk_1` FOREIGN KEY (`purchase_id`) REFERENCES `purchase_orders` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT,
   CONSTRAINT `incoming_orders_ibfk_2` FOREIGN KEY (`supplier_id`) REFERENCES `suppliers` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT,
   CONSTRAINT `incoming_orders_ibfk_3` FOREIGN KEY (`user_id`) REFERENCES `users` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT
@@ -214,7 +217,7 @@ CREATE TABLE `inventory_checks`  (
   `status` enum('ongoing','completed') CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT 'ongoing' COMMENT '状态：ongoing-进行中，completed-已完成',
   `total_difference` int(11) NULL DEFAULT 0 COMMENT '总差异数量（正数盘盈，负数盘亏）',
   `user_id` int(11) NOT NULL COMMENT '盘点人ID',
-  `created_at` timestamp(0) NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '创建时间',
+  `created_at` timestamp(0) NOT NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '创建时间',
   `remark` text CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL COMMENT '备注',
   PRIMARY KEY (`id`) USING BTREE,
   UNIQUE INDEX `check_no`(`check_no`) USING BTREE,
@@ -279,12 +282,13 @@ CREATE TABLE `outgoing_orders`  (
   `profit` decimal(10, 2) NULL DEFAULT 0.00 COMMENT '利润',
   `sale_date` date NOT NULL COMMENT '销售日期',
   `user_id` int(11) NOT NULL COMMENT '操作人ID',
-  `created_at` timestamp(0) NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '创建时间',
+  `created_at` timestamp(0) NOT NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '创建时间',
   `remark` text CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL COMMENT '备注',
   PRIMARY KEY (`id`) USING BTREE,
   UNIQUE INDEX `order_no`(`order_no`) USING BTREE,
   INDEX `customer_id`(`customer_id`) USING BTREE,
   INDEX `user_id`(`user_id`) USING BTREE,
+  INDEX `idx_sale_date_created`(`sale_date`, `created_at`) USING BTREE,
   CONSTRAINT `outgoing_orders_ibfk_1` FOREIGN KEY (`customer_id`) REFERENCES `customers` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT,
   CONSTRAINT `outgoing_orders_ibfk_2` FOREIGN KEY (`user_id`) REFERENCES `users` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT
 ) ENGINE = InnoDB AUTO_INCREMENT = 8 CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci COMMENT = '出货表' ROW_FORMAT = Dynamic;
@@ -313,10 +317,12 @@ CREATE TABLE `products`  (
   `unit` varchar(10) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT '件' COMMENT '单位',
   `selling_price` decimal(10, 2) NOT NULL COMMENT '销售价格',
   `status` enum('active','inactive') CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT 'active' COMMENT '状态',
-  `created_at` timestamp(0) NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '创建时间',
+  `created_at` timestamp(0) NOT NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '创建时间',
   `remark` text CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL COMMENT '备注',
   PRIMARY KEY (`id`) USING BTREE,
-  UNIQUE INDEX `code`(`code`) USING BTREE
+  UNIQUE INDEX `code`(`code`) USING BTREE,
+  INDEX `idx_status_name`(`status`, `name`) USING BTREE,
+  FULLTEXT INDEX `ft_products_search`(`name`, `brand`, `code`) WITH PARSER ngram
 ) ENGINE = InnoDB AUTO_INCREMENT = 11 CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci COMMENT = '商品表' ROW_FORMAT = Dynamic;
 
 -- ----------------------------
@@ -334,6 +340,38 @@ INSERT INTO `products` VALUES (9, 'P009', '旺仔牛奶245ml', '乳制品', '旺
 INSERT INTO `products` VALUES (10, 'P010', '奥利奥饼干', '零食', '奥利奥', '包', 7.00, 'active', '2025-09-19 17:57:30', '夹心饼干');
 INSERT INTO `products` VALUES (11, 'P011', '洁柔抽纸', '日用品', '洁柔', '包', 5.00, 'active', '2025-09-22 16:44:21', NULL);
 
+-- ----------------------------
+-- Table structure for product_costs
+-- ----------------------------
+DROP TABLE IF EXISTS `product_costs`;
+CREATE TABLE `product_costs`  (
+  `product_id` int(11) NOT NULL COMMENT '商品ID',
+  `last_cost_price` decimal(10, 2) NOT NULL DEFAULT 0.00 COMMENT '最近进货价',
+  `last_incoming_date` date NULL DEFAULT NULL COMMENT '最近进货日期',
+  `total_quantity` bigint(20) NOT NULL DEFAULT 0 COMMENT '累计进货数量',
+  `total_amount` decimal(14, 2) NOT NULL DEFAULT 0.00 COMMENT '累计进货金额',
+  `avg_cost_price` decimal(12, 4) NOT NULL DEFAULT 0.0000 COMMENT '加权平均进价',
+  `updated_at` timestamp(0) NULL DEFAULT CURRENT_TIMESTAMP(0) ON UPDATE CURRENT_TIMESTAMP(0) COMMENT '更新时间',
+  PRIMARY KEY (`product_id`) USING BTREE,
+  CONSTRAINT `product_costs_ibfk_1` FOREIGN KEY (`product_id`) REFERENCES `products` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci COMMENT = '商品成本表' ROW_FORMAT = Dynamic;
+
+-- ----------------------------
+-- Records of product_costs（由进货明细汇总生成）
+-- ----------------------------
+INSERT INTO `product_costs` (`product_id`, `last_cost_price`, `last_incoming_date`, `total_quantity`, `total_amount`, `avg_cost_price`)
+SELECT t.product_id,
+       (SELECT d.cost_price FROM `incoming_details` d INNER JOIN `incoming_orders` o ON d.incoming_id = o.id
+        WHERE d.product_id = t.product_id ORDER BY o.incoming_date DESC, o.created_at DESC, d.id DESC LIMIT 1),
+       t.last_incoming_date, t.total_quantity, t.total_amount,
+       ROUND(t.total_amount / NULLIF(t.total_quantity, 0), 4)
+FROM (
+  SELECT id.product_id, MAX(io.incoming_date) AS last_incoming_date,
+         SUM(id.quantity) AS total_quantity, SUM(id.amount) AS total_amount
+  FROM `incoming_details` id INNER JOIN `incoming_orders` io ON id.incoming_id = io.id
+  GROUP BY id.product_id
+) t;
+
 -- ----------------------------
 -- Table structure for purchase_details
 -- ----------------------------
@@ -386,7 +424,7 @@ CREATE TABLE `purchase_orders`  (
   `total_amount` decimal(10, 2) NULL DEFAULT 0.00 COMMENT '总金额',
   `apply_user_id` int(11) NOT NULL COMMENT '申请人ID',
   `approve_user_id` int(11) NULL DEFAULT NULL COMMENT '审批人ID',
-  `apply_time` timestamp(0) NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '申请时间',
+  `apply_time` timestamp(0) NOT NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '申请时间',
   `approve_time` timestamp(0) NULL DEFAULT NULL COMMENT '审批时间',
   `remark` text CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL COMMENT '备注',
   PRIMARY KEY (`id`) USING BTREE,
@@ -394,6 +432,8 @@ CREATE TABLE `purchase_orders`  (
   INDEX `supplier_id`(`supplier_id`) USING BTREE,
   INDEX `apply_user_id`(`apply_user_id`) USING BTREE,
   INDEX `approve_user_id`(`approve_user_id`) USING BTREE,
+  INDEX `idx_status_supplier`(`status`, `supplier_id`, `total_amount`) USING BTREE,
+  INDEX `idx_apply_time_status`(`apply_time`, `status`, `total_amount`) USING BTREE,
   CONSTRAINT `purchase_orders_ibfk_1` FOREIGN KEY (`supplier_id`) REFERENCES `suppliers` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT,
   CONSTRAINT `purchase_orders_ibfk_2` FOREIGN KEY (`apply_user_id`) REFERENCES `users` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT,
   CONSTRAINT `purchase_orders_ibfk_3` FOREIGN KEY (`approve_user_id`) REFERENCES `users` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT
@@ -410,6 +450,75 @@ INSERT INTO `purchase_orders` VALUES (5, 'PO20250921121627', 4, 'approved', 760.
 INSERT INTO `purchase_orders` VALUES (6, 'PO20250921121725', 1, 'pending', 1300.00, 3, NULL, '2025-09-21 12:17:26', NULL, NULL);
 INSERT INTO `purchase_orders` VALUES (7, 'PO20250921130418', 5, 'stock', 3137.00, 3, 3, '2025-09-21 13:04:19', '2025-09-21 13:06:38', '一次大进货');
 
+-- ----------------------------
+-- Table structure for sales_daily_rollup
+-- ----------------------------
+DROP TABLE IF EXISTS `sales_daily_rollup`;
+CREATE TABLE `sales_daily_rollup`  (
+  `sale_date` date NOT NULL COMMENT '销售日期',
+  `product_id` int(11) NOT NULL COMMENT '商品ID',
+  `order_count` int(11) NOT NULL DEFAULT 0 COMMENT '包含该商品的订单数',
+  `quantity` bigint(20) NOT NULL DEFAULT 0 COMMENT '销售数量',
+  `sales_amount` decimal(14, 2) NOT NULL DEFAULT 0.00 COMMENT '销售金额',
+  `cost_amount` decimal(14, 2) NOT NULL DEFAULT 0.00 COMMENT '成本金额',
+  `profit` decimal(14, 2) NOT NULL DEFAULT 0.00 COMMENT '利润',
+  PRIMARY KEY (`sale_date`, `product_id`) USING BTREE,
+  INDEX `product_id`(`product_id`) USING BTREE,
+  CONSTRAINT `sales_daily_rollup_ibfk_1` FOREIGN KEY (`product_id`) REFERENCES `products` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci COMMENT = '商品销售日汇总表' ROW_FORMAT = Dynamic;
+
+-- ----------------------------
+-- Records of sales_daily_rollup（由销售明细汇总生成）
+-- ----------------------------
+INSERT INTO `sales_daily_rollup` (`sale_date`, `product_id`, `order_count`, `quantity`, `sales_amount`, `cost_amount`, `profit`)
+SELECT oo.sale_date, od.product_id, COUNT(DISTINCT oo.id), SUM(od.quantity),
+       SUM(od.amount), SUM(od.cost_amount), SUM(od.profit)
+FROM `outgoing_details` od INNER JOIN `outgoing_orders` oo ON od.outgoing_id = oo.id
+GROUP BY oo.sale_date, od.product_id;
+
+-- ----------------------------
+-- Table structure for sales_daily_totals
+-- ----------------------------
+DROP TABLE IF EXISTS `sales_daily_totals`;
+CREATE TABLE `sales_daily_totals`  (
+  `sale_date` date NOT NULL COMMENT '销售日期',
+  `order_count` int(11) NOT NULL DEFAULT 0 COMMENT '订单数',
+  `total_sales` decimal(14, 2) NOT NULL DEFAULT 0.00 COMMENT '销售金额',
+  `total_cost` decimal(14, 2) NOT NULL DEFAULT 0.00 COMMENT '成本金额',
+  `total_profit` decimal(14, 2) NOT NULL DEFAULT 0.00 COMMENT '利润',
+  `updated_at` timestamp(0) NULL DEFAULT CURRENT_TIMESTAMP(0) ON UPDATE CURRENT_TIMESTAMP(0) COMMENT '更新时间',
+  PRIMARY KEY (`sale_date`) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci COMMENT = '销售日汇总表' ROW_FORMAT = Dynamic;
+
+-- ----------------------------
+-- Records of sales_daily_totals（由销售订单汇总生成）
+-- ----------------------------
+INSERT INTO `sales_daily_totals` (`sale_date`, `order_count`, `total_sales`, `total_cost`, `total_profit`)
+SELECT sale_date, COUNT(*), COALESCE(SUM(total_amount), 0), COALESCE(SUM(total_cost), 0), COALESCE(SUM(profit), 0)
+FROM `outgoing_orders`
+GROUP BY sale_date;
+
+-- ----------------------------
+-- Table structure for schema_migrations
+-- ----------------------------
+DROP TABLE IF EXISTS `schema_migrations`;
+CREATE TABLE `schema_migrations`  (
+  `version` int(11) NOT NULL COMMENT '迁移版本号',
+  `name` varchar(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NOT NULL COMMENT '迁移名称',
+  `applied_at` timestamp(0) NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '执行时间',
+  PRIMARY KEY (`version`) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci COMMENT = '数据库迁移记录表' ROW_FORMAT = Dynamic;
+
+-- ----------------------------
+-- Records of schema_migrations（本脚本已包含以下迁移的结构）
+-- ----------------------------
+INSERT INTO `schema_migrations` (`version`, `name`) VALUES (1, 'hot_path_indexes');
+INSERT INTO `schema_migrations` (`version`, `name`) VALUES (2, 'purchase_apply_time_covering');
+INSERT INTO `schema_migrations` (`version`, `name`) VALUES (3, 'search_fulltext');
+INSERT INTO `schema_migrations` (`version`, `name`) VALUES (4, 'sort_keys_not_null');
+INSERT INTO `schema_migrations` (`version`, `name`) VALUES (5, 'product_costs');
+INSERT INTO `schema_migrations` (`version`, `name`) VALUES (6, 'sales_daily_rollup');
+
 -- ----------------------------
 -- Table structure for suppliers
 -- ----------------------------
@@ -421,9 +530,10 @@ CREATE TABLE `suppliers`  (
   `phone` varchar(20) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT NULL COMMENT '联系电话',
   `address` varchar(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT NULL COMMENT '地址',
   `status` enum('active','inactive') CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT 'active' COMMENT '状态',
-  `created_at` timestamp(0) NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '创建时间',
+  `created_at` timestamp(0) NOT NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '创建时间',
   `remark` text CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL COMMENT '备注',
-  PRIMARY KEY (`id`) USING BTREE
+  PRIMARY KEY (`id`) USING BTREE,
+  FULLTEXT INDEX `ft_suppliers_search`(`name`, `contact_person`) WITH PARSER ngram
 ) ENGINE = InnoDB AUTO_INCREMENT = 6 CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci COMMENT = '供应商表' ROW_FORMAT = Dynamic;
 
 -- ----------------------------
@@ -447,7 +557,7 @@ CREATE TABLE `users`  (
   `role` enum('manager','staff') CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NOT NULL DEFAULT 'staff' COMMENT '角色：manager-店长，staff-店员',
   `phone` varchar(20) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT NULL COMMENT '联系电话',
   `status` enum('active','inactive') CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT 'active' COMMENT '状态：active-启用，inactive-禁用',
-  `created_at` timestamp(0) NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '创建时间',
+  `created_at` timestamp(0) NOT NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '创建时间',
   `remark` text CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL COMMENT '备注',
   PRIMARY KEY (`id`) USING BTREE,
   UNIQUE INDEX `username`(`username`) USING BTREE
@@ -0,0 +1,17 @@
+-- 热点查询索引：报表/列表按日期筛选排序、应付结算与待处理采购按状态筛选、
+-- 结账取默认客户、商品按状态与名称检索
+ALTER TABLE `outgoing_orders`
+  ADD INDEX `idx_sale_date_created`(`sale_date`, `created_at`) USING BTREE;
+
+ALTER TABLE `incoming_orders`
+  ADD INDEX `idx_incoming_date_created`(`incoming_date`, `created_at`) USING BTREE;
+
+ALTER TABLE `purchase_orders`
+  ADD INDEX `idx_status_supplier`(`status`, `supplier_id`, `total_amount`) USING BTREE,
+  ADD INDEX `idx_apply_time`(`apply_time`) USING BTREE;
+
+ALTER TABLE `customers`
+  ADD INDEX `idx_default_created`(`is_default`, `created_at`) USING BTREE;
+
+ALTER TABLE `products`
+  ADD INDEX `idx_status_name`(`status`, `name`) USING BTREE;
@@ -0,0 +1,6 @@
+-- 采购报表按申请时间半开区间统计各状态单数与金额：
+-- (apply_time, status, total_amount) 覆盖索引支持范围扫描且无需回表，
+-- 同时可替代仅含 apply_time 的索引用于采购单列表排序
+ALTER TABLE `purchase_orders`
+  DROP INDEX `idx_apply_time`,
+  ADD INDEX `idx_apply_time_status`(`apply_time`, `status`, `total_amount`) USING BTREE;
@@ -0,0 +1,11 @@
+-- 可选的 MySQL 全文搜索后端（SEARCH_CONFIG['backend'] = 'fulltext'）：
+-- ngram 分词的 FULLTEXT 索引支撑商品、客户、供应商搜索的 MATCH ... AGAINST，
+-- 替代前导通配符 LIKE 的全表扫描。列顺序须与 utils/search.py 中 FULLTEXT_COLUMNS 一致
+ALTER TABLE `products`
+  ADD FULLTEXT INDEX `ft_products_search`(`name`, `brand`, `code`) WITH PARSER ngram;
+
+ALTER TABLE `customers`
+  ADD FULLTEXT INDEX `ft_customers_search`(`name`, `phone`, `address`) WITH PARSER ngram;
+
+ALTER TABLE `suppliers`
+  ADD FULLTEXT INDEX `ft_suppliers_search`(`name`, `contact_person`) WITH PARSER ngram;
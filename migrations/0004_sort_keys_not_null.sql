@@ -0,0 +1,36 @@
+-- 列表游标分页的排序键必须非空（NULL 与任何值比较都不成立，会导致翻页跳过行或游标无效）：
+-- 先把历史 NULL 回填为固定的早期时间（排在列表末尾），再改为 NOT NULL，
+-- 客户列表仍可直接使用 (is_default, created_at) 索引排序
+UPDATE `customers` SET `is_default` = 0 WHERE `is_default` IS NULL;
+UPDATE `customers` SET `created_at` = '2000-01-01 00:00:00' WHERE `created_at` IS NULL;
+ALTER TABLE `customers`
+  MODIFY `is_default` tinyint(1) NOT NULL DEFAULT 0 COMMENT '是否默认客户（散户）：1-是，0-否',
+  MODIFY `created_at` timestamp(0) NOT NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '创建时间';
+
+UPDATE `suppliers` SET `created_at` = '2000-01-01 00:00:00' WHERE `created_at` IS NULL;
+ALTER TABLE `suppliers`
+  MODIFY `created_at` timestamp(0) NOT NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '创建时间';
+
+UPDATE `users` SET `created_at` = '2000-01-01 00:00:00' WHERE `created_at` IS NULL;
+ALTER TABLE `users`
+  MODIFY `created_at` timestamp(0) NOT NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '创建时间';
+
+UPDATE `products` SET `created_at` = '2000-01-01 00:00:00' WHERE `created_at` IS NULL;
+ALTER TABLE `products`
+  MODIFY `created_at` timestamp(0) NOT NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '创建时间';
+
+UPDATE `purchase_orders` SET `apply_time` = '2000-01-01 00:00:00' WHERE `apply_time` IS NULL;
+ALTER TABLE `purchase_orders`
+  MODIFY `apply_time` timestamp(0) NOT NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '申请时间';
+
+UPDATE `incoming_orders` SET `created_at` = '2000-01-01 00:00:00' WHERE `created_at` IS NULL;
+ALTER TABLE `incoming_orders`
+  MODIFY `created_at` timestamp(0) NOT NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '创建时间';
+
+UPDATE `outgoing_orders` SET `created_at` = '2000-01-01 00:00:00' WHERE `created_at` IS NULL;
+ALTER TABLE `outgoing_orders`
+  MODIFY `created_at` timestamp(0) NOT NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '创建时间';
+
+UPDATE `inventory_checks` SET `created_at` = '2000-01-01 00:00:00' WHERE `created_at` IS NULL;
+ALTER TABLE `inventory_checks`
+  MODIFY `created_at` timestamp(0) NOT NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '创建时间';
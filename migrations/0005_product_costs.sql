@@ -0,0 +1,28 @@
+-- 商品成本查询表（utils/costs.py）：结账按主键读取最近进货价，进货时增量更新。
+-- 已通过 flask rebuild-product-costs 建过表的库同样适用：先清空再按进货明细全量回填
+CREATE TABLE IF NOT EXISTS `product_costs` (
+  `product_id` int(11) NOT NULL COMMENT '商品ID',
+  `last_cost_price` decimal(10, 2) NOT NULL DEFAULT 0.00 COMMENT '最近进货价',
+  `last_incoming_date` date NULL DEFAULT NULL COMMENT '最近进货日期',
+  `total_quantity` bigint(20) NOT NULL DEFAULT 0 COMMENT '累计进货数量',
+  `total_amount` decimal(14, 2) NOT NULL DEFAULT 0.00 COMMENT '累计进货金额',
+  `avg_cost_price` decimal(12, 4) NOT NULL DEFAULT 0.0000 COMMENT '加权平均进价',
+  `updated_at` timestamp(0) NULL DEFAULT CURRENT_TIMESTAMP(0) ON UPDATE CURRENT_TIMESTAMP(0) COMMENT '更新时间',
+  PRIMARY KEY (`product_id`) USING BTREE,
+  CONSTRAINT `product_costs_ibfk_1` FOREIGN KEY (`product_id`) REFERENCES `products` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COMMENT = '商品成本表';
+
+DELETE FROM `product_costs`;
+
+INSERT INTO `product_costs` (`product_id`, `last_cost_price`, `last_incoming_date`, `total_quantity`, `total_amount`, `avg_cost_price`)
+SELECT t.product_id,
+       (SELECT d.cost_price FROM `incoming_details` d INNER JOIN `incoming_orders` o ON d.incoming_id = o.id
+        WHERE d.product_id = t.product_id ORDER BY o.incoming_date DESC, o.created_at DESC, d.id DESC LIMIT 1),
+       t.last_incoming_date, t.total_quantity, t.total_amount,
+       ROUND(t.total_amount / NULLIF(t.total_quantity, 0), 4)
+FROM (
+  SELECT id.product_id, MAX(io.incoming_date) AS last_incoming_date,
+         SUM(id.quantity) AS total_quantity, SUM(id.amount) AS total_amount
+  FROM `incoming_details` id INNER JOIN `incoming_orders` io ON id.incoming_id = io.id
+  GROUP BY id.product_id
+) t;
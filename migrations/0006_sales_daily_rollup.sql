@@ -0,0 +1,39 @@
+-- 销售日汇总表（utils/rollup.py）：结账与退货在同一事务内累加，报表只读汇总表。
+-- 已通过 flask rebuild-sales-rollup 建过表的库同样适用：先清空再按销售单全量回填
+CREATE TABLE IF NOT EXISTS `sales_daily_totals` (
+  `sale_date` date NOT NULL COMMENT '销售日期',
+  `order_count` int(11) NOT NULL DEFAULT 0 COMMENT '订单数',
+  `total_sales` decimal(14, 2) NOT NULL DEFAULT 0.00 COMMENT '销售金额',
+  `total_cost` decimal(14, 2) NOT NULL DEFAULT 0.00 COMMENT '成本金额',
+  `total_profit` decimal(14, 2) NOT NULL DEFAULT 0.00 COMMENT '利润',
+  `updated_at` timestamp(0) NULL DEFAULT CURRENT_TIMESTAMP(0) ON UPDATE CURRENT_TIMESTAMP(0) COMMENT '更新时间',
+  PRIMARY KEY (`sale_date`) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COMMENT = '销售日汇总表';
+
+CREATE TABLE IF NOT EXISTS `sales_daily_rollup` (
+  `sale_date` date NOT NULL COMMENT '销售日期',
+  `product_id` int(11) NOT NULL COMMENT '商品ID',
+  `order_count` int(11) NOT NULL DEFAULT 0 COMMENT '包含该商品的订单数',
+  `quantity` bigint(20) NOT NULL DEFAULT 0 COMMENT '销售数量',
+  `sales_amount` decimal(14, 2) NOT NULL DEFAULT 0.00 COMMENT '销售金额',
+  `cost_amount` decimal(14, 2) NOT NULL DEFAULT 0.00 COMMENT '成本金额',
+  `profit` decimal(14, 2) NOT NULL DEFAULT 0.00 COMMENT '利润',
+  PRIMARY KEY (`sale_date`, `product_id`) USING BTREE,
+  INDEX `product_id`(`product_id`) USING BTREE,
+  CONSTRAINT `sales_daily_rollup_ibfk_1` FOREIGN KEY (`product_id`) REFERENCES `products` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COMMENT = '商品销售日汇总表';
+
+DELETE FROM `sales_daily_rollup`;
+
+DELETE FROM `sales_daily_totals`;
+
+INSERT INTO `sales_daily_rollup` (`sale_date`, `product_id`, `order_count`, `quantity`, `sales_amount`, `cost_amount`, `profit`)
+SELECT oo.sale_date, od.product_id, COUNT(DISTINCT oo.id), SUM(od.quantity),
+       SUM(od.amount), SUM(od.cost_amount), SUM(od.profit)
+FROM `outgoing_details` od INNER JOIN `outgoing_orders` oo ON od.outgoing_id = oo.id
+GROUP BY oo.sale_date, od.product_id;
+
+INSERT INTO `sales_daily_totals` (`sale_date`, `order_count`, `total_sales`, `total_cost`, `total_profit`)
+SELECT sale_date, COUNT(*), COALESCE(SUM(total_amount), 0), COALESCE(SUM(total_cost), 0), COALESCE(SUM(profit), 0)
+FROM `outgoing_orders`
+GROUP BY sale_date;
@@ -0,0 +1,167 @@
+"""
+生产模式启动入口
+
+    python serve.py                       # 按默认配置启动
+    python serve.py --workers 4 --threads 8 --bind 0.0.0.0:8000
+    python serve.py --config serve_conf.py
+
+- gunicorn（Linux/macOS，默认）：预派生 workers 个进程（默认 1 个），每个进程 threads 个线程（gthread）；
+  预加载应用（preload），蓝图导入、条码映射、搜索索引在主进程完成后由 worker 写时复制共享；
+  每个 worker 处理 max_requests（加随机抖动）个请求后自动重启，避免内存缓慢增长；
+  kill -HUP <主进程号> 平滑重启全部 worker（预加载模式下不重新加载代码，升级代码用 USR2 或重启服务）
+- waitress（Windows 或未安装 gunicorn 时）：单进程 workers * threads 个线程，不支持进程回收
+
+默认单进程多线程：以下状态保存在各进程内，workers > 1 时各进程互不可见
+- 仪表盘缓存与 ETag 写入代数：必须将 utils/cache.py 的 CACHE_CONFIG['backend'] 设为 'redis'，
+  否则一个进程的写入不会使其他进程的缓存与 ETag 失效；仍为进程内缓存时拒绝启动
+- /metrics 的请求统计：每次抓取只返回处理该请求的那个进程的计数
+- 商品搜索索引与条码映射：其他进程的修改分别在 SEARCH_CONFIG / BARCODE_CONFIG 的 max_age 秒内同步
+
+配置优先级：SERVE_CONFIG 默认值 < --config 文件（Python 文件，按键名赋值，如 workers = 4）
+< 环境变量 BS_SHOP_<键名大写>（如 BS_SHOP_WORKERS=4）< 命令行参数。
+"""
+import argparse
+import os
+import runpy
+import sys
+
+# 服务配置
+SERVE_CONFIG = {
+    'server': 'auto',                # auto / gunicorn / waitress
+    'bind': '0.0.0.0:5000',
+    'workers': 1,                    # 进程数，大于 1 时必须使用 Redis 缓存后端，否则拒绝启动（见模块说明）
+    'threads': 8,                    # 每个 worker 的线程数
+    'max_requests': 2000,            # worker 处理多少请求后重启，0 表示不重启
+    'max_requests_jitter': 200,      # 重启请求数的随机抖动，避免 worker 同时重启
+    'timeout': 60,                   # worker 无响应多少秒后被杀死重启
+    'graceful_timeout': 30,          # 平滑重启时等待进行中请求的秒数
+    'keepalive': 5,
+    'preload': True,
+    'pidfile': None,
+    'accesslog': None                # 访问日志路径，'-' 表示标准输出
+}
+
+_INT_KEYS = ('workers', 'threads', 'max_requests', 'max_requests_jitter', 'timeout', 'graceful_timeout', 'keepalive')
+
+
+def _parse_value(key, value):
+    if key in _INT_KEYS:
+        return int(value)
+    if key == 'preload':
+        return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+    return value
+
+
+def load_config(config_file=None, overrides=None):
+    """合并默认值、配置文件、环境变量与命令行参数"""
+    config = dict(SERVE_CONFIG)
+    if config_file:
+        values = runpy.run_path(config_file)
+        config.update({key: values[key] for key in SERVE_CONFIG if key in values})
+    for key in SERVE_CONFIG:
+        value = os.environ.get(f'BS_SHOP_{key.upper()}')
+        if value is not None:
+            config[key] = _parse_value(key, value)
+    config.update({key: value for key, value in (overrides or {}).items() if value is not None})
+    return config
+
+
+def _choose_server(config):
+    server = config['server']
+    if server != 'auto':
+        return server
+    if os.name != 'nt':
+        try:
+            import gunicorn  # noqa: F401
+            return 'gunicorn'
+        except ImportError:
+            pass
+    return 'waitress'
+
+
+def run_gunicorn(config):
+    from gunicorn.app.base import BaseApplication
+
+    from utils.cache import CACHE_CONFIG
+    from utils.database import get_pool
+
+    if config['workers'] > 1 and CACHE_CONFIG['backend'] != 'redis':
+        # 仪表盘缓存与 ETag 写入代数只在各进程内，其他进程的写入不会使其失效，拒绝启动
+        raise SystemExit(f"workers = {config['workers']} 时需将 utils/cache.py 的 CACHE_CONFIG['backend'] 设为 'redis'，"
+                         "或使用单进程（--workers 1）")
+
+    def when_ready(server):
+        # 预加载时主进程预热用过的空闲连接在 fork 前关闭，worker 各自建立连接
+        get_pool().close_all()
+        server.log.info(f"便利店进销存系统已启动: {config['bind']}，{config['workers']} 进程 x {config['threads']} 线程")
+
+    options = {
+        'bind': config['bind'],
+        'workers': config['workers'],
+        'threads': config['threads'],
+        'worker_class': 'gthread',
+        'max_requests': config['max_requests'],
+        'max_requests_jitter': config['max_requests_jitter'],
+        'timeout': config['timeout'],
+        'graceful_timeout': config['graceful_timeout'],
+        'keepalive': config['keepalive'],
+        'preload_app': config['preload'],
+        'pidfile': config['pidfile'],
+        'accesslog': config['accesslog'],
+        'when_ready': when_ready
+    }
+
+    class GunicornApplication(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                if value is not None:
+                    self.cfg.set(key, value)
+
+        def load(self):
+            from wsgi import app
+            return app
+
+    GunicornApplication().run()
+
+
+def run_waitress(config):
+    from waitress import serve
+
+    from wsgi import app
+
+    threads = config['workers'] * config['threads']
+    print(f"便利店进销存系统已启动（waitress）: {config['bind']}，{threads} 线程")
+    serve(app, listen=config['bind'], threads=threads, channel_timeout=config['timeout'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='生产模式启动')
+    parser.add_argument('--config', help='配置文件（Python 文件）')
+    parser.add_argument('--server', choices=['auto', 'gunicorn', 'waitress'])
+    parser.add_argument('--bind', help='监听地址，如 0.0.0.0:5000')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--threads', type=int)
+    parser.add_argument('--max-requests', type=int)
+    parser.add_argument('--no-preload', dest='preload', action='store_false', default=None,
+                        help='不预加载应用（每个 worker 各自导入与预热）')
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config, {
+        'server': args.server,
+        'bind': args.bind,
+        'workers': args.workers,
+        'threads': args.threads,
+        'max_requests': args.max_requests,
+        'preload': args.preload
+    })
+    server = _choose_server(config)
+    if server == 'gunicorn':
+        # gunicorn 会解析 sys.argv，这里的参数已处理完毕
+        sys.argv = sys.argv[:1]
+        run_gunicorn(config)
+    else:
+        run_waitress(config)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,7 @@
 认证和权限管理模块
 """
 from functools import wraps
-from flask import session, jsonify, request
+from flask import session, jsonify, request, redirect, url_for
 import hashlib
 
 def hash_password(password):
@@ -42,6 +42,18 @@ def manager_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def manager_page_required(f):
+    """页面路由的管理员权限验证装饰器（未登录跳转登录页）"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'user_id' not in session:
+            return redirect(url_for('login_page'))
+        
+        if session.get('role') != 'manager':
+            return '权限不足，需要管理员权限', 403
+        return f(*args, **kwargs)
+    return decorated_function
+
 def get_current_user():
     """获取当前登录用户信息"""
     if 'user_id' in session:
@@ -52,44 +64,3 @@ def get_current_user():
             'real_name': session.get('real_name')
         }
     return None
-
-def paginate_query(cursor, page=1, size=10, count_query=None, data_query=None):
-    """
-    分页查询辅助函数
-    
-    Args:
-        cursor: 数据库游标
-        page: 页码（从1开始）
-        size: 每页数量
-        count_query: 计数查询SQL
-        data_query: 数据查询SQL
-    
-    Returns:
-        dict: 包含分页信息的结果
-    """
-    # 计算偏移量
-    offset = (page - 1) * size
-    
-    # 执行计数查询
-    cursor.execute(count_query)
-    total = cursor.fetchone()[0]
-    
-    # 执行数据查询
-    data_query_with_limit = f"{data_query} LIMIT {size} OFFSET {offset}"
-    cursor.execute(data_query_with_limit)
-    data = cursor.fetchall()
-    
-    # 计算总页数
-    total_pages = (total + size - 1) // size
-    
-    return {
-        'data': data,
-        'pagination': {
-            'page': page,
-            'size': size,
-            'total': total,
-            'total_pages': total_pages,
-            'has_prev': page > 1,
-            'has_next': page < total_pages
-        }
-    }
\ No newline at end of file
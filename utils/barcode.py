@@ -0,0 +1,211 @@
+"""
+商品条码查找模块
+
+收银扫码按编码（条码）取商品与库存，走进程内的 编码 -> 商品 映射，不查数据库：
+- 应用启动时预热（init_app 中后台加载），未预热时首次查找加载
+- 商品增删改、库存变动（销售、退货、进货）提交后（事务之外）按商品ID刷新对应条目，
+  刷新失败只记录日志并标记映射过期；盘点完成等批量调整同样标记过期，下次查找时整体重载
+- 映射中找不到的编码回源数据库查一次（其他进程新建的商品），命中即补入映射
+- 多进程部署时各进程按 BARCODE_CONFIG['max_age'] 定期整体重载，以同步其他进程的库存变动；
+  展示用库存允许短暂滞后，结账时仍在事务内加锁校验库存
+"""
+import threading
+import time
+
+from utils.cache import cache_logger
+from utils.database import get_db_connection
+
+# 条码映射配置
+BARCODE_CONFIG = {
+    'max_age': 60   # 整体重载间隔（秒），0 表示只在首次使用时加载
+}
+
+_PRODUCT_COLUMNS = """
+    SELECT p.id, p.code, p.name, p.category, p.brand, p.unit,
+           p.selling_price, p.status, COALESCE(i.quantity, 0) AS stock_quantity
+    FROM products p
+    LEFT JOIN inventory i ON p.id = i.product_id
+"""
+
+
+def _as_tuple(row):
+    """兼容元组与字典游标的结果行（字典按查询列顺序取值）"""
+    return tuple(row.values()) if isinstance(row, dict) else row
+
+
+def _to_entry(row):
+    row = _as_tuple(row)
+    return {
+        'id': row[0],
+        'code': row[1],
+        'name': row[2],
+        'category': row[3],
+        'brand': row[4],
+        'unit': row[5],
+        'selling_price': float(row[6]),
+        'status': row[7],
+        'stock_quantity': int(row[8])
+    }
+
+
+class ProductCodeMap:
+    """编码 -> 商品（含库存）映射（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_code = {}   # code -> entry
+        self._codes = {}     # id -> code
+        self.loaded_at = None
+        self.stale = False
+
+    def __len__(self):
+        return len(self._by_code)
+
+    def load(self, rows):
+        """用全部商品行整体替换映射"""
+        by_code = {}
+        codes = {}
+        for row in rows:
+            entry = _to_entry(row)
+            if entry['code']:
+                by_code[entry['code']] = entry
+                codes[entry['id']] = entry['code']
+        with self._lock:
+            self._by_code = by_code
+            self._codes = codes
+            self.loaded_at = time.monotonic()
+            self.stale = False
+
+    def get(self, code):
+        return self._by_code.get(code)
+
+    def put(self, row):
+        entry = _to_entry(row)
+        with self._lock:
+            old_code = self._codes.pop(entry['id'], None)
+            if old_code is not None:
+                self._by_code.pop(old_code, None)
+            if entry['code']:
+                self._by_code[entry['code']] = entry
+                self._codes[entry['id']] = entry['code']
+
+    def remove(self, product_id):
+        with self._lock:
+            code = self._codes.pop(product_id, None)
+            if code is not None:
+                self._by_code.pop(code, None)
+
+
+_code_map = ProductCodeMap()
+_load_lock = threading.Lock()
+
+
+def _expired():
+    max_age = BARCODE_CONFIG['max_age']
+    return _code_map.stale or (bool(max_age) and time.monotonic() - _code_map.loaded_at >= max_age)
+
+
+def warm_code_map():
+    """从数据库整体加载映射"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(_PRODUCT_COLUMNS)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+    _code_map.load(rows)
+    return len(_code_map)
+
+
+def _ensure_loaded():
+    if _code_map.loaded_at is None:
+        with _load_lock:
+            if _code_map.loaded_at is None:
+                warm_code_map()
+    elif _expired() and _load_lock.acquire(blocking=False):
+        # 到期重载期间其他请求继续使用旧映射
+        try:
+            if _expired():
+                warm_code_map()
+        finally:
+            _load_lock.release()
+
+
+def lookup_codes(codes):
+    """
+    按编码批量查找商品
+
+    Args:
+        codes: 编码列表
+
+    Returns:
+        dict: {code: 商品信息}，找不到的编码不在结果中
+    """
+    _ensure_loaded()
+    found = {}
+    missing = []
+    for code in codes:
+        entry = _code_map.get(code)
+        if entry is not None:
+            found[code] = entry
+        elif code not in missing:
+            missing.append(code)
+
+    if missing:
+        # 回源数据库（其他进程新建或改码的商品）
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            placeholders = ', '.join(['%s'] * len(missing))
+            cursor.execute(f"{_PRODUCT_COLUMNS} WHERE p.code IN ({placeholders})", missing)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+            conn.close()
+        for row in rows:
+            _code_map.put(row)
+            code = _as_tuple(row)[1]
+            found[code] = _code_map.get(code)
+    return found
+
+
+def refresh_codes(product_ids):
+    """
+    商品或库存写入提交后刷新映射中对应条目（映射尚未加载时跳过）
+
+    在事务提交之后、事务的 try 之外调用，使用独立连接查询；
+    出错时只记录日志并标记映射过期，不影响已提交的写入。
+
+    Args:
+        product_ids: 商品ID列表
+    """
+    if _code_map.loaded_at is None:
+        return
+    product_ids = sorted(set(product_ids))
+    if not product_ids:
+        return
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            placeholders = ', '.join(['%s'] * len(product_ids))
+            cursor.execute(f"{_PRODUCT_COLUMNS} WHERE p.id IN ({placeholders})", product_ids)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+            conn.close()
+    except Exception as e:
+        _code_map.stale = True
+        cache_logger.warning(f'条码映射刷新失败，下次查找时整体重载: {str(e)}')
+        return
+    for row in rows:
+        _code_map.put(row)
+    for product_id in set(product_ids) - {_as_tuple(row)[0] for row in rows}:
+        _code_map.remove(product_id)
+
+
+def expire_code_map():
+    """批量库存调整后标记映射过期，下次查找时整体重载"""
+    _code_map.stale = True
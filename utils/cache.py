@@ -0,0 +1,209 @@
+"""
+应用内缓存模块
+
+默认使用进程内缓存（LocalCache）；CACHE_CONFIG['backend'] 设为 'redis' 且安装了 redis 包时，
+改用 Redis 在多进程间共享缓存（接口与 LocalCache 一致）。
+"""
+import json
+import logging
+import threading
+import time
+from datetime import date
+
+from utils.json_provider import json_default
+
+cache_logger = logging.getLogger('bs_shop.cache')
+
+# 缓存配置
+CACHE_CONFIG = {
+    'backend': 'local',                      # local 或 redis
+    'redis_url': 'redis://localhost:6379/0',
+    'key_prefix': 'bs_shop:',
+    'dashboard_ttl': 15                      # 仪表盘各分区缓存时间（秒）
+}
+
+
+class LocalCache:
+    """线程安全的进程内 TTL 缓存"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}   # key -> (expires_at, value)
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                del self._data[key]
+                return None
+            return item[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+
+    def incr(self, key):
+        """计数加一（不过期），返回新值"""
+        with self._lock:
+            item = self._data.get(key)
+            value = (item[1] if item is not None else 0) + 1
+            self._data[key] = (float('inf'), value)
+            return value
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCache:
+    """Redis 缓存（值以 JSON 存储）"""
+
+    def __init__(self, url, key_prefix=''):
+        import redis
+        self._client = redis.Redis.from_url(url)
+        self._prefix = key_prefix
+
+    def get(self, key):
+        value = self._client.get(self._prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl):
+        self._client.set(self._prefix + key, json.dumps(value, ensure_ascii=False, default=json_default), ex=max(1, int(ttl)))
+
+    def incr(self, key):
+        """计数加一（不过期），返回新值"""
+        return self._client.incr(self._prefix + key)
+
+    def delete(self, *keys):
+        if keys:
+            self._client.delete(*[self._prefix + key for key in keys])
+
+    def clear(self):
+        for key in self._client.scan_iter(self._prefix + '*'):
+            self._client.delete(key)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+_build_locks = {}
+_stats_lock = threading.Lock()
+_stats = {}   # 命名空间（键的第一段）-> [命中次数, 未命中次数]
+
+
+def _count(key, hit):
+    namespace = key.split(':', 1)[0]
+    with _stats_lock:
+        counts = _stats.get(namespace)
+        if counts is None:
+            counts = _stats[namespace] = [0, 0]
+        counts[0 if hit else 1] += 1
+
+
+def get_cache_stats():
+    """cached() 的命中统计：{命名空间: {'hits', 'misses', 'hit_ratio'}}"""
+    with _stats_lock:
+        items = [(namespace, hits, misses) for namespace, (hits, misses) in _stats.items()]
+    return {
+        namespace: {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else 0.0
+        }
+        for namespace, hits, misses in items
+    }
+
+
+def get_cache():
+    """获取全局缓存（首次使用时按 CACHE_CONFIG 创建，Redis 不可用时退回进程内缓存）"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                cache = None
+                if CACHE_CONFIG['backend'] == 'redis':
+                    try:
+                        cache = RedisCache(CACHE_CONFIG['redis_url'], CACHE_CONFIG['key_prefix'])
+                    except ImportError:
+                        cache = None
+                _cache = cache or LocalCache()
+    return _cache
+
+
+def cached(key, builder, ttl):
+    """
+    读取缓存，未命中时调用 builder() 生成并写入缓存
+
+    同一进程内同一 key 同时只有一个请求执行 builder，其余请求等待后直接读取结果，
+    避免缓存过期瞬间大量轮询请求同时回源数据库。
+    """
+    cache = get_cache()
+    value = cache.get(key)
+    if value is not None:
+        _count(key, True)
+        return value
+
+    with _cache_lock:
+        lock = _build_locks.setdefault(key, threading.Lock())
+    with lock:
+        value = cache.get(key)
+        if value is None:
+            _count(key, False)
+            value = builder()
+            cache.set(key, value, ttl)
+        else:
+            _count(key, True)
+    return value
+
+
+# 仪表盘缓存分区：sales 销售统计，inventory 库存统计，purchase 待处理采购单
+DASHBOARD_SECTIONS = ('sales', 'inventory', 'purchase')
+
+
+def dashboard_cache_key(section):
+    """仪表盘分区缓存键（销售分区按日期区分，跨天自动失效）"""
+    if section == 'sales':
+        return f'dashboard:sales:{date.today().isoformat()}'
+    return f'dashboard:{section}'
+
+
+def invalidate_dashboard(*sections):
+    """
+    数据写入提交后使仪表盘对应分区缓存失效（不传参数时全部失效）
+
+    在事务提交之后、事务的 try 之外调用；缓存后端出错时只记录日志，
+    不影响已提交的写入（缓存最多在 dashboard_ttl 秒后自然过期）
+    """
+    try:
+        get_cache().delete(*[dashboard_cache_key(section) for section in (sections or DASHBOARD_SECTIONS)])
+    except Exception as e:
+        cache_logger.warning(f'仪表盘缓存失效失败 {", ".join(sections) or "全部"}: {str(e)}')
+
+
+# 数据写入代数：写入事务提交后加一，用作 GET 响应 ETag 的数据版本（见 utils/http_cache.py）
+DATA_GENERATION_KEY = 'data:generation'
+
+
+def data_generation():
+    """当前数据写入代数"""
+    return get_cache().get(DATA_GENERATION_KEY) or 0
+
+
+def bump_data_generation():
+    """
+    数据写入提交后调用，使此前发出的 ETag 全部失效
+
+    与 invalidate_dashboard 一样在事务的 try 之外调用；缓存后端出错时只记录日志，
+    ETag 仍会按 HTTP_CACHE_CONFIG['etag_max_age'] 的时间段变化
+    """
+    try:
+        return get_cache().incr(DATA_GENERATION_KEY)
+    except Exception as e:
+        cache_logger.warning(f'数据写入代数更新失败: {str(e)}')
+        return None
@@ -0,0 +1,93 @@
+"""
+商品成本查询表（product_costs）维护模块
+
+product_costs 按商品保存最近一次进货价与加权平均进价，
+销售时按主键直接读取，避免每次对进货明细排序查找。
+"""
+
+# 加权平均进价 = 累计进货金额 / 累计进货数量
+PRODUCT_COSTS_DDL = """
+    CREATE TABLE IF NOT EXISTS `product_costs` (
+      `product_id` int(11) NOT NULL COMMENT '商品ID',
+      `last_cost_price` decimal(10, 2) NOT NULL DEFAULT 0.00 COMMENT '最近进货价',
+      `last_incoming_date` date NULL DEFAULT NULL COMMENT '最近进货日期',
+      `total_quantity` bigint(20) NOT NULL DEFAULT 0 COMMENT '累计进货数量',
+      `total_amount` decimal(14, 2) NOT NULL DEFAULT 0.00 COMMENT '累计进货金额',
+      `avg_cost_price` decimal(12, 4) NOT NULL DEFAULT 0.0000 COMMENT '加权平均进价',
+      `updated_at` timestamp(0) NULL DEFAULT CURRENT_TIMESTAMP(0) ON UPDATE CURRENT_TIMESTAMP(0) COMMENT '更新时间',
+      PRIMARY KEY (`product_id`) USING BTREE,
+      CONSTRAINT `product_costs_ibfk_1` FOREIGN KEY (`product_id`) REFERENCES `products` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT
+    ) ENGINE = InnoDB CHARACTER SET = utf8mb4 COMMENT = '商品成本表'
+"""
+
+
+def update_product_costs(cursor, details, incoming_date):
+    """
+    进货入库时增量更新商品成本（需在进货事务内调用）
+
+    Args:
+        cursor: 数据库游标
+        details: 进货明细列表（含 product_id, quantity, cost_price, amount）
+        incoming_date: 进货日期
+    """
+    # 同一进货单内同一商品多行时合并，最近进货价取最后一行
+    merged = {}
+    for detail in details:
+        item = merged.setdefault(detail['product_id'], {'quantity': 0, 'amount': 0.0})
+        item['quantity'] += int(detail['quantity'])
+        item['amount'] += float(detail['amount'])
+        item['cost_price'] = float(detail['cost_price'])
+
+    if not merged:
+        return
+
+    # 补录的历史进货（日期早于已记录的最近进货日期）不覆盖最近进货价
+    cursor.executemany("""
+        INSERT INTO product_costs (product_id, last_cost_price, last_incoming_date,
+                                   total_quantity, total_amount, avg_cost_price)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            last_cost_price = IF(last_incoming_date IS NULL OR VALUES(last_incoming_date) >= last_incoming_date,
+                                 VALUES(last_cost_price), last_cost_price),
+            last_incoming_date = IF(last_incoming_date IS NULL OR VALUES(last_incoming_date) >= last_incoming_date,
+                                    VALUES(last_incoming_date), last_incoming_date),
+            total_quantity = total_quantity + VALUES(total_quantity),
+            total_amount = total_amount + VALUES(total_amount),
+            avg_cost_price = ROUND(total_amount / NULLIF(total_quantity, 0), 4)
+    """, [(product_id, item['cost_price'], incoming_date, item['quantity'], item['amount'],
+           round(item['amount'] / item['quantity'], 4) if item['quantity'] else 0)
+          for product_id, item in merged.items()])
+
+
+def rebuild_product_costs(cursor):
+    """
+    根据全部进货历史重建商品成本表
+
+    Returns:
+        int: 重建的商品数量
+    """
+    cursor.execute(PRODUCT_COSTS_DDL)
+    cursor.execute("DELETE FROM product_costs")
+    cursor.execute("""
+        INSERT INTO product_costs (product_id, last_cost_price, last_incoming_date,
+                                   total_quantity, total_amount, avg_cost_price)
+        SELECT t.product_id,
+               (SELECT d.cost_price
+                FROM incoming_details d
+                INNER JOIN incoming_orders o ON d.incoming_id = o.id
+                WHERE d.product_id = t.product_id
+                ORDER BY o.incoming_date DESC, o.created_at DESC, d.id DESC
+                LIMIT 1),
+               t.last_incoming_date, t.total_quantity, t.total_amount,
+               ROUND(t.total_amount / NULLIF(t.total_quantity, 0), 4)
+        FROM (
+            SELECT id.product_id,
+                   MAX(io.incoming_date) AS last_incoming_date,
+                   SUM(id.quantity) AS total_quantity,
+                   SUM(id.amount) AS total_amount
+            FROM incoming_details id
+            INNER JOIN incoming_orders io ON id.incoming_id = io.id
+            GROUP BY id.product_id
+        ) t
+    """)
+    return cursor.rowcount
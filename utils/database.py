@@ -1,7 +1,22 @@
 """
 数据库连接和配置模块
+
+连接池借出的游标均带有 SQL 统计：请求内每条语句的耗时与行数汇总到 flask.g，
+由 app.py 输出 X-DB-Queries / X-DB-Time 响应头；慢查询与疑似 N+1 查询
+（同一语句在一个请求内重复执行过多次）写入 bs_shop.sql 日志。
 """
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
 import pymysql
+from flask import g, has_request_context, request
 
 # 数据库配置
 DB_CONFIG = {
@@ -13,12 +28,439 @@ DB_CONFIG = {
     'charset': 'utf8mb4'
 }
 
+# 连接池配置
+POOL_CONFIG = {
+    'max_size': 10,                # 最大连接数（含借出与空闲）
+    'max_idle': 5,                 # 最多保留的空闲连接数
+    'max_lifetime': 3600,          # 连接最长存活时间（秒），超过后回收重建
+    'health_check_interval': 30,   # 空闲超过该秒数的连接在借出前先 ping 一次
+    'wait_timeout': 10             # 连接池耗尽时等待归还的最长时间（秒）
+}
+
+
+# SQL 统计配置
+QUERY_STATS_CONFIG = {
+    'enabled': True,
+    'slow_query_ms': 200,       # 超过该耗时（毫秒）的语句记入慢查询日志
+    'n_plus_one_threshold': 20  # 同一语句在一个请求内执行超过该次数时告警
+}
+
+# 可重试的 MySQL 错误：1213 死锁，1205 锁等待超时
+RETRYABLE_ERROR_CODES = (1213, 1205)
+
+sql_logger = logging.getLogger('bs_shop.sql')
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_PLACEHOLDER_LIST_RE = re.compile(r'%s(?:\s*,\s*%s)+')
+
+
+def normalize_sql(sql):
+    """归一化 SQL：合并空白，折叠 IN (%s, %s, ...) 等变长占位符列表"""
+    return _PLACEHOLDER_LIST_RE.sub('%s, ...', _WHITESPACE_RE.sub(' ', sql).strip())
+
+
+def _params_shape(params):
+    if params is None:
+        return 0
+    if isinstance(params, dict):
+        return sorted(params)
+    if isinstance(params, (list, tuple)):
+        return len(params)
+    return 1
+
+
+def _record_query(sql, params, duration, rows):
+    """记录一条语句：汇总到当前请求的 g.db_stats，超过阈值时写慢查询日志"""
+    normalized = normalize_sql(sql)
+    if duration * 1000 >= QUERY_STATS_CONFIG['slow_query_ms']:
+        where = f'{request.method} {request.path}' if has_request_context() else '-'
+        sql_logger.warning(f'慢查询 {duration * 1000:.1f}ms rows={rows} params={_params_shape(params)} '
+                           f'[{where}] {normalized}')
+    if not has_request_context():
+        return
+    stats = g.get('db_stats')
+    if stats is None:
+        return
+    stats['queries'] += 1
+    stats['time'] += duration
+    item = stats['statements'].get(normalized)
+    if item is None:
+        stats['statements'][normalized] = [1, duration]
+    else:
+        item[0] += 1
+        item[1] += duration
+
+
+class TracedCursorMixin:
+    """为 pymysql 游标增加执行统计（executemany 内部的 execute 不重复计数）"""
+
+    _tracing = False
+
+    def execute(self, query, args=None):
+        if self._tracing or not QUERY_STATS_CONFIG['enabled']:
+            return super().execute(query, args)
+        self._tracing = True
+        start = time.perf_counter()
+        try:
+            return super().execute(query, args)
+        finally:
+            self._tracing = False
+            _record_query(query, args, time.perf_counter() - start, self.rowcount)
+
+    def executemany(self, query, args):
+        if self._tracing or not QUERY_STATS_CONFIG['enabled']:
+            return super().executemany(query, args)
+        self._tracing = True
+        start = time.perf_counter()
+        try:
+            return super().executemany(query, args)
+        finally:
+            self._tracing = False
+            _record_query(query, args, time.perf_counter() - start, self.rowcount)
+
+
+_traced_cursor_classes = {}
+
+
+def traced_cursor_class(cursorclass):
+    """获取带执行统计的游标类"""
+    if issubclass(cursorclass, TracedCursorMixin):
+        return cursorclass
+    traced = _traced_cursor_classes.get(cursorclass)
+    if traced is None:
+        traced = type('Traced' + cursorclass.__name__, (TracedCursorMixin, cursorclass), {})
+        _traced_cursor_classes[cursorclass] = traced
+    return traced
+
+
+def begin_request_stats():
+    """请求开始时初始化 SQL 统计"""
+    g.db_stats = {'queries': 0, 'time': 0.0, 'statements': {}}
+
+
+def end_request_stats(response):
+    """请求结束时输出 X-DB-Queries / X-DB-Time 响应头，并检查疑似 N+1 查询"""
+    stats = g.get('db_stats')
+    if stats is None:
+        return response
+    response.headers['X-DB-Queries'] = str(stats['queries'])
+    response.headers['X-DB-Time'] = f"{stats['time'] * 1000:.3f}"
+    threshold = QUERY_STATS_CONFIG['n_plus_one_threshold']
+    for normalized, (count, duration) in stats['statements'].items():
+        if count > threshold:
+            sql_logger.warning(f'疑似 N+1 查询 {request.method} {request.path}: 同一语句执行 {count} 次，'
+                               f'共 {duration * 1000:.1f}ms: {normalized}')
+    return response
+
+
+class PoolTimeoutError(Exception):
+    """等待连接池空闲连接超时"""
+
+
+class PooledConnection:
+    """
+    连接池借出的连接包装
+
+    与 pymysql 连接用法一致；close() 不会断开物理连接，而是回滚未提交事务后归还连接池。
+    也可作为上下文管理器使用，退出时自动归还（异常时先回滚）。
+    """
+
+    def __init__(self, pool, raw, created_at, cursorclass=None):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._cursorclass = cursorclass
+
+    def cursor(self, cursor=None):
+        """获取游标，默认使用借出时指定的游标类型"""
+        if self._raw is None:
+            raise pymysql.err.InterfaceError(0, '连接已归还连接池')
+        return self._raw.cursor(traced_cursor_class(cursor or self._cursorclass or self._raw.cursorclass))
+
+    def close(self):
+        """归还连接（可重复调用）"""
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool._release(raw, self._created_at)
+
+    @property
+    def open(self):
+        return self._raw is not None and self._raw.open
+
+    def __getattr__(self, name):
+        raw = self.__dict__.get('_raw')
+        if raw is None:
+            raise pymysql.err.InterfaceError(0, '连接已归还连接池')
+        return getattr(raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def __del__(self):
+        # 兜底：未显式归还的连接被回收时丢弃物理连接并释放名额
+        raw = self.__dict__.get('_raw')
+        if raw is not None:
+            self._raw = None
+            self._pool._discard(raw)
+
+
+class ConnectionPool:
+    """线程安全、有上限的 pymysql 连接池"""
+
+    def __init__(self, db_config, max_size=10, max_idle=5, max_lifetime=3600,
+                 health_check_interval=30, wait_timeout=10):
+        self.db_config = db_config
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.health_check_interval = health_check_interval
+        self.wait_timeout = wait_timeout
+
+        self._lock = threading.Condition()
+        self._idle = deque()   # (raw, created_at, last_used)
+        self._size = 0         # 已创建且未关闭的物理连接数
+
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'timeouts': 0,
+            'recycled': 0,
+            'broken': 0,
+            'waits': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0
+        }
+
+    def _connect(self):
+        return pymysql.connect(**self.db_config)
+
+    def _close_raw(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _is_usable(self, raw, created_at, last_used):
+        """检查空闲连接是否可继续使用（生命周期 + 健康检查），返回 (可用, 失败原因)"""
+        now = time.monotonic()
+        if self.max_lifetime and now - created_at >= self.max_lifetime:
+            return False, 'recycled'
+        if now - last_used >= self.health_check_interval:
+            try:
+                raw.ping(reconnect=False)
+            except Exception:
+                return False, 'broken'
+        return True, None
+
+    def acquire(self, cursorclass=None):
+        """借出一个连接，连接池耗尽时最多等待 wait_timeout 秒"""
+        start = None
+        while True:
+            with self._lock:
+                if self._idle:
+                    candidate = self._idle.pop()
+                elif self._size < self.max_size:
+                    # 先占名额，在锁外建立连接
+                    candidate = None
+                    self._size += 1
+                    self._stats['misses'] += 1
+                    self._record_wait(start)
+                else:
+                    now = time.monotonic()
+                    if start is None:
+                        start = now
+                        self._stats['waits'] += 1
+                    remaining = self.wait_timeout - (now - start)
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        self._record_wait(start)
+                        raise PoolTimeoutError(f'获取数据库连接超时（{self.wait_timeout}秒）')
+                    self._lock.wait(remaining)
+                    continue
+
+            if candidate is None:
+                break
+
+            # 健康检查在锁外进行，避免 ping 阻塞其他线程
+            raw, created_at, last_used = candidate
+            usable, reason = self._is_usable(raw, created_at, last_used)
+            if usable:
+                with self._lock:
+                    self._stats['hits'] += 1
+                    self._record_wait(start)
+                return PooledConnection(self, raw, created_at, cursorclass)
+            self._discard(raw, reason)
+
+        try:
+            raw = self._connect()
+        except Exception:
+            with self._lock:
+                self._size -= 1
+                self._lock.notify()
+            raise
+        return PooledConnection(self, raw, time.monotonic(), cursorclass)
+
+    def _record_wait(self, start):
+        if start is None:
+            return
+        waited = time.monotonic() - start
+        self._stats['wait_time_total'] += waited
+        if waited > self._stats['wait_time_max']:
+            self._stats['wait_time_max'] = waited
+
+    def _release(self, raw, created_at):
+        """归还连接：回滚未结束事务，保证下一个使用者看到最新数据"""
+        try:
+            if not raw.open:
+                raise pymysql.err.InterfaceError(0, '连接已断开')
+            raw.rollback()
+        except Exception:
+            self._discard(raw, 'broken')
+            return
+
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append((raw, created_at, time.monotonic()))
+                raw = None
+            else:
+                self._size -= 1
+            self._lock.notify()
+        if raw is not None:
+            self._close_raw(raw)
+
+    def _discard(self, raw, reason=None):
+        """丢弃物理连接并释放名额"""
+        with self._lock:
+            self._size -= 1
+            if reason:
+                self._stats[reason] += 1
+            self._lock.notify()
+        self._close_raw(raw)
+
+    def close_all(self):
+        """关闭所有空闲连接"""
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._lock.notify_all()
+        for raw, _, _ in idle:
+            self._close_raw(raw)
+
+    def stats(self):
+        """连接池监控数据"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = self._size
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = self._size - len(self._idle)
+            stats['max_size'] = self.max_size
+        requests = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / requests, 4) if requests else 0.0
+        stats['wait_time_avg'] = round(stats['wait_time_total'] / stats['waits'], 6) if stats['waits'] else 0.0
+        stats['wait_time_total'] = round(stats['wait_time_total'], 6)
+        stats['wait_time_max'] = round(stats['wait_time_max'], 6)
+        return stats
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """获取全局连接池（首次使用时按 DB_CONFIG/POOL_CONFIG 创建）"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_CONFIG, **POOL_CONFIG)
+    return _pool
+
+
+def _reset_pool_after_fork():
+    # fork 出的子进程（gunicorn 预加载后的 worker 等）不能与父进程共用连接，
+    # 丢弃继承来的连接池（不关闭连接，以免影响父进程），首次使用时重新创建
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_pool_after_fork)
+
+
+def get_pool_stats():
+    """获取连接池监控数据"""
+    return get_pool().stats()
+
+
+def values_table(rows, columns):
+    """
+    将若干行数据构造为可 JOIN 的派生表 SQL（SELECT ... UNION ALL SELECT ...）
+
+    Args:
+        rows: 行数据（每行为与 columns 等长的序列）
+        columns: 列名
+
+    Returns:
+        tuple: (派生表SQL, 参数列表)
+    """
+    rows = list(rows)
+    if not rows:
+        raise ValueError('派生表至少需要一行数据')
+    first = 'SELECT ' + ', '.join(f'%s AS {column}' for column in columns)
+    other = 'SELECT ' + ', '.join(['%s'] * len(columns))
+    sql = ' UNION ALL '.join([first] + [other] * (len(rows) - 1))
+    params = [value for row in rows for value in row]
+    return sql, params
+
+
 def get_db_connection():
-    """获取数据库连接"""
-    return pymysql.connect(**DB_CONFIG)
+    """获取数据库连接（来自连接池，close() 即归还）"""
+    return get_pool().acquire()
+
 
 def get_db_dict_connection():
-    """获取字典游标的数据库连接"""
-    config = DB_CONFIG.copy()
-    config['cursorclass'] = pymysql.cursors.DictCursor
-    return pymysql.connect(**config)
\ No newline at end of file
+    """获取字典游标的数据库连接（来自连接池，close() 即归还）"""
+    return get_pool().acquire(pymysql.cursors.DictCursor)
+
+
+@contextmanager
+def db_connection(dict_cursor=False):
+    """
+    以上下文管理器方式借用连接，退出时无论正常返回还是异常都会归还连接池
+
+    用法:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            ...
+    """
+    conn = get_db_dict_connection() if dict_cursor else get_db_connection()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def retry_on_deadlock(retries=3, backoff=0.05):
+    """
+    事务遇到死锁/锁等待超时时自动重试的装饰器
+
+    被装饰函数需自行在异常时回滚事务，重试前会按指数退避随机等待。
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            for attempt in range(retries + 1):
+                try:
+                    return f(*args, **kwargs)
+                except pymysql.err.OperationalError as e:
+                    if e.args[0] not in RETRYABLE_ERROR_CODES or attempt >= retries:
+                        raise
+                    time.sleep(backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+        return decorated_function
+    return decorator
@@ -1,13 +1,14 @@
 """
 通用工具函数模块
 """
-from datetime import datetime
+from datetime import date, datetime, timedelta
 import re
 
+from utils.order_no import next_order_no
+
 def generate_order_no(prefix=''):
-    """生成订单号"""
-    now = datetime.now()
-    return f"{prefix}{now.strftime('%Y%m%d%H%M%S')}"
+    """生成订单号（跨线程、跨进程唯一，格式见 utils/order_no.py）"""
+    return next_order_no(prefix)
 
 def validate_phone(phone):
     """验证手机号格式"""
@@ -59,4 +60,40 @@ def safe_int(value, default=0):
 
 def safe_strip(value: object) -> str:
     """安全地对可能为None的值执行strip，返回空字符串而不是抛错"""
-    return value.strip() if isinstance(value, str) else ""
\ No newline at end of file
+    return value.strip() if isinstance(value, str) else ""
+
+def parse_date(value):
+    """解析 YYYY-MM-DD 日期，格式不正确时抛出 ValueError"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(str(value).strip(), '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f'日期格式不正确，应为 YYYY-MM-DD: {value}')
+
+def date_range_filter(column, start_date=None, end_date=None):
+    """
+    生成按日期区间筛选的半开区间条件 [start 00:00, end+1 00:00)
+
+    条件直接比较列本身（不对列套用 DATE() 等函数），可以使用列上的索引做范围扫描，
+    对 DATE 与 TIMESTAMP/DATETIME 列同样适用。
+
+    Args:
+        column: 列名（如 'po.apply_time'）
+        start_date: 开始日期（含），为空则不限
+        end_date: 结束日期（含），为空则不限
+
+    Returns:
+        tuple: (条件SQL, 参数列表)，两端均为空时条件为空字符串
+    """
+    conditions = []
+    params = []
+    if start_date:
+        conditions.append(f'{column} >= %s')
+        params.append(parse_date(start_date))
+    if end_date:
+        conditions.append(f'{column} < %s')
+        params.append(parse_date(end_date) + timedelta(days=1))
+    return ' AND '.join(conditions), params
@@ -0,0 +1,134 @@
+"""
+热点查询登记表
+
+登记页面加载、结账、报表等高频路径上的查询（取代表性参数），
+由 bench/explain_check.py 对其逐条 EXPLAIN，出现全表扫描即视为回归。
+新增高频查询或调整索引时同步维护本表。
+"""
+
+HOT_QUERIES = [
+    {
+        'name': '销售单列表（按日期筛选，首屏）',
+        'sql': """
+            SELECT oo.id, oo.order_no, oo.sale_date, oo.created_at
+            FROM outgoing_orders oo
+            WHERE oo.sale_date >= %s AND oo.sale_date <= %s
+            ORDER BY oo.sale_date DESC, oo.created_at DESC, oo.id DESC
+            LIMIT 10
+        """,
+        'params': ('2025-09-01', '2025-09-30')
+    },
+    {
+        'name': '入库单列表（按日期筛选，首屏）',
+        'sql': """
+            SELECT io.id, io.order_no, io.incoming_date, io.created_at
+            FROM incoming_orders io
+            WHERE io.incoming_date >= %s AND io.incoming_date <= %s
+            ORDER BY io.incoming_date DESC, io.created_at DESC, io.id DESC
+            LIMIT 10
+        """,
+        'params': ('2025-09-01', '2025-09-30')
+    },
+    {
+        'name': '采购单列表（按申请时间，首屏）',
+        'sql': """
+            SELECT po.id, po.order_no, po.status, po.apply_time
+            FROM purchase_orders po
+            ORDER BY po.apply_time DESC, po.id DESC
+            LIMIT 10
+        """,
+        'params': ()
+    },
+    {
+        'name': '采购报表（申请时间半开区间）',
+        'sql': """
+            SELECT status, COUNT(*), COALESCE(SUM(total_amount), 0)
+            FROM purchase_orders
+            WHERE apply_time >= %s AND apply_time < %s
+            GROUP BY status
+        """,
+        'params': ('2025-01-01', '2026-01-01')
+    },
+    {
+        'name': '应付结算供应商汇总',
+        'sql': """
+            SELECT po.supplier_id, COUNT(*) AS unpaid_count, SUM(po.total_amount) AS unpaid_amount
+            FROM purchase_orders po
+            WHERE po.status IN ('delivered', 'stock')
+            GROUP BY po.supplier_id
+        """,
+        'params': ()
+    },
+    {
+        'name': '仪表盘待处理采购单',
+        'sql': """
+            SELECT COUNT(*) FROM purchase_orders
+            WHERE status IN ('pending', 'approved')
+        """,
+        'params': ()
+    },
+    {
+        'name': '结账默认客户',
+        'sql': "SELECT id FROM customers WHERE is_default = 1 LIMIT 1",
+        'params': ()
+    },
+    {
+        'name': '结账商品校验与加锁',
+        'sql': """
+            SELECT p.id, p.selling_price, COALESCE(i.quantity, 0), pc.last_cost_price
+            FROM products p
+            LEFT JOIN inventory i ON p.id = i.product_id
+            LEFT JOIN product_costs pc ON p.id = pc.product_id
+            WHERE p.id IN (%s, %s, %s) AND p.status = 'active'
+            ORDER BY p.id
+        """,
+        'params': (1, 2, 3)
+    },
+    {
+        'name': '在售商品按名称前缀检索',
+        'sql': """
+            SELECT p.id, p.code, p.name
+            FROM products p
+            WHERE p.status = 'active' AND p.name LIKE %s
+            ORDER BY p.name
+            LIMIT 20
+        """,
+        'params': ('可%',)
+    },
+    {
+        'name': '商品全文搜索（fulltext 搜索后端）',
+        'sql': """
+            SELECT p.id, p.code, p.name
+            FROM products p
+            WHERE p.status = 'active'
+              AND MATCH(p.name, p.brand, p.code) AGAINST (%s IN BOOLEAN MODE)
+            ORDER BY MATCH(p.name, p.brand, p.code) AGAINST (%s IN BOOLEAN MODE) DESC, p.name
+            LIMIT 20
+        """,
+        'params': ('"可乐"', '"可乐"')
+    },
+    {
+        'name': '商品按编码精确查找',
+        'sql': "SELECT id, name, selling_price FROM products WHERE code = %s",
+        'params': ('P001',)
+    },
+    {
+        'name': '销售日汇总（报表区间）',
+        'sql': """
+            SELECT sale_date, order_count, total_sales, total_profit
+            FROM sales_daily_totals
+            WHERE sale_date >= %s AND sale_date <= %s
+        """,
+        'params': ('2025-01-01', '2025-12-31')
+    },
+    {
+        'name': '商品销售排行（报表区间）',
+        'sql': """
+            SELECT r.product_id, SUM(r.quantity), SUM(r.sales_amount)
+            FROM sales_daily_rollup r
+            WHERE r.sale_date >= %s AND r.sale_date <= %s
+            GROUP BY r.product_id
+        """,
+        'params': ('2025-09-01', '2025-09-30')
+    }
+]
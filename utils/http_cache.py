@@ -0,0 +1,123 @@
+"""
+响应压缩与条件请求模块
+
+- 压缩：客户端支持时，超过 compress_min_size 的文本/JSON 响应在 after_request 中用 gzip 压缩
+  （安装 brotli 包时优先 br），并附加 Vary: Accept-Encoding
+- 条件 GET：已登录用户的 /api/ GET 请求带强 ETag，由 数据写入代数 + 时间段 + 用户 + 完整路径 计算，
+  在 before_request 中即可算出，If-None-Match 命中时直接返回 304，不执行查询。
+  各写接口在事务提交后调用 bump_data_generation() 使写入代数加一，此前的 ETag 全部失效；
+  未提交（校验失败、回滚）的写请求不影响 ETag。
+  写入代数存放在应用缓存中（utils/cache.py），多进程部署需使用 Redis 后端才能共享
+  （serve.py 在多进程 + 进程内缓存时拒绝启动；直接用 gunicorn 启动多进程时需自行保证）。
+  ETag 另按 etag_max_age 分时间段变化，作为写入代数未覆盖的修改（命令行或直接改库、
+  代数更新失败）的过期上限：这类修改最多 etag_max_age 秒后对客户端可见
+"""
+import gzip
+import hashlib
+import time
+
+from flask import g, request, session
+
+from utils.cache import data_generation
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - 未安装 brotli 时只用 gzip
+    brotli = None
+
+# 压缩与 ETag 配置
+HTTP_CACHE_CONFIG = {
+    'compress': True,
+    'compress_min_size': 1024,       # 小于该字节数的响应不压缩
+    'compress_level': 6,             # gzip 压缩级别（1~9）
+    'brotli_quality': 5,             # brotli 压缩质量（0~11）
+    'compress_mimetypes': ('application/json', 'text/html', 'text/css', 'text/plain',
+                           'text/javascript', 'application/javascript'),
+    'etag': True,
+    'etag_prefixes': ('/api/',),
+    'etag_exclude': ('/api/auth/', '/api/debug/'),
+    'etag_max_age': 30               # ETag 随时间段变化的周期（秒），即代数之外修改的最长可见延迟；0 表示只随写入代数变化
+}
+
+
+def _tracked(path):
+    return path.startswith(HTTP_CACHE_CONFIG['etag_prefixes']) and not path.startswith(HTTP_CACHE_CONFIG['etag_exclude'])
+
+
+def request_etag():
+    """当前 GET 请求的数据版本 ETag，不适用时返回 None"""
+    if not HTTP_CACHE_CONFIG['etag'] or request.method != 'GET' or 'user_id' not in session:
+        return None
+    if not _tracked(request.path):
+        return None
+    max_age = HTTP_CACHE_CONFIG['etag_max_age']
+    period = int(time.time() // max_age) if max_age else 0
+    raw = f"{data_generation()}|{period}|{session['user_id']}|{session.get('role')}|{request.full_path}"
+    return hashlib.blake2b(raw.encode('utf-8'), digest_size=12).hexdigest()
+
+
+def _matched_etag(etag):
+    """If-None-Match 中与 etag 相同的标签（压缩响应的 ETag 带编码后缀，一并接受），没有时返回 None"""
+    if_none_match = request.if_none_match
+    for suffix in ('', '-gzip', '-br'):
+        if if_none_match.contains_weak(etag + suffix):
+            return etag + suffix
+    return None
+
+
+def _choose_encoding():
+    offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return request.accept_encodings.best_match(offered)
+
+
+def compress_response(response):
+    """按 Accept-Encoding 压缩响应体"""
+    if (not HTTP_CACHE_CONFIG['compress'] or response.status_code != 200 or response.direct_passthrough
+            or response.is_streamed or 'Content-Encoding' in response.headers
+            or response.mimetype not in HTTP_CACHE_CONFIG['compress_mimetypes']):
+        return response
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < HTTP_CACHE_CONFIG['compress_min_size']:
+        return response
+    encoding = _choose_encoding()
+    if encoding == 'br':
+        body = brotli.compress(data, quality=HTTP_CACHE_CONFIG['brotli_quality'])
+    elif encoding == 'gzip':
+        body = gzip.compress(data, compresslevel=HTTP_CACHE_CONFIG['compress_level'], mtime=0)
+    else:
+        return response
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f'{etag}-{encoding}', weak)
+    return response
+
+
+def register_http_cache(app):
+    """注册条件 GET 与响应压缩钩子"""
+
+    @app.before_request
+    def check_not_modified():
+        etag = request_etag()
+        if etag is None:
+            return None
+        matched = _matched_etag(etag)
+        if matched is not None:
+            response = app.response_class(status=304)
+            response.set_etag(matched)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            if HTTP_CACHE_CONFIG['compress']:
+                response.vary.add('Accept-Encoding')
+            return response
+        g.data_etag = etag
+        return None
+
+    @app.after_request
+    def finish_http_cache(response):
+        etag = g.pop('data_etag', None)
+        if etag is not None and response.status_code == 200 and response.mimetype == 'application/json':
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+        return compress_response(response)
@@ -0,0 +1,121 @@
+"""
+JSON 序列化模块
+
+自定义 Flask JSON provider，接口直接返回数据库行即可，不必逐行转换：
+- Decimal：有小数部分的输出为浮点数，整数值（如数量合计、3.00）输出为整数
+- datetime 输出为 'YYYY-MM-DD HH:MM:SS'，date 输出为 'YYYY-MM-DD'（与 format_datetime / format_date 一致）
+- 默认输出紧凑格式、中文不转义；调试模式下缩进输出
+- 安装 orjson 时用 orjson 编码与解码，未安装时退回标准库 json
+"""
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 未安装 orjson 时使用标准库
+    orjson = None
+
+# JSON 配置
+JSON_CONFIG = {
+    'use_orjson': True,   # 已安装 orjson 时是否使用
+    'pretty': None        # None 表示仅调试模式缩进输出
+}
+
+
+def _decimal(o):
+    return int(o) if o == o.to_integral_value() else float(o)
+
+
+def _datetime(o):
+    return o.isoformat(' ', 'seconds')
+
+
+def _date(o):
+    return o.isoformat()
+
+
+# 按类型查表，数据库行中最常见的 Decimal 与日期不走 isinstance 链
+_ENCODERS = {
+    Decimal: _decimal,
+    datetime: _datetime,
+    date: _date,
+    time: str,
+    timedelta: str,
+    set: list,
+    frozenset: list
+}
+
+
+def json_default(o):
+    """标准库 json / orjson 无法直接编码的类型"""
+    encoder = _ENCODERS.get(type(o))
+    if encoder is not None:
+        return encoder(o)
+    for cls in (Decimal, datetime, date, time, timedelta, set, frozenset):
+        if isinstance(o, cls):
+            return _ENCODERS[cls](o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+def _use_orjson():
+    return orjson is not None and JSON_CONFIG['use_orjson']
+
+
+if orjson is not None:
+    # datetime 交给 json_default 按项目格式输出；键可以是整数等非字符串
+    _ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+def dumps_bytes(obj, pretty=False):
+    """编码为 UTF-8 字节串"""
+    if _use_orjson():
+        option = _ORJSON_OPTIONS | orjson.OPT_INDENT_2 if pretty else _ORJSON_OPTIONS
+        try:
+            return orjson.dumps(obj, default=json_default, option=option)
+        except TypeError:
+            # 超出 64 位的整数等 orjson 不支持的值退回标准库
+            pass
+    return _stdlib_dumps(obj, pretty).encode('utf-8')
+
+
+def _stdlib_dumps(obj, pretty=False):
+    if pretty:
+        return json.dumps(obj, default=json_default, ensure_ascii=False, indent=2)
+    return json.dumps(obj, default=json_default, ensure_ascii=False, separators=(',', ':'))
+
+
+class ShopJSONProvider(JSONProvider):
+    """项目 JSON provider（jsonify、request.get_json 均经过此处）"""
+
+    mimetype = 'application/json'
+
+    def _pretty(self):
+        pretty = JSON_CONFIG['pretty']
+        return self._app.debug if pretty is None else pretty
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            kwargs.setdefault('default', json_default)
+            kwargs.setdefault('ensure_ascii', False)
+            return json.dumps(obj, **kwargs)
+        if _use_orjson():
+            return dumps_bytes(obj).decode('utf-8')
+        return _stdlib_dumps(obj)
+
+    def loads(self, s, **kwargs):
+        if _use_orjson() and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self._pretty()
+        body = dumps_bytes(obj, pretty)
+        if pretty:
+            body += b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
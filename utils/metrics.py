@@ -0,0 +1,233 @@
+"""
+请求监控指标模块
+
+在 before_request / after_request 中按蓝图与端点统计请求数、延迟分布、响应大小、
+进行中请求数与每请求 SQL 条数/耗时，由 /metrics 以 Prometheus 文本格式输出，
+同时附带连接池与应用缓存命中率。不依赖 prometheus_client，每个请求只做一次加锁累加。
+"""
+import bisect
+import threading
+import time
+
+from flask import Response, g, request
+
+from utils.cache import get_cache_stats
+from utils.database import get_pool_stats
+
+# 延迟（秒）与响应大小（字节）直方图分桶
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """非累积计数的直方图，输出时再转为 Prometheus 的累积桶"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{_labels(labels, le=_number(bound))} {cumulative}')
+        lines.append(f'{name}_bucket{_labels(labels, le="+Inf")} {self.count}')
+        lines.append(f'{name}_sum{_labels(labels)} {_number(self.sum)}')
+        lines.append(f'{name}_count{_labels(labels)} {self.count}')
+        return lines
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels, **extra):
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in items) + '}'
+
+
+class MetricsRegistry:
+    """请求指标（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._requests = {}   # (blueprint, endpoint, method, status) -> 次数
+            self._latency = {}    # (blueprint, endpoint, method) -> Histogram
+            self._sizes = {}      # (blueprint, endpoint, method) -> Histogram
+            self._db = {}         # (blueprint, endpoint) -> [SQL 条数, SQL 耗时]
+            self.in_flight = 0
+
+    def begin(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def end(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def observe(self, blueprint, endpoint, method, status, duration, size, db_queries=0, db_time=0.0):
+        route = (blueprint, endpoint, method)
+        with self._lock:
+            key = route + (status,)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            latency = self._latency.get(route)
+            if latency is None:
+                latency = self._latency[route] = Histogram(LATENCY_BUCKETS)
+                self._sizes[route] = Histogram(SIZE_BUCKETS)
+            latency.observe(duration)
+            self._sizes[route].observe(size)
+            db = self._db.get(route[:2])
+            if db is None:
+                db = self._db[route[:2]] = [0, 0.0]
+            db[0] += db_queries
+            db[1] += db_time
+
+    def render(self):
+        """Prometheus 文本格式"""
+        with self._lock:
+            requests = sorted(self._requests.items())
+            latency = sorted((route, _copy(h)) for route, h in self._latency.items())
+            sizes = sorted((route, _copy(h)) for route, h in self._sizes.items())
+            db = sorted((route, list(values)) for route, values in self._db.items())
+            in_flight = self.in_flight
+
+        route_labels = ('blueprint', 'endpoint', 'method')
+        lines = [
+            '# HELP http_requests_total 请求数',
+            '# TYPE http_requests_total counter'
+        ]
+        for key, count in requests:
+            lines.append(f'http_requests_total{_labels(zip(route_labels + ("status",), key))} {count}')
+
+        lines += ['# HELP http_request_duration_seconds 请求处理耗时（秒）',
+                  '# TYPE http_request_duration_seconds histogram']
+        for route, histogram in latency:
+            lines += histogram.render('http_request_duration_seconds', list(zip(route_labels, route)))
+
+        lines += ['# HELP http_response_size_bytes 响应体大小（字节）',
+                  '# TYPE http_response_size_bytes histogram']
+        for route, histogram in sizes:
+            lines += histogram.render('http_response_size_bytes', list(zip(route_labels, route)))
+
+        lines += ['# HELP http_requests_in_flight 正在处理的请求数',
+                  '# TYPE http_requests_in_flight gauge',
+                  f'http_requests_in_flight {in_flight}']
+
+        lines += ['# HELP db_queries_total 请求内执行的 SQL 条数',
+                  '# TYPE db_queries_total counter']
+        for route, (queries, _) in db:
+            lines.append(f'db_queries_total{_labels(zip(route_labels[:2], route))} {queries}')
+        lines += ['# HELP db_query_seconds_total 请求内 SQL 总耗时（秒）',
+                  '# TYPE db_query_seconds_total counter']
+        for route, (_, seconds) in db:
+            lines.append(f'db_query_seconds_total{_labels(zip(route_labels[:2], route))} {_number(seconds)}')
+
+        lines += _render_pool_stats() + _render_cache_stats()
+        return '\n'.join(lines) + '\n'
+
+
+def _copy(histogram):
+    copy = Histogram(histogram.buckets)
+    copy.counts = list(histogram.counts)
+    copy.sum = histogram.sum
+    copy.count = histogram.count
+    return copy
+
+
+# 连接池统计项 -> (指标名, 类型, 说明)
+_POOL_METRICS = {
+    'size': ('db_pool_connections', 'gauge', '连接池物理连接数'),
+    'idle': ('db_pool_idle_connections', 'gauge', '连接池空闲连接数'),
+    'in_use': ('db_pool_in_use_connections', 'gauge', '连接池借出连接数'),
+    'max_size': ('db_pool_max_connections', 'gauge', '连接池最大连接数'),
+    'hits': ('db_pool_hits_total', 'counter', '复用空闲连接次数'),
+    'misses': ('db_pool_misses_total', 'counter', '新建连接次数'),
+    'timeouts': ('db_pool_timeouts_total', 'counter', '等待连接超时次数'),
+    'waits': ('db_pool_waits_total', 'counter', '等待空闲连接次数'),
+    'wait_time_total': ('db_pool_wait_seconds_total', 'counter', '等待空闲连接总时间（秒）'),
+    'recycled': ('db_pool_recycled_total', 'counter', '超过存活时间回收的连接数'),
+    'broken': ('db_pool_broken_total', 'counter', '健康检查失败丢弃的连接数')
+}
+
+
+def _render_pool_stats():
+    stats = get_pool_stats()
+    lines = []
+    for key, (name, kind, help_text) in _POOL_METRICS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}', f'{name} {_number(stats[key])}']
+    return lines
+
+
+def _render_cache_stats():
+    stats = sorted(get_cache_stats().items())
+    lines = ['# HELP cache_requests_total 应用缓存读取次数',
+             '# TYPE cache_requests_total counter']
+    for namespace, item in stats:
+        lines.append(f'cache_requests_total{_labels([("namespace", namespace), ("result", "hit")])} {item["hits"]}')
+        lines.append(f'cache_requests_total{_labels([("namespace", namespace), ("result", "miss")])} {item["misses"]}')
+    lines += ['# HELP cache_hit_ratio 应用缓存命中率',
+              '# TYPE cache_hit_ratio gauge']
+    for namespace, item in stats:
+        lines.append(f'cache_hit_ratio{_labels([("namespace", namespace)])} {_number(float(item["hit_ratio"]))}')
+    return lines
+
+
+metrics = MetricsRegistry()
+
+
+def register_metrics(app):
+    """注册请求计时钩子与 /metrics 端点"""
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_start = time.perf_counter()
+        g.metrics_in_flight = True
+        metrics.begin()
+
+    @app.after_request
+    def record_request_metrics(response):
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            db_stats = g.get('db_stats') or {}
+            metrics.observe(
+                request.blueprint or '',
+                request.endpoint or 'unmatched',
+                request.method,
+                str(response.status_code),
+                time.perf_counter() - start,
+                response.content_length or 0,
+                db_stats.get('queries', 0),
+                db_stats.get('time', 0.0)
+            )
+        return response
+
+    @app.teardown_request
+    def finish_request(exc=None):
+        # teardown 总会执行，保证异常请求也能减掉进行中计数
+        if g.pop('metrics_in_flight', False):
+            metrics.end()
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        """Prometheus 指标"""
+        return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
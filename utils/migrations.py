@@ -0,0 +1,84 @@
+"""
+数据库结构迁移模块
+
+迁移脚本放在项目根目录 migrations/ 下，文件名形如 0001_hot_path_indexes.sql，
+按版本号顺序执行，已执行的版本记录在 schema_migrations 表中。
+由 init_database.sql 新建的库已包含对应结构并写入了迁移记录。
+"""
+import os
+import re
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+SCHEMA_MIGRATIONS_DDL = """
+    CREATE TABLE IF NOT EXISTS `schema_migrations` (
+      `version` int(11) NOT NULL COMMENT '迁移版本号',
+      `name` varchar(100) NOT NULL COMMENT '迁移名称',
+      `applied_at` timestamp(0) NULL DEFAULT CURRENT_TIMESTAMP(0) COMMENT '执行时间',
+      PRIMARY KEY (`version`) USING BTREE
+    ) ENGINE = InnoDB CHARACTER SET = utf8mb4 COMMENT = '数据库迁移记录表'
+"""
+
+_FILENAME_RE = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+
+def list_migrations(directory=MIGRATIONS_DIR):
+    """
+    列出全部迁移脚本
+
+    Returns:
+        list: [(版本号, 名称, 文件路径), ...]，按版本号升序
+    """
+    migrations = []
+    for filename in os.listdir(directory):
+        match = _FILENAME_RE.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    migrations.sort()
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError('迁移脚本版本号重复')
+    return migrations
+
+
+def split_statements(sql):
+    """按行尾分号拆分 SQL 脚本，忽略 -- 注释行"""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    statements = re.split(r';\s*(?:\n|$)', '\n'.join(lines))
+    return [statement.strip() for statement in statements if statement.strip()]
+
+
+def get_applied_versions(cursor):
+    """已执行的迁移版本号"""
+    cursor.execute(SCHEMA_MIGRATIONS_DDL)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def apply_migrations(conn, directory=MIGRATIONS_DIR):
+    """
+    按版本号顺序执行未执行的迁移
+
+    MySQL 的 DDL 会隐式提交，单个迁移中途失败时已执行的语句不会回滚，
+    修复后需手工处理残留结构再重新执行。
+
+    Returns:
+        list: 本次执行的 [(版本号, 名称), ...]
+    """
+    cursor = conn.cursor()
+    try:
+        applied = get_applied_versions(cursor)
+        done = []
+        for version, name, path in list_migrations(directory):
+            if version in applied:
+                continue
+            with open(path, encoding='utf-8') as f:
+                statements = split_statements(f.read())
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+            conn.commit()
+            done.append((version, name))
+        return done
+    finally:
+        cursor.close()
@@ -0,0 +1,66 @@
+"""
+单号生成模块
+
+单号格式：前缀 + 时间(YYYYMMDDHHMMSS) + 节点号(2位) + 进程号(7位) + 秒内序号(4位)，如
+OUT20251018143025 00 0012345 0007（实际无空格）。
+
+- 同一进程内由锁保护的序号保证唯一且单调递增：同一秒内序号递增，一秒内超过 9999 个时
+  时间部分借用下一秒；系统时钟回拨时沿用上次的时间继续计数，不会生成重复或倒序的单号
+- 同一主机上同时运行的进程号互不相同，多进程部署（gunicorn 等）无需协调；
+  fork 出的子进程重新开始计数
+- 多台主机共用一个数据库时，需为每台主机设置不同的 ORDER_NO_CONFIG['node_id']（0~99）
+- 定长格式保证同一前缀的单号按字符串排序即按生成时间排序
+"""
+import os
+import threading
+import time
+from datetime import datetime
+
+# 单号配置
+ORDER_NO_CONFIG = {
+    'node_id': 0   # 主机节点号（0~99），多台应用服务器共用数据库时各不相同
+}
+
+_SEQ_LIMIT = 10000
+_PID_LIMIT = 10000000
+
+
+class OrderNoGenerator:
+    """进程内单号生成器（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._last_second = 0
+        self._seq = 0
+
+    def _reset_after_fork(self):
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._last_second = 0
+        self._seq = 0
+
+    def next(self, prefix=''):
+        with self._lock:
+            now = int(time.time())
+            if now > self._last_second:
+                self._last_second = now
+                self._seq = 0
+            else:
+                self._seq += 1
+                if self._seq >= _SEQ_LIMIT:
+                    self._last_second += 1
+                    self._seq = 0
+            second, seq = self._last_second, self._seq
+        stamp = datetime.fromtimestamp(second).strftime('%Y%m%d%H%M%S')
+        return f"{prefix}{stamp}{ORDER_NO_CONFIG['node_id'] % 100:02d}{self._pid % _PID_LIMIT:07d}{seq:04d}"
+
+
+_generator = OrderNoGenerator()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_generator._reset_after_fork)
+
+
+def next_order_no(prefix=''):
+    """生成唯一单号"""
+    return _generator.next(prefix)
@@ -0,0 +1,238 @@
+"""
+列表分页模块
+
+支持两种分页方式：
+- 页码分页（默认）：page / size，LIMIT ... OFFSET ...
+- 游标分页（传入 cursor 参数启用，首页传空值）：按 (排序键..., id) 元组定位，
+  返回不透明的 next_cursor，翻到多深每页代价都相同
+
+总数统计方式由 count 参数选择（响应中 count_strategy 标明实际使用的方式）：
+- exact：执行 COUNT(*) 精确统计（页码分页默认）
+- cached：按查询条件缓存精确统计结果 count_cache_ttl 秒
+- estimated：取 information_schema 表行数或 EXPLAIN 估算行数
+- none：不统计总数（游标分页默认），是否有下一页由多取一行判断
+
+游标或 count 参数无效时抛出 PaginationError，接口应返回 400。
+"""
+import base64
+import hashlib
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import request
+
+from utils.cache import cached
+from utils.helpers import safe_int
+
+# 分页配置
+PAGINATION_CONFIG = {
+    'count_cache_ttl': 30   # cached 统计方式的缓存时间（秒）
+}
+
+COUNT_STRATEGIES = ('exact', 'cached', 'estimated', 'none')
+
+
+class PaginationError(ValueError):
+    """分页参数无效（客户端错误，接口返回 400）"""
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f'无法编码的游标值: {value!r}')
+
+
+def encode_cursor(values):
+    """将排序键取值编码为不透明游标"""
+    raw = json.dumps(list(values), default=_json_default, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """解码游标，格式不正确时抛出 PaginationError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw.decode('utf-8'))
+    except (ValueError, UnicodeDecodeError):
+        raise PaginationError('无效的分页游标')
+    if not isinstance(values, list) or not all(isinstance(value, (str, int, float)) for value in values):
+        raise PaginationError('无效的分页游标')
+    return values
+
+
+class Pagination:
+    """
+    列表分页参数与结果
+
+    sort_keys 为排序键列表 [(SQL表达式, 'ASC'/'DESC', 结果行字段名), ...]，
+    最后一项必须是唯一键（一般为 id），排序键列均需为 NOT NULL（NULL 与任何值比较都不成立，
+    会跳过行且无法编码游标；各列表排序列见 migrations/0004_sort_keys_not_null.sql）。
+
+    用法:
+        pager = Pagination.from_request([('p.created_at', 'DESC', 'created_at'), ('p.id', 'DESC', 'id')])
+        total = pager.count(cursor, count_query, params, table='products')
+        data_where, data_params = pager.where(where_conditions, params)
+        cursor.execute(f"SELECT ... {data_where} {pager.order_by} {pager.limit}", data_params + pager.limit_params)
+        rows = pager.page_rows(cursor.fetchall())
+        ... 'pagination': pager.info(total)
+    """
+
+    def __init__(self, sort_keys, page=1, size=10, cursor=None, count_strategy=None):
+        self.sort_keys = sort_keys
+        self.page = max(page, 1)
+        self.size = max(size, 1)
+        self.cursor_mode = cursor is not None
+        self.count_strategy = count_strategy or ('none' if self.cursor_mode else 'exact')
+        if self.count_strategy not in COUNT_STRATEGIES:
+            raise PaginationError(f"不支持的计数方式: {self.count_strategy}，可选 {', '.join(COUNT_STRATEGIES)}")
+        self.cursor = cursor or None
+        self.after = None
+        self.next_cursor = None
+        self.has_next = False
+        if self.cursor:
+            self.after = decode_cursor(self.cursor)
+            if len(self.after) != len(sort_keys):
+                raise PaginationError('无效的分页游标')
+
+    @classmethod
+    def from_request(cls, sort_keys, default_size=10):
+        """从请求参数 page / size / cursor / count 创建"""
+        args = request.args
+        cursor = args.get('cursor', '').strip() if 'cursor' in args else None
+        return cls(sort_keys,
+                   page=safe_int(args.get('page', 1), 1),
+                   size=safe_int(args.get('size', default_size), default_size),
+                   cursor=cursor,
+                   count_strategy=args.get('count', '').strip().lower() or None)
+
+    @property
+    def order_by(self):
+        return 'ORDER BY ' + ', '.join(f'{expr} {direction}' for expr, direction, _ in self.sort_keys)
+
+    @property
+    def limit(self):
+        return 'LIMIT %s OFFSET %s'
+
+    @property
+    def limit_params(self):
+        # 多取一行用于判断是否还有下一页，不依赖总数
+        if self.cursor_mode:
+            return [self.size + 1, 0]
+        return [self.size + 1, (self.page - 1) * self.size]
+
+    def count(self, cursor, count_query, params, table=None):
+        """
+        按统计方式获取总数
+
+        Args:
+            cursor: 数据库游标（元组或字典游标均可）
+            count_query: 与列表查询条件相同的 SELECT COUNT(*) 语句
+            params: 查询参数
+            table: 主表名，estimated 方式在无筛选条件时直接读取该表的统计行数
+
+        Returns:
+            int | None: 总数（none 方式返回 None）
+        """
+        if self.count_strategy == 'none':
+            return None
+
+        if self.count_strategy == 'exact':
+            cursor.execute(count_query, params)
+            return int(_first_value(cursor.fetchone()))
+
+        if self.count_strategy == 'cached':
+            key = 'count:' + hashlib.sha1(
+                json.dumps([count_query, list(params or [])], default=str, ensure_ascii=False).encode('utf-8')
+            ).hexdigest()
+
+            def build():
+                cursor.execute(count_query, params)
+                return int(_first_value(cursor.fetchone()))
+
+            return cached(key, build, PAGINATION_CONFIG['count_cache_ttl'])
+
+        # estimated：无筛选条件时读表统计信息，否则取执行计划首行的估算行数
+        if table and 'WHERE' not in count_query.upper():
+            cursor.execute("""
+                SELECT TABLE_ROWS FROM information_schema.TABLES
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+            """, (table,))
+            row = cursor.fetchone()
+            if row is not None and _first_value(row) is not None:
+                return int(_first_value(row))
+
+        cursor.execute('EXPLAIN ' + count_query, params)
+        columns = [column[0] for column in cursor.description]
+        plan = cursor.fetchone()
+        if plan is None:
+            return 0
+        if not isinstance(plan, dict):
+            plan = dict(zip(columns, plan))
+        rows = float(plan.get('rows') or 0)
+        filtered = float(plan.get('filtered') or 100)
+        return int(round(rows * filtered / 100))
+
+    def where(self, where_conditions, params):
+        """
+        在列表查询条件上追加游标定位条件
+
+        Returns:
+            tuple: (WHERE 子句, 参数列表)
+        """
+        conditions = list(where_conditions)
+        params = list(params)
+        if self.after is not None:
+            # (a, b, id) 在 (x, y, z) 之后：a > x OR (a = x AND b > y) OR (a = x AND b = y AND id > z)
+            branches = []
+            for i, (expr, direction, _) in enumerate(self.sort_keys):
+                op = '<' if direction.upper() == 'DESC' else '>'
+                parts = [f'{prev_expr} = %s' for prev_expr, _, _ in self.sort_keys[:i]] + [f'{expr} {op} %s']
+                branches.append('(' + ' AND '.join(parts) + ')')
+                params.extend(self.after[:i + 1])
+            conditions.append('(' + ' OR '.join(branches) + ')')
+        where_clause = 'WHERE ' + ' AND '.join(conditions) if conditions else ''
+        return where_clause, params
+
+    def page_rows(self, rows):
+        """截取本页数据并记录下一页游标（需在格式化数据之前调用）"""
+        rows = list(rows)
+        self.has_next = len(rows) > self.size
+        rows = rows[:self.size]
+        if self.cursor_mode and self.has_next:
+            self.next_cursor = encode_cursor(rows[-1][key] for _, _, key in self.sort_keys)
+        return rows
+
+    def info(self, total=None):
+        """分页信息"""
+        if self.cursor_mode:
+            return {
+                'size': self.size,
+                'cursor': self.cursor,
+                'next_cursor': self.next_cursor,
+                'has_next': self.has_next,
+                'total': total,
+                'count_strategy': self.count_strategy
+            }
+
+        total_pages = (total + self.size - 1) // self.size if total is not None else None
+        return {
+            'page': self.page,
+            'size': self.size,
+            'total': total,
+            'total_pages': total_pages,
+            'has_prev': self.page > 1,
+            'has_next': self.has_next,
+            'count_strategy': self.count_strategy
+        }
+
+
+def _first_value(row):
+    """取查询结果首列（兼容元组与字典游标）"""
+    if isinstance(row, dict):
+        return next(iter(row.values()))
+    return row[0]
@@ -0,0 +1,182 @@
+"""
+请求采样剖析模块
+
+按 PROFILER_CONFIG 对一部分请求做剖析，结果按端点写入 output_dir：
+- sampler（默认）：后台线程按固定间隔抓取处理线程的调用栈，输出 .collapsed 折叠栈
+  （每行“帧;帧;帧 次数”，可直接交给 flamegraph.pl、speedscope 生成火焰图），开销与函数调用次数无关
+- cprofile：用 cProfile 记录该请求线程的全部函数调用，输出 .prof（python -m pstats / snakeviz 查看）
+
+剖析默认关闭。开启后按 sample_rate 随机抽样，或对携带 X-Profile 请求头的请求强制剖析
+（请求头的值可为 sampler / cprofile 指定方式；只对已登录的管理员会话生效，其他请求忽略该头，
+避免任意客户端触发高开销的剖析与写文件）。文件列表与下载见 /debug 页面（仅管理员）。
+"""
+import cProfile
+import os
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+
+from flask import g, request, session
+
+# 剖析配置
+PROFILER_CONFIG = {
+    'enabled': False,        # 总开关，关闭时请求头也不生效
+    'sample_rate': 0.0,      # 随机抽样比例（0~1）
+    'header': 'X-Profile',   # 携带该请求头的请求强制剖析
+    'mode': 'sampler',       # sampler 或 cprofile
+    'interval': 0.005,       # sampler 抓栈间隔（秒）
+    'output_dir': os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'profiles'),
+    'max_files': 200         # 最多保留的剖析文件数，超出删除最旧的
+}
+
+PROFILE_MODES = ('sampler', 'cprofile')
+PROFILE_SUFFIXES = {'sampler': '.collapsed', 'cprofile': '.prof'}
+
+_SAFE_NAME_RE = re.compile(r'[^A-Za-z0-9_.-]+')
+
+# 同一进程同时只能有一个 cProfile 会话（Python 3.12 起第二个 enable() 抛出 ValueError），
+# 占用时并发的请求改用 sampler
+_cprofile_lock = threading.Lock()
+
+
+class StackSampler:
+    """后台线程定时抓取指定线程的调用栈，按折叠栈计数"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+                frame = frame.f_back
+            stack = ';'.join(reversed(names))
+            self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f'{stack} {count}\n')
+
+
+def _requested_mode():
+    """本请求是否剖析及剖析方式，不剖析返回 None"""
+    if not PROFILER_CONFIG['enabled']:
+        return None
+    header = request.headers.get(PROFILER_CONFIG['header'])
+    if header is not None and session.get('role') == 'manager':
+        mode = header.strip().lower()
+        return mode if mode in PROFILE_MODES else PROFILER_CONFIG['mode']
+    if random.random() < PROFILER_CONFIG['sample_rate']:
+        return PROFILER_CONFIG['mode']
+    return None
+
+
+def _prune(directory, max_files):
+    files = [entry for entry in os.scandir(directory)
+             if entry.is_file() and entry.name.endswith(tuple(PROFILE_SUFFIXES.values()))]
+    if len(files) <= max_files:
+        return
+    files.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in files[:len(files) - max_files]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def list_profiles():
+    """已保存的剖析文件（按时间倒序）"""
+    directory = PROFILER_CONFIG['output_dir']
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for entry in os.scandir(directory):
+        if not entry.is_file() or not entry.name.endswith(tuple(PROFILE_SUFFIXES.values())):
+            continue
+        stat = entry.stat()
+        profiles.append((stat.st_mtime, {
+            'name': entry.name,
+            'size': stat.st_size,
+            'created_at': datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
+        }))
+    profiles.sort(key=lambda item: item[0], reverse=True)
+    return [profile for _, profile in profiles]
+
+
+def register_profiler(app):
+    """注册请求剖析钩子"""
+
+    def _start_cprofile():
+        """开始 cProfile 会话，已有会话或无法启用时返回 None"""
+        if not _cprofile_lock.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # 其他剖析工具（如调试器、覆盖率统计）已占用
+            _cprofile_lock.release()
+            app.logger.warning(f'cProfile 无法启用，改用 sampler: {str(e)}')
+            return None
+        return profiler
+
+    @app.before_request
+    def start_profiling():
+        mode = _requested_mode()
+        if mode is None:
+            return
+        # 剖析只是附带的观测，任何情况下都不影响请求本身
+        profiler = _start_cprofile() if mode == 'cprofile' else None
+        if profiler is None:
+            mode = 'sampler'
+            profiler = StackSampler(threading.get_ident(), PROFILER_CONFIG['interval'])
+            profiler.start()
+        g.profiling = (mode, profiler, time.perf_counter())
+
+    @app.teardown_request
+    def finish_profiling(exc=None):
+        profiling = g.pop('profiling', None)
+        if profiling is None:
+            return
+        mode, profiler, start = profiling
+        if mode == 'cprofile':
+            profiler.disable()
+            _cprofile_lock.release()
+        else:
+            profiler.stop()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        directory = PROFILER_CONFIG['output_dir']
+        endpoint = _SAFE_NAME_RE.sub('_', request.endpoint or 'unmatched')
+        name = (f"{endpoint}_{request.method}_{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+                f"_{elapsed_ms:.0f}ms{PROFILE_SUFFIXES[mode]}")
+        try:
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, name)
+            if mode == 'cprofile':
+                profiler.dump_stats(path)
+            else:
+                profiler.dump(path)
+            _prune(directory, PROFILER_CONFIG['max_files'])
+        except OSError as e:
+            app.logger.warning(f'保存剖析结果失败: {str(e)}')
@@ -0,0 +1,116 @@
+"""
+销售日汇总表维护模块
+
+sales_daily_totals 按日期保存订单数与销售/成本/利润合计，
+sales_daily_rollup 按 日期 × 商品 保存销量与金额，
+报表按日期范围读取汇总行，避免每次扫描全部销售明细。
+"""
+
+SALES_DAILY_TOTALS_DDL = """
+    CREATE TABLE IF NOT EXISTS `sales_daily_totals` (
+      `sale_date` date NOT NULL COMMENT '销售日期',
+      `order_count` int(11) NOT NULL DEFAULT 0 COMMENT '订单数',
+      `total_sales` decimal(14, 2) NOT NULL DEFAULT 0.00 COMMENT '销售金额',
+      `total_cost` decimal(14, 2) NOT NULL DEFAULT 0.00 COMMENT '成本金额',
+      `total_profit` decimal(14, 2) NOT NULL DEFAULT 0.00 COMMENT '利润',
+      `updated_at` timestamp(0) NULL DEFAULT CURRENT_TIMESTAMP(0) ON UPDATE CURRENT_TIMESTAMP(0) COMMENT '更新时间',
+      PRIMARY KEY (`sale_date`) USING BTREE
+    ) ENGINE = InnoDB CHARACTER SET = utf8mb4 COMMENT = '销售日汇总表'
+"""
+
+SALES_DAILY_ROLLUP_DDL = """
+    CREATE TABLE IF NOT EXISTS `sales_daily_rollup` (
+      `sale_date` date NOT NULL COMMENT '销售日期',
+      `product_id` int(11) NOT NULL COMMENT '商品ID',
+      `order_count` int(11) NOT NULL DEFAULT 0 COMMENT '包含该商品的订单数',
+      `quantity` bigint(20) NOT NULL DEFAULT 0 COMMENT '销售数量',
+      `sales_amount` decimal(14, 2) NOT NULL DEFAULT 0.00 COMMENT '销售金额',
+      `cost_amount` decimal(14, 2) NOT NULL DEFAULT 0.00 COMMENT '成本金额',
+      `profit` decimal(14, 2) NOT NULL DEFAULT 0.00 COMMENT '利润',
+      PRIMARY KEY (`sale_date`, `product_id`) USING BTREE,
+      INDEX `product_id`(`product_id`) USING BTREE,
+      CONSTRAINT `sales_daily_rollup_ibfk_1` FOREIGN KEY (`product_id`) REFERENCES `products` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT
+    ) ENGINE = InnoDB CHARACTER SET = utf8mb4 COMMENT = '商品销售日汇总表'
+"""
+
+
+def update_sales_rollup(cursor, sale_date, order_totals, details, sign=1):
+    """
+    新增或删除销售订单时增量更新日汇总（需在订单事务内调用）
+
+    Args:
+        cursor: 数据库游标
+        sale_date: 销售日期
+        order_totals: 订单合计 (total_amount, total_cost, profit)
+        details: 销售明细列表（含 product_id, quantity, amount, cost_amount, profit）
+        sign: 1 表示新增订单，-1 表示删除订单
+    """
+    # 同一订单内同一商品多行时合并，订单数按商品只计一次
+    merged = {}
+    for detail in details:
+        item = merged.setdefault(detail['product_id'], [0, 0, 0, 0])
+        item[0] += detail['quantity']
+        item[1] += detail['amount']
+        item[2] += detail['cost_amount']
+        item[3] += detail['profit']
+
+    total_amount, total_cost, profit = order_totals
+
+    # 按商品ID顺序加锁，与结账时的加锁顺序一致
+    cursor.executemany("""
+        INSERT INTO sales_daily_rollup (sale_date, product_id, order_count, quantity,
+                                        sales_amount, cost_amount, profit)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            order_count = order_count + VALUES(order_count),
+            quantity = quantity + VALUES(quantity),
+            sales_amount = sales_amount + VALUES(sales_amount),
+            cost_amount = cost_amount + VALUES(cost_amount),
+            profit = profit + VALUES(profit)
+    """, [(sale_date, product_id, sign, sign * item[0], sign * item[1], sign * item[2], sign * item[3])
+          for product_id, item in sorted(merged.items())])
+
+    cursor.execute("""
+        INSERT INTO sales_daily_totals (sale_date, order_count, total_sales, total_cost, total_profit)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            order_count = order_count + VALUES(order_count),
+            total_sales = total_sales + VALUES(total_sales),
+            total_cost = total_cost + VALUES(total_cost),
+            total_profit = total_profit + VALUES(total_profit)
+    """, (sale_date, sign, sign * total_amount, sign * total_cost, sign * profit))
+
+    if sign < 0:
+        # 清理已无订单的汇总行，与按原始订单统计的结果保持一致
+        cursor.execute("DELETE FROM sales_daily_rollup WHERE sale_date = %s AND order_count <= 0", (sale_date,))
+        cursor.execute("DELETE FROM sales_daily_totals WHERE sale_date = %s AND order_count <= 0", (sale_date,))
+
+
+def rebuild_sales_rollup(cursor):
+    """
+    根据全部销售订单重建日汇总表
+
+    Returns:
+        int: 重建的日期数量
+    """
+    cursor.execute(SALES_DAILY_TOTALS_DDL)
+    cursor.execute(SALES_DAILY_ROLLUP_DDL)
+    cursor.execute("DELETE FROM sales_daily_rollup")
+    cursor.execute("DELETE FROM sales_daily_totals")
+    cursor.execute("""
+        INSERT INTO sales_daily_rollup (sale_date, product_id, order_count, quantity,
+                                        sales_amount, cost_amount, profit)
+        SELECT oo.sale_date, od.product_id, COUNT(DISTINCT oo.id), SUM(od.quantity),
+               SUM(od.amount), SUM(od.cost_amount), SUM(od.profit)
+        FROM outgoing_details od
+        INNER JOIN outgoing_orders oo ON od.outgoing_id = oo.id
+        GROUP BY oo.sale_date, od.product_id
+    """)
+    cursor.execute("""
+        INSERT INTO sales_daily_totals (sale_date, order_count, total_sales, total_cost, total_profit)
+        SELECT sale_date, COUNT(*), COALESCE(SUM(total_amount), 0),
+               COALESCE(SUM(total_cost), 0), COALESCE(SUM(profit), 0)
+        FROM outgoing_orders
+        GROUP BY sale_date
+    """)
+    return cursor.rowcount
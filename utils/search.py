@@ -0,0 +1,370 @@
+"""
+商品搜索索引模块
+
+进程内维护全部商品的搜索索引，替代 code/name/brand 上的 LIKE '%x%' 全表扫描：
+- 编码（条码）精确匹配与前缀匹配：有序编码表 + 二分查找
+- 名称/品牌/编码子串匹配：单字与双字 n-gram 倒排表，取最短倒排表作为候选再校验子串
+- 拼音首字母：如输入 kkkl 匹配“可口可乐”（安装 pypinyin 时使用其注音，
+  否则按 GB2312 一级汉字拼音区间推算，覆盖常用字）
+
+商品增删改提交后调用 refresh_product() 增量更新（失败时只记录日志并标记索引过期，
+下次使用时整体重建）；多进程部署时各进程的索引另按 SEARCH_CONFIG['max_age']
+定期整体重建，以同步其他进程的修改。
+
+不希望在进程内维护索引时，将 SEARCH_CONFIG['backend'] 设为 'fulltext'，
+商品、客户、供应商搜索改用 InnoDB FULLTEXT（ngram 分词）索引的 MATCH ... AGAINST，
+按相关度排序（索引见 migrations/0003_search_fulltext.sql）。
+"""
+import bisect
+import threading
+import time
+
+try:
+    from pypinyin import Style, lazy_pinyin
+except ImportError:  # pragma: no cover - 可选依赖
+    lazy_pinyin = None
+
+from utils.cache import cache_logger
+from utils.database import get_db_connection
+
+# 搜索索引配置
+SEARCH_CONFIG = {
+    'backend': 'memory',   # memory：商品走进程内索引；fulltext：商品、客户、供应商走 MySQL 全文索引
+    'max_age': 300,        # 索引整体重建间隔（秒），0 表示只在首次使用时构建
+    'max_in_ids': 5000,    # 列表查询按索引结果 IN (...) 过滤的最大ID数，超过则退回 LIKE
+    'ngram_token_size': 2  # 与 MySQL ngram_token_size 一致，更短的关键字无法走全文索引
+}
+
+# 各表全文索引覆盖的列（MATCH 的列必须与索引定义完全一致）
+FULLTEXT_COLUMNS = {
+    'products': ('name', 'brand', 'code'),
+    'customers': ('name', 'phone', 'address'),
+    'suppliers': ('name', 'contact_person')
+}
+
+# GB2312 一级汉字按拼音排序，各声母首字的区位编码
+_GB2312_INITIALS = [
+    (0xB0A1, 'a'), (0xB0C5, 'b'), (0xB2C1, 'c'), (0xB4EE, 'd'), (0xB6EA, 'e'),
+    (0xB7A2, 'f'), (0xB8C1, 'g'), (0xB9FE, 'h'), (0xBBF7, 'j'), (0xBFA6, 'k'),
+    (0xC0AC, 'l'), (0xC2E8, 'm'), (0xC4C3, 'n'), (0xC5B6, 'o'), (0xC5BE, 'p'),
+    (0xC6DA, 'q'), (0xC8BB, 'r'), (0xC8F6, 's'), (0xCBFA, 't'), (0xCDDA, 'w'),
+    (0xCEF4, 'x'), (0xD1B9, 'y'), (0xD4D1, 'z')
+]
+_GB2312_CODES = [code for code, _ in _GB2312_INITIALS]
+_GB2312_LEVEL1_END = 0xD7F9
+
+
+def _char_initial(ch):
+    if ch.isascii():
+        return ch.lower() if ch.isalnum() else ''
+    try:
+        raw = ch.encode('gb2312')
+    except UnicodeEncodeError:
+        return ''
+    if len(raw) != 2:
+        return ''
+    code = (raw[0] << 8) | raw[1]
+    if code < _GB2312_CODES[0] or code > _GB2312_LEVEL1_END:
+        return ''
+    return _GB2312_INITIALS[bisect.bisect_right(_GB2312_CODES, code) - 1][1]
+
+
+def pinyin_initials(text):
+    """汉字转拼音首字母（字母数字保留，其他字符忽略），如 可口可乐500ml -> kkkl500ml"""
+    if not text:
+        return ''
+    if lazy_pinyin is not None:
+        parts = lazy_pinyin(text, style=Style.FIRST_LETTER, errors='default')
+        return ''.join(ch for ch in ''.join(parts).lower() if ch.isascii() and ch.isalnum())
+    return ''.join(_char_initial(ch) for ch in text)
+
+
+def normalize(text):
+    return (text or '').strip().lower()
+
+
+def _grams(text):
+    """单字与双字 n-gram"""
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+class ProductSearchIndex:
+    """商品搜索索引（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._clear()
+        self.built_at = None
+        self.stale = False
+
+    def _clear(self):
+        self._docs = {}       # id -> {'code', 'name', 'initials', 'status', 'fields'}
+        self._postings = {}   # gram -> set(id)，覆盖编码、名称、品牌、拼音首字母
+        self._codes = []      # 有序 [(code, id)]
+        self._names = []      # 有序 [(name, id)]
+        self._initials = []   # 有序 [(initials, name, id)]
+
+    def __len__(self):
+        return len(self._docs)
+
+    def build(self, products):
+        """用商品全集重建索引，products 为含 id, code, name, brand, status 的字典序列"""
+        with self._lock:
+            self._clear()
+            for product in products:
+                self._add(product, keep_sorted=False)
+            self._codes.sort()
+            self._names.sort()
+            self._initials.sort()
+            self.built_at = time.monotonic()
+
+    def upsert(self, product):
+        with self._lock:
+            self._remove(product['id'])
+            self._add(product)
+
+    def remove(self, product_id):
+        with self._lock:
+            self._remove(product_id)
+
+    def _add(self, product, keep_sorted=True):
+        product_id = product['id']
+        code = normalize(product.get('code'))
+        name = normalize(product.get('name'))
+        initials = pinyin_initials(product.get('name'))
+        fields = tuple(field for field in (code, name, normalize(product.get('brand')), initials) if field)
+        self._docs[product_id] = {
+            'code': code,
+            'name': name,
+            'initials': initials,
+            'status': product.get('status') or 'active',
+            'fields': fields
+        }
+        for field in fields:
+            for gram in _grams(field):
+                self._postings.setdefault(gram, set()).add(product_id)
+        add = bisect.insort if keep_sorted else list.append
+        if code:
+            add(self._codes, (code, product_id))
+        add(self._names, (name, product_id))
+        if initials:
+            add(self._initials, (initials, name, product_id))
+
+    @staticmethod
+    def _delete_sorted(items, item):
+        i = bisect.bisect_left(items, item)
+        if i < len(items) and items[i] == item:
+            del items[i]
+
+    def _remove(self, product_id):
+        doc = self._docs.pop(product_id, None)
+        if doc is None:
+            return
+        grams = set()
+        for field in doc['fields']:
+            grams.update(_grams(field))
+        for gram in grams:
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(product_id)
+                if not ids:
+                    del self._postings[gram]
+        if doc['code']:
+            self._delete_sorted(self._codes, (doc['code'], product_id))
+        self._delete_sorted(self._names, (doc['name'], product_id))
+        if doc['initials']:
+            self._delete_sorted(self._initials, (doc['initials'], doc['name'], product_id))
+
+    def search(self, keyword, status='active', limit=20):
+        """
+        搜索商品
+
+        排序：编码完全匹配 > 编码前缀（按编码） > 名称前缀（按名称） > 拼音首字母前缀（按首字母）
+        > 其他子串匹配（按名称）。前缀匹配在有序表上二分定位，取够 limit 条即停。
+
+        Args:
+            keyword: 关键字（编码、名称、品牌子串或拼音首字母）
+            status: 只返回该状态的商品，None 表示不限
+            limit: 最多返回条数，None 表示不限
+
+        Returns:
+            list: 商品ID列表
+        """
+        q = normalize(keyword)
+        if not q:
+            return []
+
+        with self._lock:
+            docs = self._docs
+            result = []
+            seen = set()
+
+            def accept(product_id):
+                return product_id not in seen and (status is None or docs[product_id]['status'] == status)
+
+            def full():
+                return limit is not None and len(result) >= limit
+
+            # 前缀匹配：编码、名称、拼音首字母各自的有序表中，命中项连续排列
+            for items in (self._codes, self._names, self._initials):
+                i = bisect.bisect_left(items, (q,))
+                while i < len(items) and items[i][0].startswith(q) and not full():
+                    product_id = items[i][-1]
+                    if accept(product_id):
+                        result.append(product_id)
+                        seen.add(product_id)
+                    i += 1
+            if full():
+                return result
+
+            # 子串匹配：各双字 n-gram 倒排表求交得到候选（必要条件），再校验完整子串
+            grams = {q} if len(q) == 1 else {q[j:j + 2] for j in range(len(q) - 1)}
+            postings = [self._postings.get(gram) for gram in grams]
+            if not all(postings):
+                return result
+            postings.sort(key=len)
+            candidates = postings[0] if len(postings) == 1 else postings[0].intersection(*postings[1:])
+
+            def matches(product_id):
+                return accept(product_id) and (
+                    len(q) <= 2 or any(q in field for field in docs[product_id]['fields']))
+
+            need = None if limit is None else limit - len(result)
+            if need is not None and len(candidates) * len(candidates) > len(self._names) * need:
+                # 候选很多：按名称有序表顺序扫描，取够即停
+                for _, product_id in self._names:
+                    if product_id in candidates and matches(product_id):
+                        result.append(product_id)
+                        if len(result) >= limit:
+                            break
+            else:
+                ordered = sorted(candidates, key=lambda product_id: (docs[product_id]['name'], product_id))
+                for product_id in ordered:
+                    if matches(product_id):
+                        result.append(product_id)
+                        if full():
+                            break
+        return result
+
+
+_index = None
+_build_lock = threading.Lock()
+
+
+def _load_index():
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT id, code, name, brand, status FROM products")
+        columns = [column[0] for column in cursor.description]
+        products = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+        conn.close()
+    index = ProductSearchIndex()
+    index.build(products)
+    return index
+
+
+def _expired(index):
+    max_age = SEARCH_CONFIG['max_age']
+    return index.stale or (bool(max_age) and time.monotonic() - index.built_at >= max_age)
+
+
+def get_search_index():
+    """
+    获取商品搜索索引
+
+    首次使用时从数据库构建；超过 max_age 后由一个请求在新对象上重建再替换，
+    重建期间其他请求继续使用旧索引。
+    """
+    global _index
+    index = _index
+    if index is None:
+        with _build_lock:
+            if _index is None:
+                _index = _load_index()
+            return _index
+    if _expired(index) and _build_lock.acquire(blocking=False):
+        try:
+            if _expired(_index):
+                _index = _load_index()
+        finally:
+            _build_lock.release()
+    return _index
+
+
+def refresh_product(product_id):
+    """
+    商品增删改提交后增量更新索引（索引尚未构建时跳过，首次使用时会整体构建）
+
+    在事务的 try 之外调用，使用独立连接查询；出错时只记录日志并标记索引过期。
+    """
+    index = _index
+    if index is None:
+        return
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT id, code, name, brand, status FROM products WHERE id = %s", (product_id,))
+            row = cursor.fetchone()
+            columns = [column[0] for column in cursor.description]
+        finally:
+            cursor.close()
+            conn.close()
+    except Exception as e:
+        index.stale = True
+        cache_logger.warning(f'商品搜索索引刷新失败，下次使用时整体重建: {str(e)}')
+        return
+    if row is None:
+        index.remove(product_id)
+        return
+    index.upsert(dict(zip(columns, row)))
+
+
+def use_fulltext():
+    """是否使用 MySQL 全文索引搜索"""
+    return SEARCH_CONFIG['backend'] == 'fulltext'
+
+
+def match_against(table, keyword, alias=''):
+    """
+    全文检索表达式（BOOLEAN MODE 短语匹配，值即相关度）
+
+    Args:
+        table: 表名（见 FULLTEXT_COLUMNS）
+        keyword: 关键字
+        alias: 查询中的表别名
+
+    Returns:
+        tuple: (表达式, 参数列表)；关键字短于 ngram_token_size 时返回 (None, [])
+    """
+    if len(keyword) < SEARCH_CONFIG['ngram_token_size']:
+        return None, []
+    prefix = f'{alias}.' if alias else ''
+    columns = ', '.join(prefix + column for column in FULLTEXT_COLUMNS[table])
+    # 整个关键字作为短语，避免其中的 + - * 等被当作布尔运算符
+    phrase = '"' + keyword.replace('"', ' ') + '"'
+    return f"MATCH({columns}) AGAINST (%s IN BOOLEAN MODE)", [phrase]
+
+
+def keyword_condition(table, keyword, like_columns, alias=''):
+    """
+    关键字筛选条件
+
+    fulltext 后端使用 MATCH ... AGAINST；关键字短于 ngram 长度时退回前缀 LIKE。
+    其他后端保持原有的 like_columns 子串 LIKE。
+
+    Returns:
+        tuple: (条件, 参数列表)
+    """
+    if use_fulltext():
+        expr, params = match_against(table, keyword, alias)
+        if expr:
+            return expr, params
+        columns = [(f'{alias}.' if alias else '') + column for column in FULLTEXT_COLUMNS[table]]
+        return '(' + ' OR '.join(f'{column} LIKE %s' for column in columns) + ')', [f'{keyword}%'] * len(columns)
+    return '(' + ' OR '.join(f'{column} LIKE %s' for column in like_columns) + ')', [f'%{keyword}%'] * len(like_columns)
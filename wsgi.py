@@ -0,0 +1,9 @@
+"""
+WSGI 入口：生产服务器加载 wsgi:app（如 gunicorn wsgi:app），推荐通过 serve.py 启动
+
+导入时在当前进程同步预热条码映射与商品搜索索引；gunicorn 预加载（preload_app）时
+在主进程中完成，fork 出的 worker 以写时复制共享这些只读数据。
+"""
+from app import init_app
+
+app = init_app(warm_async=False)